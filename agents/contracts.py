@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import List, Dict, Optional
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Tuple
 
 
 @dataclass(frozen=True)
@@ -8,6 +8,23 @@ class ScanLimits:
     max_requests: int
 
 
+@dataclass(frozen=True)
+class StageTuning:
+    """
+    Per-stage knobs chosen by the cost model (agents/planner/cost_model.py)
+    so the enabled stages fit the runtime budget.
+    """
+    semgrep_profile: str = "standard"   # fast | standard | deep
+    semgrep_jobs: int = 1
+    sca_backend: str = "grype"          # grype | osv-index
+    sca_workers: int = 1
+    nuclei_profile: str = "ci"          # ci | deep
+
+    # Estimated seconds per enabled stage, and whether their sum fits
+    estimates: Dict[str, float] = field(default_factory=dict)
+    fits_budget: bool = True
+
+
 @dataclass(frozen=True)
 class ExecutionPlan:
     """
@@ -21,6 +38,9 @@ class ExecutionPlan:
     reason: str
     limits: ScanLimits
 
+    # Set by the cost-aware sizing step; None = tool defaults
+    tuning: Optional[StageTuning] = None
+
 
 @dataclass(frozen=True)
 class AgentContext:
@@ -38,3 +58,6 @@ class AgentContext:
     changed_files: List[str]
 
     has_public_endpoint: bool
+
+    # {path: [(first, last)]} changed-line ranges of the PR diff (optional)
+    changed_lines: Dict[str, List[Tuple[int, int]]] = field(default_factory=dict)
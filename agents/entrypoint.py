@@ -1,31 +1,68 @@
 import os
 import logging
-from typing import Dict, Any
+from dataclasses import replace
+from typing import Dict, Any, Optional
 
 from agents.contracts import AgentContext
 from agents.planner.planner_llm import LLMPlanner
 from agents.gatekeeper import enforce_plan
+from agents.planner.cost_model import CostModel, collect_repo_stats, pinned_knobs, sizing_report
+from agents.speculation import SpeculationPolicy, SpeculativeScan
 from sast.orchestrator import run_security_checks
-from sast.scope import ScopePolicy
+from sast.scope import ScopePolicy, ScopeViolation, validate_repo_scope
 
 # --- AGENTIC MODULES ---
 from agents.triage.triage import triage_findings
+from agents.triage.changes import parse_unified_diff
 from agents.remediation.remediator import RemediationAgent
-from agents.llm_clients.openrouter_client import OpenRouterClient
+from agents.remediation.executor import RemediationExecutor
+from agents.remediation.fix_cache import default_fix_cache
+from agents.remediation.scheduler import RemediationBudget, schedule_remediation, skipped_entry
+from agents.llm_clients.base import LLMClient, client_from_env
+from agents.telemetry import LLMTelemetry
 
 logger = logging.getLogger(__name__)
 
+
+def _local_repo_stats(input: dict, scope: ScopePolicy, has_target: bool):
+    """
+    Repo statistics of a local checkout (remote repos are only measured
+    once speculation has cloned them).
+    """
+    repo_path = input.get("repo_path") or ""
+    if not os.path.isdir(repo_path):
+        return None
+    try:
+        validate_repo_scope(repo_path, scope)
+    except ScopeViolation:
+        return None
+    return collect_repo_stats(
+        repo_path,
+        languages=input.get("languages", ["python"]),
+        targets=1 if has_target else 0,
+    )
+
+
 def run_with_planner(
     input: dict,
     planner: LLMPlanner,
     scope: ScopePolicy,
+    llm_client: Optional[LLMClient] = None,
+    telemetry: Optional[LLMTelemetry] = None,
 ) -> dict:
     """
     Authoritative execution entrypoint.
     1. AI decides WHAT to run (Planning).
     2. Orchestrator runs it (Execution).
     3. AI analyzes results (Triage & Remediation).
+
+    `llm_client`: remediation backend (default: client_from_env(), e.g.
+    a replay cassette for offline runs).
+    `telemetry`: LLM call recorder, reported as result["telemetry"]["llm"].
     """
+    telemetry = telemetry or LLMTelemetry()
+    if isinstance(planner, LLMPlanner):
+        planner.telemetry = telemetry
 
     # 1️⃣ Build AgentContext (SAFE METADATA ONLY)
     ctx = AgentContext(
@@ -36,24 +73,58 @@ def run_with_planner(
         is_pr=input.get("is_pr", False),
         changed_files=input.get("changed_files", []),
         has_public_endpoint=bool(input.get("dast", {}).get("target_url")),
+        changed_lines=input.get("changed_lines") or (
+            parse_unified_diff(input["diff"]) if input.get("diff") else {}
+        ),
     )
 
-    # 2️⃣ AI Planning
-    print("🤖 AI Planner: Analyzing context...")
-    plan = planner.plan(ctx)
+    # Base-plan repo stages start now, while the planner is thinking
+    cost_model = CostModel.from_env()
+    speculation = SpeculativeScan(input, ctx, scope, SpeculationPolicy.from_env(), cost_model=cost_model).start()
+    repo_stats = None
 
-    # 3️⃣ Hard Policy Enforcement
-    final_plan = enforce_plan(plan, scope)
-    print(f"📋 Execution Plan: {final_plan}")
+    try:
+        # 2️⃣ AI Planning
+        print("🤖 AI Planner: Analyzing context...")
+        plan = planner.plan(ctx)
 
-    # 4️⃣ Execution (The "Hands")
-    result = run_security_checks(
-        input=input,
-        plan=final_plan,
-        scope=scope,
-    )
+        # 3️⃣ Hard Policy Enforcement
+        final_plan = enforce_plan(plan, scope)
+
+        # 3️⃣½ Cost-aware sizing: stage knobs that fit the runtime budget
+        if cost_model is not None:
+            repo_stats = speculation.repo_stats or _local_repo_stats(input, scope, ctx.has_public_endpoint)
+        if repo_stats is not None:
+            final_plan = cost_model.size(
+                final_plan, repo_stats, pinned=pinned_knobs(input, scope.safe_mode), allow_deep_dast=not scope.safe_mode
+            )
+            if not final_plan.tuning.fits_budget:
+                print(f"⚠️ Estimated {sum(final_plan.tuning.estimates.values()):.0f}s exceeds the runtime budget")
+        print(f"📋 Execution Plan: {final_plan}")
+
+        # 4️⃣ Execution (The "Hands")
+        result = run_security_checks(
+            input=input,
+            plan=final_plan,
+            scope=scope,
+            stages=speculation.commit(final_plan),
+            workspace=speculation.workspace,
+        )
+    finally:
+        speculation.close()
+
+    if speculation.stats["started"]:
+        result["speculation"] = speculation.stats
+
+    if repo_stats is not None:
+        stage_seconds = result.get("stage_seconds", {})
+        # Reused speculative stages ran with the speculation's worker counts
+        ran_plan = replace(final_plan, tuning=speculation.effective_tuning(final_plan.tuning))
+        cost_model.observe(ran_plan.tuning, repo_stats, stage_seconds, result.get("tools", []))
+        result["plan_sizing"] = sizing_report(ran_plan, repo_stats, stage_seconds)
 
     if result.get("status") == "failed":
+        result["telemetry"] = {"llm": telemetry.snapshot()}
         return result
 
     findings = result.get("findings", [])
@@ -64,25 +135,47 @@ def run_with_planner(
         findings = triage_findings(findings, ctx)
 
     # 6️⃣ Agentic Remediation (The "Hands" - Fixer)
-    api_key = os.environ.get("OPENROUTER_API_KEY")
-    if api_key and findings:
-        print("🔧 AI Remediation: Generating fixes for critical issues...")
+    if findings:
         try:
-            client = OpenRouterClient(api_key=api_key)
-            remediator = RemediationAgent(client)
-
-            for f in findings:
-                # Cost saving: Only fix HIGH or CRITICAL issues
-                if f.severity in ["HIGH", "CRITICAL"]:
-                    print(f"   -> Fixing: {f.title}")
-                    fix = remediator.generate_fix(f, ctx)
-                    
-                    if f.evidence is None: 
-                        f.evidence = {}
-                    f.evidence["ai_remediation"] = fix
-                    
+            # Inside the try: a bad backend config (e.g. a missing replay
+            # cassette) must not cost the scan result
+            client = llm_client or client_from_env()
+            if client is not None:
+                print("🔧 AI Remediation: Generating fixes for critical issues...")
+                fix_cache = default_fix_cache()
+                # The executor retries each fix itself: one attempt per client call
+                call_client = client.without_retries() if hasattr(client, "without_retries") else client
+                remediator = RemediationAgent(call_client, cache=fix_cache, telemetry=telemetry)
+
+                # Cost saving: Only fix HIGH or CRITICAL issues, riskiest first,
+                # within the scan's token / cost / time budget
+                targets = [f for f in findings if f.severity in ["HIGH", "CRITICAL"]]
+                budget = RemediationBudget.from_env()
+                schedule = schedule_remediation(targets, remediator, ctx, budget)
+                executor = RemediationExecutor.from_env(remediator)
+                executor.run(
+                    schedule.findings,
+                    ctx,
+                    on_result=lambda f, _fix: print(f"   -> Fixed: {f.title}"),
+                    deadline=budget.deadline(),
+                )
+
+                schedule.skipped.extend(skipped_entry(f, "time_budget") for f in executor.skipped)
+                if schedule.skipped:
+                    print(f"   ⏭️ Skipped {len(schedule.skipped)} finding(s): remediation budget reached")
+
+                result["remediation"] = dict(executor.stats)
+                result["remediation"]["schedule"] = schedule.to_dict()
+                if fix_cache is not None:
+                    cache_stats = fix_cache.stats()
+                    result["remediation"]["cache"] = cache_stats
+                    print(f"   ♻️ Fix cache: {cache_stats['hit_rate']:.0%} hit rate ({cache_stats['lookups']} lookups)")
+
         except Exception as e:
             logger.error(f"Remediation failed: {e}")
 
+    result["telemetry"] = {"llm": telemetry.snapshot()}
+    print(f"📈 LLM telemetry: {telemetry.summary_line() or 'no LLM calls'}")
+
     result["findings"] = findings
     return result
\ No newline at end of file
@@ -24,5 +24,6 @@ def enforce_plan(plan: ExecutionPlan, scope: ScopePolicy) -> ExecutionPlan:
         run_dast=plan.run_dast,
         reason=plan.reason,
         limits=limits,
+        tuning=plan.tuning,
     )
 
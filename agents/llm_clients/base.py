@@ -0,0 +1,226 @@
+"""
+LLM Client Interface + Record / Replay Backends
+===============================================
+
+Every agent (planner, remediation) only calls `complete(prompt, timeout)`
+on an LLMClient, so the backend is pluggable:
+
+- OpenRouterClient   live calls (agents/llm_clients/openrouter_client.py)
+- RecordingClient    wraps a live client and appends every prompt /
+                     response / latency to a JSONL cassette
+- ReplayClient       answers from a cassette, no network, with a fixed
+                     or recorded simulated latency (offline benchmarks,
+                     air-gapped CI, concurrency load tests)
+
+Backend selection (client_from_env):
+    DEPLAI_LLM_BACKEND       openrouter (default) | record | replay
+    DEPLAI_LLM_CASSETTE      cassette path for record / replay
+    DEPLAI_LLM_REPLAY_LATENCY  simulated seconds per call (default: recorded)
+"""
+
+from abc import ABC, abstractmethod
+from collections import defaultdict
+import copy
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+
+
+class ReplayMissError(KeyError):
+    """
+    The cassette has no response for a prompt (strict replay).
+    """
+
+
+def prompt_key(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+class LLMClient(ABC):
+    """
+    Minimal interface shared by all backends.
+    """
+
+    model: str = ""
+
+    @abstractmethod
+    def complete(self, prompt: str, timeout: Optional[float] = None) -> str:
+        ...
+
+    def summary(self) -> Dict[str, Any]:
+        return {}
+
+    def without_retries(self) -> "LLMClient":
+        """
+        A client making a single attempt per call, for callers that retry
+        themselves (e.g. the RemediationExecutor). Backends without
+        retries return themselves.
+        """
+        return self
+
+
+# -------------------------
+# Recording
+# -------------------------
+class RecordingClient(LLMClient):
+    """
+    Pass-through to `inner`, appending one JSON line per successful call.
+    """
+
+    def __init__(self, inner: LLMClient, path: str):
+        self.inner = inner
+        self.model = getattr(inner, "model", "") or ""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def complete(self, prompt: str, timeout: Optional[float] = None, **kwargs) -> str:
+        started = time.monotonic()
+        response = self.inner.complete(prompt, timeout=timeout, **kwargs)
+        entry = {
+            "key": prompt_key(prompt),
+            "model": self.model,
+            "prompt": prompt,
+            "response": response,
+            "latency_seconds": round(time.monotonic() - started, 4),
+        }
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+        return response
+
+    def summary(self) -> Dict[str, Any]:
+        return self.inner.summary() if hasattr(self.inner, "summary") else {}
+
+    def last_metrics(self) -> Optional[Dict[str, Any]]:
+        return self.inner.last_metrics() if hasattr(self.inner, "last_metrics") else None
+
+    def without_retries(self) -> "RecordingClient":
+        if not hasattr(self.inner, "without_retries"):
+            return self
+        clone = copy.copy(self)  # shares the cassette lock
+        clone.inner = self.inner.without_retries()
+        return clone
+
+
+# -------------------------
+# Replay
+# -------------------------
+def load_cassette(path: str) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    {prompt key: [entries in recorded order]}.
+    """
+    entries: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                entry = json.loads(line)
+                entries[entry.get("key") or prompt_key(entry["prompt"])].append(entry)
+    return dict(entries)
+
+
+class ReplayClient(LLMClient):
+    """
+    Deterministic offline backend.
+
+    latency_seconds: fixed simulated latency per call; None replays the
+    recorded latency. jitter_seconds adds seeded uniform noise.
+    Repeated prompts cycle through their recorded responses. Unknown
+    prompts raise ReplayMissError unless `default_response` (a string, or
+    a function of the prompt) is set.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        entries: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+        latency_seconds: Optional[float] = None,
+        jitter_seconds: float = 0.0,
+        default_response: Optional[Union[str, Callable[[str], str]]] = None,
+        model: str = "replay",
+        seed: int = 0,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.entries = entries if entries is not None else (load_cassette(path) if path else {})
+        self.latency_seconds = latency_seconds
+        self.jitter_seconds = jitter_seconds
+        self.default_response = default_response
+        self.model = model
+        self._sleep = sleep
+        self._random = random.Random(seed)
+        self._cursor: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "hits": 0, "misses": 0, "simulated_seconds": 0.0}
+
+    def complete(self, prompt: str, timeout: Optional[float] = None, **kwargs) -> str:
+        key = prompt_key(prompt)
+        with self._lock:
+            self._stats["calls"] += 1
+            recorded = self.entries.get(key)
+            if recorded:
+                entry = recorded[self._cursor[key] % len(recorded)]
+                self._cursor[key] += 1
+                self._stats["hits"] += 1
+            else:
+                entry = None
+                self._stats["misses"] += 1
+            delay = self.latency_seconds
+            if delay is None:
+                delay = float(entry.get("latency_seconds", 0.0)) if entry else 0.0
+            if self.jitter_seconds:
+                delay += self._random.uniform(0, self.jitter_seconds)
+            self._stats["simulated_seconds"] += delay
+
+        if timeout is not None and delay > timeout:
+            self._sleep(timeout)
+            raise TimeoutError(f"simulated latency {delay:.2f}s exceeds timeout {timeout}s")
+        if delay > 0:
+            self._sleep(delay)
+
+        if entry is not None:
+            return entry["response"]
+        if callable(self.default_response):
+            return self.default_response(prompt)
+        if self.default_response is not None:
+            return self.default_response
+        raise ReplayMissError(f"no recorded response for prompt {key[:12]}")
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["simulated_seconds"] = round(stats["simulated_seconds"], 4)
+        return stats
+
+
+# -------------------------
+# Backend selection
+# -------------------------
+def client_from_env(api_key: Optional[str] = None) -> Optional[LLMClient]:
+    """
+    Client for the configured backend; None when the live backend has
+    no API key (LLM stages are then skipped).
+    """
+    from agents.llm_clients.openrouter_client import default_client
+
+    backend = os.environ.get("DEPLAI_LLM_BACKEND", "openrouter").lower()
+    cassette = os.environ.get("DEPLAI_LLM_CASSETTE")
+
+    if backend == "replay":
+        if not cassette:
+            raise ValueError("DEPLAI_LLM_BACKEND=replay requires DEPLAI_LLM_CASSETTE")
+        latency = os.environ.get("DEPLAI_LLM_REPLAY_LATENCY")
+        return ReplayClient(cassette, latency_seconds=float(latency) if latency else None)
+
+    live = default_client(api_key)
+    if backend == "record":
+        if not cassette:
+            raise ValueError("DEPLAI_LLM_BACKEND=record requires DEPLAI_LLM_CASSETTE")
+        return RecordingClient(live, cassette) if live is not None else None
+    return live
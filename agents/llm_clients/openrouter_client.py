@@ -1,7 +1,103 @@
-from openai import OpenAI
+"""
+OpenRouter Client
+=================
 
+Purpose:
+- OpenAI-compatible chat completions over one shared keep-alive
+  connection pool (every client in the process reuses it)
+- Per-call deadline covering connect, retries and (streamed) reads
+- Exponential backoff with jitter on 429 / 5xx / connection errors,
+  honouring Retry-After
+- Optional streaming (SSE) with a per-chunk callback
+- Per-call metrics: latency, tokens, retries
 
-class OpenRouterClient:
+Works against any OpenAI-compatible endpoint (`base_url`), e.g. a local
+stand-in server in tests.
+"""
+
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional
+import copy
+import json
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from agents.llm_clients.base import LLMClient
+
+DEFAULT_BASE_URL = "https://openrouter.ai/api/v1"
+DEFAULT_MODEL = "google/gemma-3n-e2b-it:free"
+DEFAULT_TIMEOUT_SECONDS = 60.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_SECONDS = 1.0
+CONNECT_TIMEOUT_SECONDS = 10.0
+POOL_SIZE = 32
+METRICS_HISTORY = 1000
+
+RETRY_STATUSES = {408, 409, 425, 429, 500, 502, 503, 504}
+
+SYSTEM_PREFIX = (
+    "You are a security scan planner.\n"
+    "You MUST return ONLY valid JSON matching the schema.\n\n"
+)
+
+
+class LLMClientError(Exception):
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+@dataclass
+class CallMetrics:
+    model: str
+    latency_seconds: float
+    retries: int
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    streamed: bool = False
+    ok: bool = True
+    error: Optional[str] = None
+
+
+# -------------------------
+# Shared connection pool
+# -------------------------
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def shared_session() -> requests.Session:
+    """
+    Process-wide keep-alive session (urllib3 pools are thread-safe).
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE, max_retries=0)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def _retry_after(resp: requests.Response) -> Optional[float]:
+    value = resp.headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+class OpenRouterClient(LLMClient):
     """
     OpenRouter client for planner LLMs.
     """
@@ -9,29 +105,207 @@ class OpenRouterClient:
     def __init__(
         self,
         api_key: str,
-        model: str = "google/gemma-3n-e2b-it:free",
+        model: str = DEFAULT_MODEL,
+        base_url: str = DEFAULT_BASE_URL,
+        timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_seconds: float = DEFAULT_BACKOFF_SECONDS,
+        stream: bool = False,
+        session: Optional[requests.Session] = None,
     ):
-        self.client = OpenAI(
-            api_key=api_key,
-            base_url="https://openrouter.ai/api/v1",
-        )
+        self.api_key = api_key
         self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.stream = stream
+        self.session = session or shared_session()
+
+        self.metrics: deque = deque(maxlen=METRICS_HISTORY)
+        self._metrics_lock = threading.Lock()
+        self._local = threading.local()
 
-    def complete(self, prompt: str) -> str:
-        response = self.client.chat.completions.create(
-    model=self.model,
-    messages=[
-        {
-            "role": "user",
-            "content": (
-                "You are a security scan planner.\n"
-                "You MUST return ONLY valid JSON matching the schema.\n\n"
-                + prompt
-            ),
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def complete(
+        self,
+        prompt: str,
+        timeout: Optional[float] = None,
+        stream: Optional[bool] = None,
+        on_chunk: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """
+        One chat completion. `timeout` is the deadline for the whole call
+        (all attempts); streaming passes each content delta to `on_chunk`.
+        """
+        # A call that dies before recording must not report the previous one
+        self._local.last = None
+        stream = self.stream if stream is None else stream
+        deadline = time.monotonic() + (timeout or self.timeout_seconds)
+        payload: Dict[str, Any] = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": SYSTEM_PREFIX + prompt}],
+            "temperature": 0.1,
         }
-    ],
-    temperature=0.1,
-)
+        if stream:
+            payload["stream"] = True
+            payload["stream_options"] = {"include_usage": True}
+
+        started = time.monotonic()
+        retries = 0
+        while True:
+            try:
+                text, usage = self._attempt(payload, deadline, stream, on_chunk)
+            except LLMClientError as e:
+                retryable = e.status is None or e.status in RETRY_STATUSES
+                delay = self._backoff(retries, e.retry_after)
+                if not retryable or retries >= self.max_retries or time.monotonic() + delay >= deadline:
+                    self._record(started, retries, stream, error=str(e))
+                    raise
+                retries += 1
+                time.sleep(delay)
+                continue
+
+            self._record(started, retries, stream, usage=usage)
+            return text.strip()
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Aggregate of the last METRICS_HISTORY calls of this client, across
+        every scan sharing it (benchmarks); per-scan numbers come from
+        LLMTelemetry.
+        """
+        with self._metrics_lock:
+            calls: List[CallMetrics] = list(self.metrics)
+        latencies = sorted(m.latency_seconds for m in calls)
+        return {
+            "calls": len(calls),
+            "errors": sum(not m.ok for m in calls),
+            "retries": sum(m.retries for m in calls),
+            "prompt_tokens": sum(m.prompt_tokens for m in calls),
+            "completion_tokens": sum(m.completion_tokens for m in calls),
+            "total_tokens": sum(m.total_tokens for m in calls),
+            "latency_p50": latencies[len(latencies) // 2] if latencies else 0.0,
+            "latency_max": latencies[-1] if latencies else 0.0,
+        }
+
+    def without_retries(self) -> "OpenRouterClient":
+        """
+        Same endpoint, session and metrics, but one attempt per call.
+        """
+        clone = copy.copy(self)
+        clone.max_retries = 0
+        return clone
+
+    # ------------------------------------------------------------------
+    # One HTTP attempt
+    # ------------------------------------------------------------------
+    def _attempt(self, payload, deadline, stream, on_chunk):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise LLMClientError("deadline exceeded", status=408)
+
+        try:
+            resp = self.session.post(
+                f"{self.base_url}/chat/completions",
+                json=payload,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=(min(CONNECT_TIMEOUT_SECONDS, remaining), remaining),
+                stream=stream,
+            )
+        except requests.RequestException as e:
+            raise LLMClientError(f"request failed: {e}") from e
 
+        with resp:
+            if resp.status_code != 200:
+                raise LLMClientError(
+                    f"HTTP {resp.status_code}: {resp.text[:200]}",
+                    status=resp.status_code,
+                    retry_after=_retry_after(resp),
+                )
+            try:
+                if stream:
+                    return self._read_stream(resp, deadline, on_chunk)
+                body = resp.json()
+                return body["choices"][0]["message"]["content"] or "", body.get("usage") or {}
+            except requests.RequestException as e:
+                raise LLMClientError(f"response read failed: {e}") from e
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                raise LLMClientError(f"malformed response: {e}", status=502) from e
 
-        return response.choices[0].message.content.strip()
+    def _read_stream(self, resp, deadline, on_chunk):
+        parts: List[str] = []
+        usage: Dict[str, Any] = {}
+        for line in resp.iter_lines(decode_unicode=True):
+            if time.monotonic() > deadline:
+                raise LLMClientError("deadline exceeded while streaming", status=408)
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            event = json.loads(data)
+            usage = event.get("usage") or usage
+            for choice in event.get("choices") or []:
+                chunk = (choice.get("delta") or {}).get("content")
+                if chunk:
+                    parts.append(chunk)
+                    if on_chunk is not None:
+                        on_chunk(chunk)
+        return "".join(parts), usage
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+    def _backoff(self, retries: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, self.backoff_seconds * (2 ** retries))
+
+    def _record(self, started, retries, stream, usage=None, error=None) -> None:
+        usage = usage or {}
+        metrics = CallMetrics(
+            model=self.model,
+            latency_seconds=round(time.monotonic() - started, 4),
+            retries=retries,
+            prompt_tokens=int(usage.get("prompt_tokens") or 0),
+            completion_tokens=int(usage.get("completion_tokens") or 0),
+            total_tokens=int(usage.get("total_tokens") or 0),
+            streamed=bool(stream),
+            ok=error is None,
+            error=error,
+        )
+        with self._metrics_lock:
+            self.metrics.append(metrics)
+        self._local.last = metrics
+
+    def last_metrics(self) -> Optional[Dict[str, Any]]:
+        """
+        Metrics of the calling thread's most recent call (safe with
+        concurrent callers sharing this client).
+        """
+        last = getattr(self._local, "last", None)
+        return asdict(last) if last is not None else None
+
+
+_clients: Dict[tuple, OpenRouterClient] = {}
+_clients_lock = threading.Lock()
+
+
+def default_client(api_key: Optional[str] = None, model: str = DEFAULT_MODEL) -> Optional[OpenRouterClient]:
+    """
+    Process-wide client per (api key, model); None without an API key.
+    OPENROUTER_BASE_URL overrides the endpoint.
+    """
+    api_key = api_key or os.environ.get("OPENROUTER_API_KEY")
+    if not api_key:
+        return None
+    base_url = os.environ.get("OPENROUTER_BASE_URL") or DEFAULT_BASE_URL
+    key = (api_key, model, base_url)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = OpenRouterClient(api_key=api_key, model=model, base_url=base_url)
+        return client
@@ -0,0 +1,496 @@
+# agents/planner/cost_model.py
+"""
+Planner Cost Model
+==================
+
+Purpose:
+- Estimate each stage's runtime from cheap repo statistics (file count,
+  LOC per language, dependency manifests, DAST targets) and past runtimes
+- Choose Semgrep rule depth + jobs, SCA backend + workers and the Nuclei
+  profile so the enabled stages fit ScanLimits.max_runtime_seconds
+- Right-size that limit for small repos instead of a fixed 300s / 900s
+
+    model = CostModel.from_env()
+    stats = collect_repo_stats(checkout, languages=["python"], targets=1)
+    plan = model.size(enforce_plan(plan, scope), stats)   # plan.tuning
+    result = run_security_checks(input, plan, scope)
+    model.observe(plan.tuning, stats, result.get("stage_seconds", {}), result.get("tools", []))
+
+Estimate per stage: startup + rate * work units / parallelism, with units
+= kLOC of the scanned languages (SAST), sub-projects (SCA) or targets
+(DAST). Rates start from built-in defaults and follow the observed
+runtimes (EWMA per stage and option, seeded with the default) kept in
+the runtime history. Failed, cached or skipped stage runs are not
+observed: their wall time says nothing about the stage's cost.
+
+Repo statistics never read file contents: LOC is estimated from sizes.
+
+History: DEPLAI_RUNTIME_DB, default <cache root>/runtime_history.sqlite3.
+DEPLAI_COST_MODEL=0 disables sizing (tool defaults, planner limits).
+"""
+
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+import math
+import os
+import sqlite3
+import threading
+import time
+
+from agents.contracts import ExecutionPlan, StageTuning
+from sast.advisory_index import DEFAULT_INDEX_PATH
+from sast.cache import cache_root
+from sast.sbom_runner import SKIP_DIRS, is_manifest
+
+# (startup seconds, seconds per work unit) per (stage, option)
+DEFAULT_RATES: Dict[Tuple[str, str], Tuple[float, float]] = {
+    ("sast", "fast"): (10.0, 0.25),       # per kLOC
+    ("sast", "standard"): (15.0, 0.6),
+    ("sast", "deep"): (25.0, 1.5),
+    ("sca", "grype"): (10.0, 20.0),       # per sub-project
+    ("sca", "osv-index"): (3.0, 4.0),
+    ("dast", "ci"): (10.0, 90.0),         # per target
+    ("dast", "deep"): (15.0, 300.0),
+}
+
+# Preference order per stage: richest first
+SEMGREP_PROFILES = ("deep", "standard", "fast")
+SCA_BACKENDS = ("grype", "osv-index")
+NUCLEI_PROFILES = ("deep", "ci")
+
+HEADROOM = 0.8               # plan to 80% of the budget
+RIGHT_SIZE_FACTOR = 2.0      # limit = 2x the estimate ...
+MIN_RUNTIME_SECONDS = 120    # ... but never below this
+PARALLEL_EFFICIENCY = 0.85   # speedup of n workers = n ** 0.85
+EWMA_ALPHA = 0.3
+
+# Tool label prefix -> stage, and the suffixes of runs that did not do
+# the stage's full work (see sast/orchestrator.py)
+TOOL_STAGES = {"semgrep": "sast", "sca": "sca", "nuclei": "dast"}
+UNMEASURED_SUFFIXES = ("-error", "-cached", "-skipped")
+BYTES_PER_LINE = 40
+MAX_FILES = 200_000
+
+LANGUAGE_EXTENSIONS = {
+    ".py": "python",
+    ".js": "javascript", ".jsx": "javascript", ".mjs": "javascript", ".cjs": "javascript",
+    ".ts": "typescript", ".tsx": "typescript",
+    ".go": "go",
+    ".java": "java",
+    ".kt": "kotlin",
+    ".rb": "ruby",
+    ".php": "php",
+    ".cs": "csharp",
+    ".c": "c", ".h": "c",
+    ".cpp": "cpp", ".cc": "cpp", ".hpp": "cpp",
+    ".rs": "rust",
+    ".scala": "scala",
+    ".swift": "swift",
+}
+
+
+# -------------------------
+# Repo statistics
+# -------------------------
+@dataclass(frozen=True)
+class RepoStats:
+    files: int
+    loc: Dict[str, int]                  # estimated lines per language
+    manifests: int
+    subprojects: int                     # directories holding manifests
+    targets: int = 0                     # DAST targets
+    languages: Tuple[str, ...] = ()      # languages Semgrep scans
+    truncated: bool = False              # walk stopped at MAX_FILES
+
+    @property
+    def sast_kloc(self) -> float:
+        wanted = {lang.lower() for lang in self.languages}
+        scanned = [n for lang, n in self.loc.items() if lang in wanted]
+        # Unknown language names: assume every source file is scanned
+        total = sum(scanned) if scanned else sum(self.loc.values())
+        return total / 1000.0
+
+    def units(self, stage: str) -> float:
+        if stage == "sast":
+            return self.sast_kloc
+        if stage == "sca":
+            return float(self.subprojects)
+        return float(self.targets)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "sast_kloc": round(self.sast_kloc, 1)}
+
+
+def collect_repo_stats(
+    repo_path: str,
+    languages: Sequence[str] = (),
+    targets: int = 0,
+    max_files: int = MAX_FILES,
+) -> RepoStats:
+    """
+    One directory walk (stat only, no reads), skipping vendored / build dirs.
+    """
+    files = 0
+    loc: Dict[str, int] = {}
+    manifests = 0
+    manifest_dirs = set()
+    truncated = False
+
+    stack = [repo_path]
+    while stack and not truncated:
+        current = stack.pop()
+        try:
+            entries = list(os.scandir(current))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        stack.append(entry.path)
+                    continue
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+            except OSError:
+                continue
+
+            files += 1
+            if is_manifest(entry.name):
+                manifests += 1
+                manifest_dirs.add(current)
+            language = LANGUAGE_EXTENSIONS.get(os.path.splitext(entry.name)[1].lower())
+            if language is not None:
+                try:
+                    size = entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    size = 0
+                loc[language] = loc.get(language, 0) + max(1, size // BYTES_PER_LINE)
+            if files >= max_files:
+                truncated = True
+                break
+
+    return RepoStats(
+        files=files,
+        loc=loc,
+        manifests=manifests,
+        subprojects=len(manifest_dirs),
+        targets=targets,
+        languages=tuple(languages),
+        truncated=truncated,
+    )
+
+
+def pinned_knobs(input: Dict[str, Any], safe_mode: bool = False) -> Dict[str, Any]:
+    """
+    Knobs fixed by the scan input / environment; the cost model sizes
+    around them instead of overriding them. Under `safe_mode` a requested
+    Nuclei profile is pinned to "ci".
+    """
+    pinned = {
+        key: input[key]
+        for key in ("semgrep_profile", "semgrep_jobs", "sca_backend", "sca_workers")
+        if input.get(key)
+    }
+    if "sca_backend" not in pinned and os.environ.get("DEPLAI_SCA_BACKEND"):
+        pinned["sca_backend"] = os.environ["DEPLAI_SCA_BACKEND"]
+    profile = (input.get("dast") or {}).get("profile")
+    if profile:
+        pinned["nuclei_profile"] = "ci" if safe_mode else profile
+    return pinned
+
+
+# -------------------------
+# Runtime history
+# -------------------------
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rates (
+    stage      TEXT NOT NULL,
+    option     TEXT NOT NULL,
+    rate       REAL NOT NULL,
+    samples    INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (stage, option)
+) WITHOUT ROWID;
+"""
+
+
+def default_db_path() -> Path:
+    return Path(os.environ.get("DEPLAI_RUNTIME_DB") or cache_root() / "runtime_history.sqlite3")
+
+
+class RuntimeHistory:
+    """
+    Observed seconds per work unit, per (stage, option), as an EWMA.
+    One SQLite DB (WAL) shared by every worker.
+    """
+
+    def __init__(self, path: Optional[str] = None, alpha: float = EWMA_ALPHA):
+        self.path = Path(path) if path else default_db_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.alpha = alpha
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def rates(self) -> Dict[Tuple[str, str], float]:
+        with self._lock:
+            rows = self._conn.execute("SELECT stage, option, rate FROM rates").fetchall()
+        return {(stage, option): rate for stage, option, rate in rows}
+
+    def observe(self, stage: str, option: str, rate: float, prior: Optional[float] = None) -> None:
+        """
+        Fold one measured rate into the EWMA. The first sample is blended
+        with `prior` (the default rate) rather than stored as is.
+        """
+        first = rate if prior is None else prior + self.alpha * (rate - prior)
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO rates (stage, option, rate, samples, updated_at) VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT (stage, option) DO UPDATE SET
+                    rate = rate + ? * (? - rate),
+                    samples = samples + 1,
+                    updated_at = excluded.updated_at
+                """,
+                (stage, option, first, time.time(), self.alpha, rate),
+            )
+
+
+_default_history: Optional[RuntimeHistory] = None
+_default_lock = threading.Lock()
+
+
+def default_runtime_history() -> RuntimeHistory:
+    global _default_history
+    with _default_lock:
+        if _default_history is None or _default_history.path != default_db_path():
+            _default_history = RuntimeHistory()
+        return _default_history
+
+
+# -------------------------
+# Cost model
+# -------------------------
+@dataclass(frozen=True)
+class StageOption:
+    stage: str
+    option: str        # profile / backend
+    workers: int = 1
+
+
+def worker_ladder(limit: int) -> List[int]:
+    """
+    1, 2, 4, ... up to `limit` (always including `limit`).
+    """
+    ladder, n = [], 1
+    while n < limit:
+        ladder.append(n)
+        n *= 2
+    ladder.append(max(1, limit))
+    return ladder
+
+
+def osv_index_available() -> bool:
+    return os.path.exists(os.environ.get("DEPLAI_OSV_INDEX") or DEFAULT_INDEX_PATH)
+
+
+class CostModel:
+    """
+    Runtime estimates + greedy fitting of stage options to the budget.
+    """
+
+    def __init__(
+        self,
+        history: Optional[RuntimeHistory] = None,
+        cpus: Optional[int] = None,
+        rates: Optional[Dict[Tuple[str, str], Tuple[float, float]]] = None,
+    ):
+        self.history = history
+        self.cpus = max(1, cpus or os.cpu_count() or 1)
+        self.defaults = dict(DEFAULT_RATES, **(rates or {}))
+
+    @classmethod
+    def from_env(cls) -> Optional["CostModel"]:
+        if os.environ.get("DEPLAI_COST_MODEL", "1").lower() in ("0", "false", "no"):
+            return None
+        return cls(history=default_runtime_history())
+
+    # -------------------------
+    # Estimates
+    # -------------------------
+    def _observed(self) -> Dict[Tuple[str, str], float]:
+        if self.history is None:
+            return {}
+        try:
+            return self.history.rates()
+        except sqlite3.Error:
+            return {}
+
+    def estimate(self, choice: StageOption, stats: RepoStats, observed: Optional[Dict] = None) -> float:
+        startup, rate = self.defaults[(choice.stage, choice.option)]
+        rate = (observed or {}).get((choice.stage, choice.option), rate)
+        units = stats.units(choice.stage)
+        if choice.stage == "sca":
+            units = math.ceil(units / choice.workers) * choice.workers
+        return startup + rate * units / (choice.workers ** PARALLEL_EFFICIENCY)
+
+    def options(self, stage: str, stats: RepoStats, pinned: Dict[str, Any], allow_deep_dast: bool) -> List[StageOption]:
+        """
+        Candidate options for a stage, most thorough (and fewest workers) first.
+        """
+        if stage == "sast":
+            profiles = [pinned["semgrep_profile"]] if "semgrep_profile" in pinned else SEMGREP_PROFILES
+            jobs = [int(pinned["semgrep_jobs"])] if "semgrep_jobs" in pinned else worker_ladder(self.cpus)
+            return [StageOption("sast", p, j) for p in profiles for j in jobs]
+        if stage == "sca":
+            if "sca_backend" in pinned:
+                backends = [pinned["sca_backend"]]
+            else:
+                backends = [b for b in SCA_BACKENDS if b == "grype" or osv_index_available()]
+            limit = min(32, self.cpus, max(1, stats.subprojects))
+            workers = [int(pinned["sca_workers"])] if "sca_workers" in pinned else worker_ladder(limit)
+            return [StageOption("sca", b, w) for b in backends for w in workers]
+        if "nuclei_profile" in pinned:
+            return [StageOption("dast", pinned["nuclei_profile"])]
+        return [StageOption("dast", p) for p in NUCLEI_PROFILES if p != "deep" or allow_deep_dast]
+
+    # -------------------------
+    # Fitting
+    # -------------------------
+    def size(
+        self,
+        plan: ExecutionPlan,
+        stats: RepoStats,
+        pinned: Optional[Dict[str, Any]] = None,
+        allow_deep_dast: bool = False,
+    ) -> ExecutionPlan:
+        """
+        Plan with `tuning` set and max_runtime_seconds right-sized (never
+        raised). Stages run one after another, so their estimates add up;
+        the costliest stage is stepped down first.
+        """
+        pinned = pinned or {}
+        observed = self._observed()
+        enabled = [
+            stage for stage, on in (("sast", plan.run_sast), ("sca", plan.run_sca), ("dast", plan.run_dast)) if on
+        ]
+        if "dast" in enabled and not stats.targets:
+            enabled.remove("dast")
+
+        candidates = {
+            stage: [
+                (choice, self.estimate(choice, stats, observed))
+                for choice in self.options(stage, stats, pinned, allow_deep_dast)
+                if (stage, choice.option) in self.defaults
+            ]
+            for stage in enabled
+        }
+        candidates = {stage: c for stage, c in candidates.items() if c}
+        current = {stage: 0 for stage in candidates}
+
+        budget = plan.limits.max_runtime_seconds
+        target = budget * HEADROOM
+
+        def total() -> float:
+            return sum(candidates[s][i][1] for s, i in current.items())
+
+        while total() > target:
+            # Next cheaper option per stage (skipping ones that are not faster)
+            steps = {}
+            for stage, i in current.items():
+                now = candidates[stage][i][1]
+                cheaper = [j for j in range(i + 1, len(candidates[stage])) if candidates[stage][j][1] < now]
+                if cheaper:
+                    steps[stage] = cheaper[0]
+            if not steps:
+                break
+            stage = max(steps, key=lambda s: candidates[s][current[s]][1])
+            current[stage] = steps[stage]
+
+        chosen = {stage: candidates[stage][i][0] for stage, i in current.items()}
+        estimates = {stage: round(candidates[stage][i][1], 1) for stage, i in current.items()}
+        estimated = sum(estimates.values())
+
+        defaults = StageTuning()
+        sast = chosen.get("sast")
+        sca = chosen.get("sca")
+        dast = chosen.get("dast")
+        tuning = StageTuning(
+            semgrep_profile=sast.option if sast else pinned.get("semgrep_profile", defaults.semgrep_profile),
+            semgrep_jobs=sast.workers if sast else defaults.semgrep_jobs,
+            sca_backend=sca.option if sca else pinned.get("sca_backend", defaults.sca_backend),
+            sca_workers=sca.workers if sca else defaults.sca_workers,
+            nuclei_profile=dast.option if dast else pinned.get("nuclei_profile", defaults.nuclei_profile),
+            estimates=estimates,
+            fits_budget=estimated <= target,
+        )
+
+        runtime = min(budget, max(MIN_RUNTIME_SECONDS, math.ceil(estimated * RIGHT_SIZE_FACTOR)))
+        return replace(plan, limits=replace(plan.limits, max_runtime_seconds=runtime), tuning=tuning)
+
+    # -------------------------
+    # Learning
+    # -------------------------
+    def observe(
+        self,
+        tuning: Optional[StageTuning],
+        stats: RepoStats,
+        stage_seconds: Dict[str, float],
+        tools: Sequence[str] = (),
+    ) -> None:
+        """
+        Feed measured stage runtimes back into the history, except stages
+        whose `tools` labels mark a failed, cached or skipped run.
+        """
+        if self.history is None or tuning is None:
+            return
+        unmeasured = unmeasured_stages(tools)
+        choices = {
+            "sast": StageOption("sast", tuning.semgrep_profile, tuning.semgrep_jobs),
+            "sca": StageOption("sca", tuning.sca_backend, tuning.sca_workers),
+            "dast": StageOption("dast", tuning.nuclei_profile),
+        }
+        for stage, seconds in stage_seconds.items():
+            choice = choices.get(stage)
+            units = stats.units(stage)
+            if choice is None or stage in unmeasured or units <= 0 or (stage, choice.option) not in self.defaults:
+                continue
+            startup, default_rate = self.defaults[(stage, choice.option)]
+            if stage == "sca":
+                units = math.ceil(units / choice.workers) * choice.workers
+            rate = max(0.0, seconds - startup) * (choice.workers ** PARALLEL_EFFICIENCY) / units
+            try:
+                self.history.observe(stage, choice.option, rate, prior=default_rate)
+            except sqlite3.Error:
+                pass
+
+
+def unmeasured_stages(tools: Sequence[str]) -> Set[str]:
+    """
+    Stages with a tool label like "semgrep-error" or "sca-skipped".
+    """
+    stages: Set[str] = set()
+    for tool in tools or ():
+        if tool.endswith(UNMEASURED_SUFFIXES):
+            stage = TOOL_STAGES.get(tool.split("-", 1)[0])
+            if stage is not None:
+                stages.add(stage)
+    return stages
+
+
+def sizing_report(plan: ExecutionPlan, stats: RepoStats, stage_seconds: Dict[str, float]) -> Dict[str, Any]:
+    tuning = plan.tuning
+    return {
+        "repo": stats.to_dict(),
+        "max_runtime_seconds": plan.limits.max_runtime_seconds,
+        "tuning": asdict(tuning) if tuning else None,
+        "actual_seconds": dict(stage_seconds),
+    }
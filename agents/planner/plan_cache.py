@@ -0,0 +1,186 @@
+# agents/planner/plan_cache.py
+"""
+Planner Decision Cache
+======================
+
+Purpose:
+- Reuse the LLM planner's decision for an unchanged AgentContext instead
+  of calling the model on every scan (latency + free-tier rate limits)
+- Key = canonical hash of the planning inputs + prompt version + model,
+  so a prompt change or a different model never reuses a stale decision
+- Stores the parsed LLM plan, not the merged one: the planner re-merges
+  it with the fallback baseline of the context being planned
+
+Entries expire after a TTL; the least recently used ones are evicted
+beyond `max_entries`. One SQLite DB (WAL) shared by every worker.
+
+Location: DEPLAI_PLAN_CACHE_DB, default <cache root>/plan_cache.sqlite3.
+TTL: DEPLAI_PLAN_CACHE_TTL seconds (default 24h); 0 disables the cache.
+"""
+
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Optional
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from agents.contracts import AgentContext, ExecutionPlan, ScanLimits, StageTuning
+from sast.cache import cache_root, stable_hash
+
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 10_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plans (
+    key         TEXT PRIMARY KEY,
+    plan        TEXT NOT NULL,
+    stored_at   REAL NOT NULL,
+    accessed_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS plans_accessed ON plans (accessed_at);
+"""
+
+
+def default_db_path() -> Path:
+    return Path(os.environ.get("DEPLAI_PLAN_CACHE_DB") or cache_root() / "plan_cache.sqlite3")
+
+
+def _normalized(values) -> list:
+    return sorted({str(v).strip().lower() for v in values or [] if str(v).strip()})
+
+
+def context_fingerprint(ctx: AgentContext) -> Dict[str, Any]:
+    """
+    The planning inputs of a context, order- and case-insensitive.
+    repo and changed_files are not part of the prompt, so they are left out.
+    """
+    return {
+        "languages": _normalized(ctx.languages),
+        "frameworks": _normalized(ctx.frameworks),
+        "dependencies": _normalized(ctx.dependencies),
+        "is_pr": bool(ctx.is_pr),
+        "has_public_endpoint": bool(ctx.has_public_endpoint),
+    }
+
+
+def plan_cache_key(ctx: AgentContext, prompt_version: str, model: str = "") -> str:
+    return stable_hash({"ctx": context_fingerprint(ctx), "prompt": prompt_version, "model": model})
+
+
+def plan_to_record(plan: ExecutionPlan) -> Dict[str, Any]:
+    return asdict(plan)
+
+
+def plan_from_record(record: Dict[str, Any]) -> ExecutionPlan:
+    data = dict(record)
+    data["limits"] = ScanLimits(**data["limits"])
+    if data.get("tuning"):
+        data["tuning"] = StageTuning(**data["tuning"])
+    return ExecutionPlan(**data)
+
+
+class PlanCache:
+    """
+    Disk-backed ExecutionPlan cache with TTL + LRU eviction.
+    Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.path = Path(path) if path else default_db_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def get(self, key: str) -> Optional[ExecutionPlan]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT plan, stored_at FROM plans WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM plans WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE plans SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+
+        try:
+            return plan_from_record(json.loads(row[0]))
+        except (TypeError, KeyError, ValueError):
+            # Written by an incompatible version: treat as a miss
+            return None
+
+    def put(self, key: str, plan: ExecutionPlan) -> None:
+        now = time.time()
+        payload = json.dumps(plan_to_record(plan))
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                cur.execute(
+                    """
+                    INSERT INTO plans (key, plan, stored_at, accessed_at) VALUES (?, ?, ?, ?)
+                    ON CONFLICT (key) DO UPDATE SET
+                        plan = excluded.plan, stored_at = excluded.stored_at, accessed_at = excluded.accessed_at
+                    """,
+                    (key, payload, now, now),
+                )
+                cur.execute("DELETE FROM plans WHERE stored_at < ?", (now - self.ttl_seconds,))
+                cur.execute(
+                    """
+                    DELETE FROM plans WHERE key IN (
+                        SELECT key FROM plans ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.max_entries,),
+                )
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM plans").fetchone()[0]
+
+
+_default_cache: Optional[PlanCache] = None
+_default_lock = threading.Lock()
+
+
+def default_plan_cache() -> Optional[PlanCache]:
+    """
+    Process-wide cache configured from the environment (None if disabled).
+    """
+    global _default_cache
+    try:
+        ttl = int(os.environ.get("DEPLAI_PLAN_CACHE_TTL", DEFAULT_TTL_SECONDS))
+    except ValueError:
+        ttl = DEFAULT_TTL_SECONDS
+    if ttl <= 0:
+        return None
+
+    with _default_lock:
+        if _default_cache is None or _default_cache.path != default_db_path():
+            _default_cache = PlanCache(ttl_seconds=ttl)
+        _default_cache.ttl_seconds = ttl
+        return _default_cache
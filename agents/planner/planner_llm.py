@@ -3,12 +3,22 @@
 import json
 import logging
 import re
+from typing import Optional
 
 from agents.contracts import ExecutionPlan, ScanLimits, AgentContext
 from agents.planner.planner_fallback import FallbackPlanner
+from agents.planner.plan_cache import PlanCache, default_plan_cache, plan_cache_key
+from agents.telemetry import LLMTelemetry
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever _build_prompt or the parse rules change: cached decisions
+# of an older prompt are then never reused.
+PROMPT_VERSION = "3"
+
+# Sentinel: use the environment-configured cache (pass cache=None to disable)
+_DEFAULT_CACHE = object()
+
 
 class PlannerError(Exception):
     pass
@@ -24,11 +34,16 @@ class LLMPlanner:
         llm_client,
         timeout_seconds: int = 20,
         max_retries: int = 1,
+        cache=_DEFAULT_CACHE,
+        telemetry: Optional[LLMTelemetry] = None,
     ):
         self.llm = llm_client
         self.timeout_seconds = timeout_seconds
         self.max_retries = max_retries
         self.fallback = FallbackPlanner()
+        self.cache: Optional[PlanCache] = default_plan_cache() if cache is _DEFAULT_CACHE else cache
+        # Per-scan recorder (run_with_planner binds the scan's own)
+        self.telemetry = telemetry
 
     # ------------------------------------------------------------------
     # Public entrypoint
@@ -36,22 +51,50 @@ class LLMPlanner:
     def plan(self, ctx: AgentContext) -> ExecutionPlan:
         base_plan = self.fallback.plan(ctx)
 
-        for _ in range(self.max_retries + 1):
+        # The cache holds the raw LLM decision; the key is case-insensitive
+        # but the baseline is not, so it is re-merged for this exact context
+        key = self._cache_key(ctx)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if self.telemetry is not None:
+                self.telemetry.record_cache("planner", cached is not None)
+            if cached is not None:
+                return self._merge_with_fallback(base_plan, cached, ctx)
+
+        reason = "no_attempts"
+        for attempt in range(self.max_retries + 1):
+            if attempt and self.telemetry is not None:
+                self.telemetry.record_retry("planner")
             try:
                 raw = self._invoke_llm(ctx)
                 llm_plan = self._parse_and_validate(raw)
-                return self._merge_with_fallback(base_plan, llm_plan, ctx)
-            except Exception:
+                plan = self._merge_with_fallback(base_plan, llm_plan, ctx)
+            except Exception as e:
                 logger.exception("LLM planner attempt failed")
+                reason = type(e).__name__
+                continue
 
+            # Only real LLM decisions are cached; a failed run retries next scan
+            if self.cache is not None:
+                self.cache.put(key, llm_plan)
+            return plan
+
+        if self.telemetry is not None:
+            self.telemetry.record_fallback("planner", reason)
         return base_plan
 
+    def _cache_key(self, ctx: AgentContext) -> str:
+        model = getattr(self.llm, "model", None) or type(self.llm).__name__
+        return plan_cache_key(ctx, PROMPT_VERSION, str(model))
+
     # ------------------------------------------------------------------
     # LLM interaction
     # ------------------------------------------------------------------
     def _invoke_llm(self, ctx: AgentContext) -> str:
         prompt = self._build_prompt(ctx)
-        return self.llm.complete(prompt)
+        if self.telemetry is not None:
+            return self.telemetry.timed_call("planner", self.llm, prompt, timeout=self.timeout_seconds)
+        return self.llm.complete(prompt, timeout=self.timeout_seconds)
 
     # ------------------------------------------------------------------
     # Parsing + validation
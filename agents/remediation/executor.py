@@ -0,0 +1,232 @@
+"""
+Remediation Executor
+====================
+
+Purpose:
+- Generate fixes for many findings concurrently instead of one serial
+  LLM round trip per finding
+- Stay inside the provider's limits: bounded concurrency + a token
+  bucket on request starts
+- Per-call timeout and retries with jittered exponential backoff
+- Attach each fix to its finding as soon as it completes
+- Early stop at an optional wall-time deadline (see scheduler.py)
+
+    executor = RemediationExecutor(remediator, max_workers=8, rate_per_second=2)
+    executor.run(findings, ctx)   # sets evidence["ai_remediation"]
+
+Threads cannot be interrupted: a timed-out call is abandoned (counted as
+a failed attempt) and its result ignored when it eventually returns. It
+keeps its call slot until then, so hung calls never exceed 2x the worker
+count; a retry that finds no free slot within the timeout fails too.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, TimeoutError, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import logging
+import os
+import random
+import threading
+import time
+
+from agents.contracts import AgentContext
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_RATE_PER_SECOND = 2.0
+DEFAULT_BURST = 4
+DEFAULT_TIMEOUT_SECONDS = 60.0
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BACKOFF_SECONDS = 1.0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = float(rate)
+        self.capacity = max(1, int(capacity))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:  # unlimited
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_for = (1 - self._tokens) / self.rate
+            time.sleep(wait_for)
+
+
+def attach_fix(finding: Any, fix: str) -> None:
+    if isinstance(finding, dict):
+        evidence = finding.setdefault("evidence", {}) or {}
+        finding["evidence"] = evidence
+    else:
+        if finding.evidence is None:
+            finding.evidence = {}
+        evidence = finding.evidence
+    evidence["ai_remediation"] = fix
+
+
+class RemediationExecutor:
+    """
+    Bounded, rate-limited fan-out of RemediationAgent.request_fix.
+    """
+
+    def __init__(
+        self,
+        remediator,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        rate_per_second: float = DEFAULT_RATE_PER_SECOND,
+        burst: int = DEFAULT_BURST,
+        timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_seconds: float = DEFAULT_BACKOFF_SECONDS,
+    ):
+        self.remediator = remediator
+        self.max_workers = max(1, int(max_workers))
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.stats = {"calls": 0, "retries": 0, "timeouts": 0, "failed": 0}
+        self.skipped: List[Any] = []
+        self._stats_lock = threading.Lock()
+        self.telemetry = getattr(remediator, "telemetry", None)
+
+    @classmethod
+    def from_env(cls, remediator) -> "RemediationExecutor":
+        """
+        DEPLAI_REMEDIATION_CONCURRENCY / _RPS / _TIMEOUT / _RETRIES.
+        """
+        env = os.environ
+        return cls(
+            remediator,
+            max_workers=int(env.get("DEPLAI_REMEDIATION_CONCURRENCY", DEFAULT_MAX_WORKERS)),
+            rate_per_second=float(env.get("DEPLAI_REMEDIATION_RPS", DEFAULT_RATE_PER_SECOND)),
+            timeout_seconds=float(env.get("DEPLAI_REMEDIATION_TIMEOUT", DEFAULT_TIMEOUT_SECONDS)),
+            max_retries=int(env.get("DEPLAI_REMEDIATION_RETRIES", DEFAULT_MAX_RETRIES)),
+        )
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    # -------------------------
+    # One finding
+    # -------------------------
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, base * 2^attempt]
+        return random.uniform(0, self.backoff_seconds * (2 ** attempt))
+
+    def _fix_one(
+        self,
+        calls: ThreadPoolExecutor,
+        slots: threading.BoundedSemaphore,
+        finding: Any,
+        ctx: AgentContext,
+        deadline: Optional[float] = None,
+    ) -> Optional[str]:
+        error: Optional[BaseException] = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count("retries")
+                if self.telemetry is not None:
+                    self.telemetry.record_retry("remediation")
+                time.sleep(self._backoff(attempt - 1))
+            # Wall-time budget: no new call once it is spent
+            if deadline is not None and time.monotonic() >= deadline:
+                if not attempt:
+                    return None
+                break
+
+            # Abandoned calls hold their slot until they return, so the call
+            # pool never grows and a submitted call always gets a thread
+            if not slots.acquire(timeout=self.timeout_seconds):
+                self._count("timeouts")
+                error = TimeoutError(f"no call slot freed within {self.timeout_seconds}s")
+                logger.warning("Remediation attempt %d failed: %s", attempt + 1, error)
+                continue
+
+            self.bucket.acquire()
+            self._count("calls")
+            try:
+                call = calls.submit(self.remediator.request_fix, finding, ctx, timeout=self.timeout_seconds)
+            except BaseException:
+                slots.release()
+                raise
+            call.add_done_callback(lambda _: slots.release())
+            try:
+                return call.result(timeout=self.timeout_seconds)
+            except TimeoutError:
+                self._count("timeouts")
+                error = TimeoutError(f"no response within {self.timeout_seconds}s")
+            except Exception as e:
+                error = e
+            logger.warning("Remediation attempt %d failed: %s", attempt + 1, error)
+
+        self._count("failed")
+        if self.telemetry is not None:
+            self.telemetry.record_fallback("remediation", type(error).__name__)
+        return f"Error generating fix: {error}"
+
+    # -------------------------
+    # Fan-out
+    # -------------------------
+    def run(
+        self,
+        findings: Sequence[Any],
+        ctx: AgentContext,
+        on_result: Optional[Callable[[Any, str], None]] = None,
+        deadline: Optional[float] = None,
+    ) -> List[Optional[str]]:
+        """
+        Fix every finding; each fix is attached (evidence["ai_remediation"])
+        and passed to `on_result` as it completes. Returns fixes in input order.
+        Findings not started before `deadline` (time.monotonic()) are left
+        untouched: None in the result and listed in `self.skipped`.
+        """
+        self.skipped = []
+        if not findings:
+            return []
+
+        workers = min(self.max_workers, len(findings))
+        fixes: List[Optional[str]] = [None] * len(findings)
+
+        # Calls run on their own pool so an abandoned (timed-out) call never
+        # blocks the worker that is retrying it; `slots` caps running plus
+        # abandoned calls at the pool size
+        call_limit = workers * 2
+        calls = ThreadPoolExecutor(max_workers=call_limit, thread_name_prefix="remediation-call")
+        slots = threading.BoundedSemaphore(call_limit)
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="remediation") as pool:
+                pending: Dict[Future, int] = {
+                    pool.submit(self._fix_one, calls, slots, f, ctx, deadline): i for i, f in enumerate(findings)
+                }
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        i = pending.pop(future)
+                        fix = future.result()
+                        if fix is None:
+                            self.skipped.append(findings[i])
+                            continue
+                        fixes[i] = fix
+                        attach_fix(findings[i], fix)
+                        if on_result is not None:
+                            on_result(findings[i], fix)
+        finally:
+            calls.shutdown(wait=False, cancel_futures=True)
+
+        return fixes
@@ -0,0 +1,247 @@
+"""
+Remediation Cache
+=================
+
+Purpose:
+- Reuse a generated fix for the same rule on (near-)identical code
+  instead of paying for a fresh LLM call every time
+- Share one call between identical findings of the same scan (in-flight
+  deduplication: later requests wait for the first one)
+- Persist across scans in SQLite (WAL), evicting the least recently
+  used fixes beyond a size budget
+
+Key: rule_id + hash of normalize_code(snippet) + languages / frameworks
++ prompt version + model. Failed calls are never cached, and neither are
+findings without a code snippet (the key would be the rule alone).
+
+Location: DEPLAI_FIX_CACHE_DB, default <cache root>/fix_cache.sqlite3.
+Size: DEPLAI_FIX_CACHE_MAX_MB (default 256); 0 disables the cache.
+"""
+
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from agents.contracts import AgentContext
+from sast.cache import cache_root, stable_hash
+from sast.fingerprint import normalize_code
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Wait bound on someone else's in-flight call when the caller gives none
+DEFAULT_WAIT_SECONDS = 120.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fixes (
+    key         TEXT PRIMARY KEY,
+    fix         TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    stored_at   REAL NOT NULL,
+    accessed_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS fixes_accessed ON fixes (accessed_at);
+"""
+
+
+def default_db_path() -> Path:
+    return Path(os.environ.get("DEPLAI_FIX_CACHE_DB") or cache_root() / "fix_cache.sqlite3")
+
+
+def fix_cache_key(
+    rule_id: str,
+    snippet: str,
+    ctx: AgentContext,
+    prompt_version: str,
+    model: str = "",
+) -> str:
+    snippet_hash = hashlib.sha256(normalize_code(snippet or "").encode("utf-8")).hexdigest()
+    return stable_hash({
+        "rule_id": rule_id or "",
+        "snippet": snippet_hash,
+        "languages": sorted({str(l).lower() for l in ctx.languages or []}),
+        "frameworks": sorted({str(f).lower() for f in ctx.frameworks or []}),
+        "prompt": prompt_version,
+        "model": model,
+    })
+
+
+class FixCache:
+    """
+    Persistent fix cache with in-flight deduplication and hit metrics.
+    Safe to share between threads.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path) if path else default_db_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        self._inflight: Dict[str, Tuple[Future, float]] = {}  # key -> (call, started)
+        self._inflight_lock = threading.Lock()
+        self._stats = {"hits": 0, "shared": 0, "misses": 0, "errors": 0}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # -------------------------
+    # Storage
+    # -------------------------
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT fix FROM fixes WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE fixes SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return row[0] if row else None
+
+    def put(self, key: str, fix: str) -> None:
+        now = time.time()
+        size = len(fix.encode("utf-8"))
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                cur.execute(
+                    """
+                    INSERT INTO fixes (key, fix, size, stored_at, accessed_at) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (key) DO UPDATE SET
+                        fix = excluded.fix, size = excluded.size,
+                        stored_at = excluded.stored_at, accessed_at = excluded.accessed_at
+                    """,
+                    (key, fix, size, now, now),
+                )
+                self._evict(cur)
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+
+    def _evict(self, cur) -> None:
+        total = cur.execute("SELECT COALESCE(SUM(size), 0) FROM fixes").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Newest first; keep entries while the running total fits the budget
+        cur.execute(
+            """
+            DELETE FROM fixes WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, key) AS running
+                    FROM fixes
+                ) WHERE running > ?
+            )
+            """,
+            (self.max_bytes,),
+        )
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM fixes").fetchone()[0]
+
+    # -------------------------
+    # Lookup + in-flight dedup
+    # -------------------------
+    def get_or_compute(self, key: str, compute: Callable[[], str], timeout: Optional[float] = None) -> str:
+        return self.lookup(key, compute, timeout)[0]
+
+    def lookup(
+        self,
+        key: str,
+        compute: Callable[[], str],
+        timeout: Optional[float] = None,
+    ) -> Tuple[str, str]:
+        """
+        (fix, "hit" | "shared" | "miss"): the cached fix for `key`; otherwise
+        join an identical in-flight request or run `compute` (errors
+        propagate to every waiter, nothing is stored).
+
+        `timeout`: how long to wait on someone else's call (default
+        DEFAULT_WAIT_SECONDS). An in-flight call older than that was
+        abandoned by its caller and is replaced by a fresh one instead of
+        being joined.
+        """
+        if timeout is None:
+            timeout = DEFAULT_WAIT_SECONDS
+        now = time.monotonic()
+        with self._inflight_lock:
+            entry = self._inflight.get(key)
+            if entry is not None and now - entry[1] >= timeout:
+                entry = None
+            if entry is None:
+                cached = self.get(key)
+                if cached is not None:
+                    self._stats["hits"] += 1
+                    return cached, "hit"
+                running: Future = Future()
+                self._inflight[key] = (running, now)
+                owner = True
+                self._stats["misses"] += 1
+            else:
+                running = entry[0]
+                owner = False
+                self._stats["shared"] += 1
+
+        if not owner:
+            return running.result(timeout=timeout), "shared"
+
+        try:
+            fix = compute()
+        except BaseException as e:
+            with self._inflight_lock:
+                self._stats["errors"] += 1
+                self._release(key, running)
+            running.set_exception(e)
+            raise
+
+        self.put(key, fix)
+        with self._inflight_lock:
+            self._release(key, running)
+        running.set_result(fix)
+        return fix, "miss"
+
+    def _release(self, key: str, running: Future) -> None:
+        # A replacement call may own the key by now
+        entry = self._inflight.get(key)
+        if entry is not None and entry[0] is running:
+            del self._inflight[key]
+
+    def stats(self) -> Dict[str, float]:
+        with self._inflight_lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["shared"] + stats["misses"]
+        stats["lookups"] = lookups
+        # Only fixes served from the store; shared calls still cost one LLM call
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_default_cache: Optional[FixCache] = None
+_default_lock = threading.Lock()
+
+
+def default_fix_cache() -> Optional[FixCache]:
+    """
+    Process-wide cache configured from the environment (None if disabled).
+    """
+    global _default_cache
+    try:
+        max_mb = float(os.environ.get("DEPLAI_FIX_CACHE_MAX_MB", DEFAULT_MAX_BYTES / (1024 * 1024)))
+    except ValueError:
+        max_mb = DEFAULT_MAX_BYTES / (1024 * 1024)
+    if max_mb <= 0:
+        return None
+
+    with _default_lock:
+        if _default_cache is None or _default_cache.path != default_db_path():
+            _default_cache = FixCache()
+        _default_cache.max_bytes = int(max_mb * 1024 * 1024)
+        return _default_cache
@@ -1,30 +1,109 @@
-from typing import Dict, Union
+from typing import Dict, Optional, Union
 from agents.contracts import AgentContext
 from agents.llm_clients.openrouter_client import OpenRouterClient
+from agents.remediation.fix_cache import FixCache, fix_cache_key
+from agents.remediation.scheduler import compact_snippet
+from agents.telemetry import LLMTelemetry
 from sast.schema import Finding
 
+# Bump whenever build_prompt changes: cached fixes of an older prompt
+# are then never reused.
+PROMPT_VERSION = "1"
+
+NO_SNIPPET = "No snippet provided"
+
+
+def finding_fields(finding: Union[Finding, Dict]) -> Dict[str, str]:
+    if isinstance(finding, Finding):
+        title = finding.title
+        tool = finding.tool
+        rule_id = finding.rule_id
+        file_path = finding.file
+        evidence = finding.evidence or {}
+    else:
+        title = finding.get('title')
+        tool = finding.get('tool')
+        rule_id = finding.get('rule_id')
+        file_path = finding.get('file')
+        evidence = finding.get('evidence') or {}
+
+    return {
+        "title": title,
+        "tool": tool,
+        "rule_id": rule_id,
+        "file_path": file_path,
+        "code_snippet": evidence.get('code') or evidence.get('message') or NO_SNIPPET,
+    }
+
+
 class RemediationAgent:
-    def __init__(self, llm_client: OpenRouterClient):
+    def __init__(
+        self,
+        llm_client: OpenRouterClient,
+        cache: Optional[FixCache] = None,
+        max_snippet_tokens: Optional[int] = None,
+        telemetry: Optional[LLMTelemetry] = None,
+    ):
         self.llm = llm_client
+        self.cache = cache
+        self.telemetry = telemetry
+        # Set by the scheduler: oversized snippets are compacted in prompts
+        self.max_snippet_tokens = max_snippet_tokens
 
     def generate_fix(self, finding: Union[Finding, Dict], ctx: AgentContext) -> str:
         """
         Asks the LLM to generate a specific code fix for a finding.
         """
-        if isinstance(finding, Finding):
-            title = finding.title
-            tool = finding.tool
-            rule_id = finding.rule_id
-            file_path = finding.file
-            evidence = finding.evidence or {}
-        else:
-            title = finding.get('title')
-            tool = finding.get('tool')
-            rule_id = finding.get('rule_id')
-            file_path = finding.get('file')
-            evidence = finding.get('evidence') or {}
-
-        code_snippet = evidence.get('code') or evidence.get('message') or "No snippet provided"
+        try:
+            return self.request_fix(finding, ctx)
+        except Exception as e:
+            return f"Error generating fix: {str(e)}"
+
+    def request_fix(
+        self,
+        finding: Union[Finding, Dict],
+        ctx: AgentContext,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """
+        Same as generate_fix, but LLM errors propagate (for callers that
+        retry, e.g. the RemediationExecutor). `timeout`: the caller's per-call
+        timeout, passed to the LLM call and bounding the wait on a shared
+        in-flight call.
+        """
+        key = self.cache_key(finding, ctx)
+        if key is None:
+            return self._complete(self.build_prompt(finding, ctx), timeout)
+
+        fix, outcome = self.cache.lookup(key, lambda: self._complete(self.build_prompt(finding, ctx), timeout), timeout)
+        if self.telemetry is not None:
+            # A shared in-flight call is not a cache hit
+            self.telemetry.record_cache("remediation", outcome == "hit")
+        return fix
+
+    def cache_key(self, finding: Union[Finding, Dict], ctx: AgentContext) -> Optional[str]:
+        """
+        Fix cache key of a finding; None when its fix is never cached
+        (no cache, or no code snippet).
+        """
+        fields = finding_fields(finding)
+        if self.cache is None or fields["code_snippet"] == NO_SNIPPET:
+            return None
+        model = getattr(self.llm, "model", None) or type(self.llm).__name__
+        return fix_cache_key(fields["rule_id"], fields["code_snippet"], ctx, PROMPT_VERSION, str(model))
+
+    def _complete(self, prompt: str, timeout: Optional[float] = None) -> str:
+        if self.telemetry is not None:
+            return self.telemetry.timed_call("remediation", self.llm, prompt, timeout=timeout)
+        return self.llm.complete(prompt, timeout=timeout)
+
+    def build_prompt(self, finding: Union[Finding, Dict], ctx: AgentContext) -> str:
+        fields = finding_fields(finding)
+        title = fields["title"]
+        tool = fields["tool"]
+        rule_id = fields["rule_id"]
+        file_path = fields["file_path"]
+        code_snippet = compact_snippet(fields["code_snippet"], self.max_snippet_tokens)
 
         prompt = f"""
 You are an expert AppSec engineer.
@@ -49,7 +128,4 @@ Task:
 
 Output format: Markdown.
 """
-        try:
-            return self.llm.complete(prompt)
-        except Exception as e:
-            return f"Error generating fix: {str(e)}"
\ No newline at end of file
+        return prompt
\ No newline at end of file
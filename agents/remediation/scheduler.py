@@ -0,0 +1,213 @@
+"""
+Remediation Scheduler
+=====================
+
+Purpose:
+- Fix the riskiest findings first (sast.scoring table, same factors as
+  the intelligence layer)
+- Estimate each prompt's tokens and compact oversized snippets to a
+  per-snippet budget
+- Stop once the per-scan token / cost budget is spent; the wall-time
+  budget is enforced by the executor (deadline). Every finding left out
+  is recorded with the reason.
+- Fixes the fix cache will serve (already stored, or shared with an
+  identical finding scheduled earlier) cost no tokens
+
+    budget = RemediationBudget.from_env()
+    schedule = schedule_remediation(findings, remediator, ctx, budget)
+    executor.run(schedule.findings, ctx, deadline=budget.deadline())
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Set
+import math
+import os
+import time
+
+from agents.contracts import AgentContext
+from sast.scoring import rank_by_risk, score_batch
+
+# Rough chars-per-token of code / English prompts (no tokenizer dependency)
+CHARS_PER_TOKEN = 4
+DEFAULT_MAX_SNIPPET_TOKENS = 400
+# Expected size of one fix (explanation + rewritten snippet)
+DEFAULT_COMPLETION_TOKENS = 600
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+
+def compact_snippet(snippet: str, max_tokens: Optional[int]) -> str:
+    """
+    Strip trailing whitespace / blank runs; if still over `max_tokens`,
+    keep the head and tail lines around a truncation marker.
+    """
+    if not snippet:
+        return snippet
+    lines: List[str] = []
+    for line in snippet.splitlines():
+        line = line.rstrip()
+        if line or (lines and lines[-1]):
+            lines.append(line)
+    text = "\n".join(lines).strip("\n")
+    if not max_tokens or estimate_tokens(text) <= max_tokens:
+        return text
+
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    head: List[str] = []
+    tail: List[str] = []
+    used = 0
+    i, j = 0, len(lines) - 1
+    # Two thirds of the budget to the head (the flagged line usually
+    # starts the snippet), the rest to the tail
+    while i <= j and used + len(lines[i]) + 1 <= max_chars * 2 // 3:
+        used += len(lines[i]) + 1
+        head.append(lines[i])
+        i += 1
+    while j >= i and used + len(lines[j]) + 1 <= max_chars:
+        used += len(lines[j]) + 1
+        tail.append(lines[j])
+        j -= 1
+    if not head and not tail:
+        # One huge line
+        return text[: max_chars - 20] + " ... [truncated]"
+    dropped = j - i + 1
+    return "\n".join(head + [f"... [{dropped} lines truncated] ..."] + tail[::-1])
+
+
+@dataclass
+class RemediationBudget:
+    max_tokens: Optional[int] = None
+    max_cost_usd: Optional[float] = None
+    cost_per_1k_tokens: float = 0.0
+    max_seconds: Optional[float] = None
+    max_snippet_tokens: int = DEFAULT_MAX_SNIPPET_TOKENS
+    completion_tokens: int = DEFAULT_COMPLETION_TOKENS
+    started_at: float = field(default_factory=time.monotonic)
+
+    @classmethod
+    def from_env(cls) -> "RemediationBudget":
+        """
+        DEPLAI_REMEDIATION_MAX_TOKENS / _MAX_COST_USD / _COST_PER_1K /
+        _MAX_SECONDS / _SNIPPET_TOKENS (unset = unlimited).
+        """
+        env = os.environ
+
+        def number(name, cast):
+            value = env.get(name)
+            return cast(value) if value not in (None, "") else None
+
+        return cls(
+            max_tokens=number("DEPLAI_REMEDIATION_MAX_TOKENS", int),
+            max_cost_usd=number("DEPLAI_REMEDIATION_MAX_COST_USD", float),
+            cost_per_1k_tokens=number("DEPLAI_REMEDIATION_COST_PER_1K", float) or 0.0,
+            max_seconds=number("DEPLAI_REMEDIATION_MAX_SECONDS", float),
+            max_snippet_tokens=number("DEPLAI_REMEDIATION_SNIPPET_TOKENS", int) or DEFAULT_MAX_SNIPPET_TOKENS,
+        )
+
+    def cost(self, tokens: int) -> float:
+        return tokens / 1000 * self.cost_per_1k_tokens
+
+    def deadline(self) -> Optional[float]:
+        """
+        time.monotonic() deadline for the executor (None = no limit).
+        """
+        return self.started_at + self.max_seconds if self.max_seconds is not None else None
+
+
+@dataclass
+class RemediationSchedule:
+    findings: List[Any]
+    estimated_tokens: int
+    estimated_cost_usd: float
+    skipped: List[Dict[str, Any]]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "scheduled": len(self.findings),
+            "estimated_tokens": self.estimated_tokens,
+            "estimated_cost_usd": round(self.estimated_cost_usd, 6),
+            "skipped": self.skipped,
+        }
+
+
+def _get(finding: Any, key: str, default: Any = None) -> Any:
+    if isinstance(finding, dict):
+        return finding.get(key, default)
+    return getattr(finding, key, default)
+
+
+def skipped_entry(finding: Any, reason: str) -> Dict[str, Any]:
+    return {
+        "fingerprint": _get(finding, "fingerprint"),
+        "title": _get(finding, "title"),
+        "severity": _get(finding, "severity"),
+        "reason": reason,
+    }
+
+
+def finding_risk_scores(findings: Sequence[Any]) -> List[float]:
+    """
+    Risk score per finding (single tool, reachability unknown).
+    """
+    return score_batch(
+        [str(_get(f, "severity", "") or "").upper() for f in findings],
+        [str(_get(f, "confidence", "") or "").upper() for f in findings],
+        [str(_get(f, "category", "") or "").upper() for f in findings],
+        [1] * len(findings),
+        [bool(((_get(f, "evidence") or {}).get("triage") or {}).get("recently_changed")) for f in findings],
+        [None] * len(findings),
+    )
+
+
+def schedule_remediation(
+    findings: Sequence[Any],
+    remediator,
+    ctx: AgentContext,
+    budget: Optional[RemediationBudget] = None,
+) -> RemediationSchedule:
+    """
+    Order by risk, estimate tokens per prompt, stop at the token / cost
+    budget. Sets `remediator.max_snippet_tokens` so prompts are compacted.
+    """
+    budget = budget or RemediationBudget()
+    remediator.max_snippet_tokens = budget.max_snippet_tokens
+    cache = getattr(remediator, "cache", None)
+
+    order = rank_by_risk(finding_risk_scores(findings))
+    selected: List[Any] = []
+    skipped: List[Dict[str, Any]] = []
+    charged: Set[str] = set()
+    tokens = 0
+
+    for pos, i in enumerate(order):
+        finding = findings[i]
+        key = remediator.cache_key(finding, ctx) if cache is not None else None
+        if key is not None and (key in charged or cache.get(key) is not None):
+            cost_tokens = 0
+        else:
+            cost_tokens = estimate_tokens(remediator.build_prompt(finding, ctx)) + budget.completion_tokens
+            if key is not None:
+                charged.add(key)
+
+        reason = None
+        if budget.max_tokens is not None and tokens + cost_tokens > budget.max_tokens:
+            reason = "token_budget"
+        elif budget.max_cost_usd is not None and budget.cost(tokens + cost_tokens) > budget.max_cost_usd:
+            reason = "cost_budget"
+
+        if reason:
+            # Early stop: everything ranked below is skipped too
+            skipped.extend(skipped_entry(findings[k], reason) for k in order[pos:])
+            break
+
+        tokens += cost_tokens
+        selected.append(finding)
+
+    return RemediationSchedule(
+        findings=selected,
+        estimated_tokens=tokens,
+        estimated_cost_usd=budget.cost(tokens),
+        skipped=skipped,
+    )
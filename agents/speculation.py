@@ -0,0 +1,219 @@
+# agents/speculation.py
+"""
+Speculative Stage Execution
+===========================
+
+The LLM plan is merged with the FallbackPlanner base plan by AND, so it
+can only turn stages off. The base plan's repo stages can therefore be
+started while the planner is still thinking:
+
+    spec = SpeculativeScan(input, ctx, scope)
+    spec.start()                       # base-plan stages begin now
+    plan = enforce_plan(planner.plan(ctx), scope)
+    stages = spec.commit(plan)         # cancel what the plan disabled
+    result = run_security_checks(input, plan, scope, stages=stages, workspace=spec.workspace)
+    spec.close()
+
+Bounded by SpeculationPolicy: only stages listed there (SAST / SCA,
+read-only over the checkout) and at most `max_workers` at once. DAST is
+never speculated: it sends traffic to a live target and must wait for
+the final plan and scope checks.
+
+With a CostModel the base plan is sized first (stats of the fresh
+checkout), so the stages run with the knobs the final plan will most
+likely carry. A stage is reused when only its worker count changed
+(the findings are the same, only the speed differs; effective_tuning()
+reports what actually ran). A stage whose profile / backend the final
+plan changes is re-run ("retuned"); if it had already started it cannot
+be interrupted, so it finishes in the background and runs twice.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import os
+import shutil
+import threading
+
+from agents.contracts import AgentContext, ExecutionPlan, StageTuning
+from agents.planner.cost_model import CostModel, RepoStats, collect_repo_stats, pinned_knobs
+from agents.planner.planner_fallback import FallbackPlanner
+from sast import orchestrator
+from sast.scope import ScopePolicy, ScopeViolation, validate_repo_scope
+
+logger = logging.getLogger(__name__)
+
+# Repo stages that are safe to run before the plan is final
+SPECULATABLE_STAGES = ("sast", "sca")
+
+# Tuning fields a stage's result depends on
+STAGE_KNOBS = {
+    "sast": ("semgrep_profile",),
+    "sca": ("sca_backend",),
+}
+
+# Tuning fields that only change how fast a stage runs
+STAGE_WORKERS = {
+    "sast": "semgrep_jobs",
+    "sca": "sca_workers",
+}
+
+
+@dataclass(frozen=True)
+class SpeculationPolicy:
+    enabled: bool = True
+    stages: Tuple[str, ...] = SPECULATABLE_STAGES
+    max_workers: int = 2
+
+    @classmethod
+    def from_env(cls) -> "SpeculationPolicy":
+        """
+        DEPLAI_SPECULATE=0 disables; DEPLAI_SPECULATE_STAGES="sast,sca".
+        """
+        enabled = os.environ.get("DEPLAI_SPECULATE", "1").lower() not in ("0", "false", "no")
+        raw = os.environ.get("DEPLAI_SPECULATE_STAGES")
+        stages = tuple(s.strip() for s in raw.split(",") if s.strip()) if raw else SPECULATABLE_STAGES
+        return cls(enabled=enabled, stages=stages)
+
+
+def _plan_stages(plan: ExecutionPlan) -> List[str]:
+    return [name for name, on in (("sast", plan.run_sast), ("sca", plan.run_sca)) if on]
+
+
+def _knobs(name: str, tuning: Optional[StageTuning]) -> Optional[Tuple]:
+    return tuple(getattr(tuning, k) for k in STAGE_KNOBS[name]) if tuning is not None else None
+
+
+class SpeculativeScan:
+    """
+    Starts the base plan's repo stages ahead of the LLM plan.
+    """
+
+    def __init__(
+        self,
+        input: Dict[str, Any],
+        ctx: AgentContext,
+        scope: ScopePolicy,
+        policy: Optional[SpeculationPolicy] = None,
+        cost_model: Optional[CostModel] = None,
+    ):
+        self.input = input
+        self.ctx = ctx
+        self.scope = scope
+        self.policy = policy or SpeculationPolicy()
+        self.cost_model = cost_model
+
+        self.workspace: Optional[str] = None
+        self.repo_stats: Optional[RepoStats] = None
+        self.tuning: Optional[StageTuning] = None
+        self._is_temp_clone = False
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._futures: Dict[str, Future] = {}
+        self.stats: Dict[str, List[str]] = {
+            "started": [], "used": [], "cancelled": [], "discarded": [], "retuned": [],
+        }
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+    def start(self) -> "SpeculativeScan":
+        repo_input = self.input.get("repo_path")
+        if not self.policy.enabled or not repo_input or "run_id" not in self.input:
+            return self
+
+        base = FallbackPlanner().plan(self.ctx)
+        wanted = [
+            s for s in _plan_stages(base)
+            if s in self.policy.stages and s in SPECULATABLE_STAGES
+        ]
+        if not wanted:
+            return self
+
+        # Same scope gate the orchestrator applies; blocked repos are never touched
+        try:
+            validate_repo_scope(repo_input, self.scope)
+            self.workspace, self._is_temp_clone = orchestrator.resolve_repo(repo_input)
+        except (ScopeViolation, RuntimeError) as e:
+            logger.info("Speculation skipped: %s", e)
+            return self
+
+        if self.cost_model is not None:
+            self.repo_stats = collect_repo_stats(
+                self.workspace,
+                languages=self.input.get("languages", ["python"]),
+                targets=1 if self.ctx.has_public_endpoint else 0,
+            )
+            base = self.cost_model.size(
+                base, self.repo_stats, pinned=pinned_knobs(self.input, self.scope.safe_mode), allow_deep_dast=not self.scope.safe_mode
+            )
+            self.tuning = base.tuning
+        stage_input = orchestrator.apply_tuning(self.input, self.tuning)
+
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, min(self.policy.max_workers, len(wanted))),
+            thread_name_prefix="speculative",
+        )
+        for name in wanted:
+            runner = orchestrator.timed_stage(orchestrator.STAGE_RUNNERS[name])
+            self._futures[name] = self._pool.submit(runner, stage_input, self.workspace)
+            self.stats["started"].append(name)
+        return self
+
+    def commit(self, plan: ExecutionPlan) -> Dict[str, Future]:
+        """
+        Keep the speculative stages the final plan runs with the same
+        knobs (worker counts aside); cancel the rest (a stage already
+        running is left to finish and its result dropped).
+        """
+        keep = set(_plan_stages(plan))
+        stages: Dict[str, Future] = {}
+        for name, future in self._futures.items():
+            if name in keep and _knobs(name, plan.tuning) == _knobs(name, self.tuning):
+                stages[name] = future
+                self.stats["used"].append(name)
+            elif name in keep:
+                future.cancel()
+                self.stats["retuned"].append(name)
+            elif future.cancel():
+                self.stats["cancelled"].append(name)
+            else:
+                self.stats["discarded"].append(name)
+        return stages
+
+    def effective_tuning(self, tuning: Optional[StageTuning]) -> Optional[StageTuning]:
+        """
+        `tuning` with the worker counts the reused stages actually ran with.
+        """
+        if tuning is None or self.tuning is None:
+            return tuning
+        ran = {STAGE_WORKERS[name]: getattr(self.tuning, STAGE_WORKERS[name]) for name in self.stats["used"]}
+        return replace(tuning, **ran) if ran else tuning
+
+    def close(self) -> None:
+        """
+        Release the pool; a temp clone is removed once no stage uses it.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+        if not (self._is_temp_clone and self.workspace):
+            return
+        workspace = self.workspace
+        pending = [f for f in self._futures.values() if not f.done()]
+        if not pending:
+            shutil.rmtree(workspace, ignore_errors=True)
+            return
+
+        remaining = [len(pending)]
+        lock = threading.Lock()
+
+        def release(_future: Future) -> None:
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                shutil.rmtree(workspace, ignore_errors=True)
+
+        for future in pending:
+            future.add_done_callback(release)
@@ -0,0 +1,215 @@
+"""
+LLM Telemetry
+=============
+
+Purpose:
+- One per-scan recorder for every LLM-backed stage (planner, remediation)
+- Latency histogram (fixed buckets, mergeable across scans), prompt /
+  completion tokens, retries, errors, cache hits and fallback reasons
+- Aggregated into the scan result as result["telemetry"]["llm"], which
+  the control plane stores and serves (GET /scans/{id}/telemetry,
+  GET /telemetry/llm)
+
+    telemetry = LLMTelemetry()
+    text = telemetry.timed_call("planner", client, prompt, timeout=20)
+    telemetry.record_fallback("planner", "PlannerError")
+    telemetry.snapshot()
+
+Token counts come from the client's usage report (OpenRouterClient
+.last_metrics); backends without one (replay) are estimated at ~4 chars
+per token and flagged "tokens_estimated".
+"""
+
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, List, Optional
+import math
+import threading
+import time
+
+# Upper bounds (seconds); the last bucket is +Inf
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CHARS_PER_TOKEN = 4
+
+
+def bucket_label(index: int) -> str:
+    return f"{LATENCY_BUCKETS[index]:g}" if index < len(LATENCY_BUCKETS) else "+Inf"
+
+
+def histogram_quantile(counts: List[int], q: float) -> float:
+    """
+    Upper bound of the bucket holding quantile `q` (Inf-bucket -> last bound).
+    """
+    total = sum(counts)
+    if not total:
+        return 0.0
+    rank = math.ceil(q * total)
+    seen = 0
+    for index, count in enumerate(counts):
+        seen += count
+        if seen >= rank:
+            return LATENCY_BUCKETS[min(index, len(LATENCY_BUCKETS) - 1)]
+    return LATENCY_BUCKETS[-1]
+
+
+class _StageStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.tokens_estimated = False
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.fallbacks: Counter = Counter()
+
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "tokens_estimated": self.tokens_estimated,
+            "latency": {
+                "buckets": {bucket_label(i): c for i, c in enumerate(self.latency_counts)},
+                "count": sum(self.latency_counts),
+                "sum": round(self.latency_sum, 4),
+                "max": round(self.latency_max, 4),
+                "p50": histogram_quantile(self.latency_counts, 0.50),
+                "p95": histogram_quantile(self.latency_counts, 0.95),
+            },
+            "cache": {
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "hit_rate": round(self.cache_hits / lookups, 4) if lookups else 0.0,
+            },
+            "fallbacks": dict(self.fallbacks),
+        }
+
+
+class LLMTelemetry:
+    """
+    Thread-safe per-scan recorder (remediation calls run concurrently).
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, _StageStats] = {}
+        self._lock = threading.Lock()
+
+    def _stage(self, stage: str) -> _StageStats:
+        stats = self._stages.get(stage)
+        if stats is None:
+            stats = self._stages[stage] = _StageStats()
+        return stats
+
+    # -------------------------
+    # Recording
+    # -------------------------
+    def record_call(
+        self,
+        stage: str,
+        latency_seconds: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        retries: int = 0,
+        error: Optional[str] = None,
+        tokens_estimated: bool = False,
+    ) -> None:
+        with self._lock:
+            stats = self._stage(stage)
+            stats.calls += 1
+            stats.errors += error is not None
+            stats.retries += retries
+            stats.prompt_tokens += prompt_tokens
+            stats.completion_tokens += completion_tokens
+            stats.tokens_estimated |= tokens_estimated
+            stats.latency_counts[bisect_left(LATENCY_BUCKETS, latency_seconds)] += 1
+            stats.latency_sum += latency_seconds
+            stats.latency_max = max(stats.latency_max, latency_seconds)
+
+    def record_retry(self, stage: str, count: int = 1) -> None:
+        """
+        Caller-level retries (a new LLM call after a failed one).
+        """
+        with self._lock:
+            self._stage(stage).retries += count
+
+    def record_cache(self, stage: str, hit: bool) -> None:
+        with self._lock:
+            stats = self._stage(stage)
+            if hit:
+                stats.cache_hits += 1
+            else:
+                stats.cache_misses += 1
+
+    def record_fallback(self, stage: str, reason: str) -> None:
+        """
+        The stage gave up on the LLM (`reason`: short, low-cardinality,
+        e.g. an exception class name).
+        """
+        with self._lock:
+            self._stage(stage).fallbacks[reason] += 1
+
+    def timed_call(self, stage: str, client, prompt: str, **kwargs) -> str:
+        """
+        client.complete(prompt, **kwargs), recorded under `stage`.
+        """
+        started = time.monotonic()
+        text: Optional[str] = None
+        error: Optional[str] = None
+        try:
+            text = client.complete(prompt, **kwargs)
+            return text
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            latency = time.monotonic() - started
+            usage = client.last_metrics() if hasattr(client, "last_metrics") else None
+            if usage:
+                self.record_call(
+                    stage,
+                    latency,
+                    prompt_tokens=usage.get("prompt_tokens", 0),
+                    completion_tokens=usage.get("completion_tokens", 0),
+                    retries=usage.get("retries", 0),
+                    error=error,
+                )
+            else:
+                self.record_call(
+                    stage,
+                    latency,
+                    prompt_tokens=math.ceil(len(prompt) / CHARS_PER_TOKEN),
+                    completion_tokens=math.ceil(len(text or "") / CHARS_PER_TOKEN),
+                    error=error,
+                    tokens_estimated=True,
+                )
+
+    # -------------------------
+    # Reporting
+    # -------------------------
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {name: stats.to_dict() for name, stats in self._stages.items()}
+        return {
+            "stages": stages,
+            "total": {
+                key: sum(s[key] for s in stages.values())
+                for key in ("calls", "errors", "retries", "prompt_tokens", "completion_tokens")
+            },
+        }
+
+    def summary_line(self) -> str:
+        snap = self.snapshot()["stages"]
+        return " | ".join(
+            f"{name}: {s['calls']} call(s), p95 ≤{s['latency']['p95']:g}s, "
+            f"{s['prompt_tokens'] + s['completion_tokens']} tokens"
+            + (f", fallbacks {s['fallbacks']}" if s["fallbacks"] else "")
+            for name, s in snap.items()
+        )
@@ -0,0 +1,122 @@
+"""
+Changed Files / Lines
+=====================
+
+Purpose:
+- Parse a unified diff into per-file changed-line ranges (added or
+  modified lines on the new side)
+- Answer "is file:line changed?" with an interval index: per file the
+  ranges are merged and sorted once, each lookup is one bisect
+"""
+
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import re
+
+from sast.context import relative_path
+
+_HUNK = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+Range = Tuple[int, int]
+
+
+def _diff_path(header: str) -> Optional[str]:
+    path = header[4:].split("\t", 1)[0].strip()
+    if path == "/dev/null":
+        return None
+    if path.startswith(("a/", "b/")):
+        path = path[2:]
+    return path
+
+
+def parse_unified_diff(diff: str) -> Dict[str, List[Range]]:
+    """
+    {new path: [(first, last) changed line ranges]} for `git diff` output.
+    Deleted files are left out; pure deletions inside a file mark nothing.
+    """
+    changed: Dict[str, List[Range]] = {}
+    path: Optional[str] = None
+    old_left = new_left = 0  # lines still to read in the current hunk
+    line = 0
+    start: Optional[int] = None
+
+    for text in diff.splitlines():
+        if old_left > 0 or new_left > 0:
+            marker = text[:1]
+            if marker == "+":
+                if start is None:
+                    start = line
+                line += 1
+                new_left -= 1
+                continue
+            if start is not None and path is not None:
+                changed[path].append((start, line - 1))
+            start = None
+            if marker == "-":
+                old_left -= 1
+            elif marker in (" ", ""):
+                line += 1
+                old_left -= 1
+                new_left -= 1
+            continue
+
+        if start is not None and path is not None:
+            changed[path].append((start, line - 1))
+            start = None
+
+        if text.startswith("+++ "):
+            path = _diff_path(text)
+            if path is not None:
+                changed.setdefault(path, [])
+            continue
+        hunk = _HUNK.match(text)
+        if hunk:
+            old_left = int(hunk.group(2) or 1)
+            new_left = int(hunk.group(4) or 1)
+            line = int(hunk.group(3))
+
+    if start is not None and path is not None:
+        changed[path].append((start, line - 1))
+    return changed
+
+
+class ChangedLines:
+    """
+    Interval index over changed-line ranges, keyed by repo-relative path.
+    """
+
+    def __init__(self, ranges: Optional[Dict[str, Sequence[Range]]] = None, repo_root: Optional[str] = None):
+        self.repo_root = repo_root
+        self._starts: Dict[str, List[int]] = {}
+        self._ends: Dict[str, List[int]] = {}
+        for path, spans in (ranges or {}).items():
+            self.add(path, spans)
+
+    def add(self, path: str, spans: Iterable[Range]) -> None:
+        rel = relative_path(path, self.repo_root)
+        spans = [(int(a), int(b)) for a, b in spans]
+        spans.extend(zip(self._starts.get(rel, ()), self._ends.get(rel, ())))
+        merged: List[List[int]] = []
+        for first, last in sorted(spans):
+            if merged and first <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], last)
+            else:
+                merged.append([first, last])
+        self._starts[rel] = [m[0] for m in merged]
+        self._ends[rel] = [m[1] for m in merged]
+
+    def __contains__(self, rel_path: str) -> bool:
+        return bool(self._starts.get(rel_path))
+
+    def contains(self, rel_path: str, line: int) -> bool:
+        """
+        True if `line` of the (already repo-relative) path was changed.
+        """
+        starts = self._starts.get(rel_path)
+        if not starts or line <= 0:
+            return False
+        i = bisect_right(starts, line) - 1
+        return i >= 0 and line <= self._ends[rel_path][i]
+
+    def __bool__(self) -> bool:
+        return bool(self._starts)
@@ -1,35 +1,108 @@
-from typing import List
+from typing import Dict, List, Optional, Sequence, Tuple
+import os
+from urllib.parse import urlparse
+
 from agents.contracts import AgentContext
+from agents.triage.changes import ChangedLines
+from sast.codeowners import GlobTrie
+from sast.context import relative_path
 from sast.schema import Finding
 
-def triage_findings(findings: List[Finding], ctx: AgentContext) -> List[Finding]:
+DEFAULT_TEAM = "Security"
+
+# CODEOWNERS-style (pattern, team); the last matching rule wins
+DEFAULT_TEAM_RULES: Tuple[Tuple[str, str], ...] = (
+    ("*.py", "Backend"),
+    ("*api*", "Backend"),
+    ("*frontend*", "Frontend"),
+)
+
+
+class TriageEngine:
+    """
+    Compiled once per scan: normalized changed-file set, team-rule glob
+    trie and changed-line interval index. Per-file facts are memoized, so
+    each finding costs a dict lookup plus (at most) one bisect.
+    """
+
+    def __init__(
+        self,
+        changed_files: Sequence[str] = (),
+        changed_lines: Optional[Dict[str, Sequence[Tuple[int, int]]]] = None,
+        team_rules: Sequence[Tuple[str, str]] = DEFAULT_TEAM_RULES,
+        repo_root: Optional[str] = None,
+        default_team: str = DEFAULT_TEAM,
+    ):
+        self.repo_root = repo_root
+        self.changed = {relative_path(p, repo_root) for p in changed_files} - {""}
+        self.lines = ChangedLines(changed_lines, repo_root=repo_root)
+        self.teams = [team for _, team in team_rules]
+        self.trie = GlobTrie([pattern for pattern, _ in team_rules])
+        self.default_team = default_team
+        self._files: Dict[str, Tuple[str, bool, str]] = {}
+        self._relative: Dict[str, Tuple[str, bool, str]] = {}
+
+    @classmethod
+    def from_context(cls, ctx: AgentContext, **kwargs) -> "TriageEngine":
+        # Local checkouts: absolute finding paths are made repo-relative
+        root = ctx.repo if ctx.repo and os.path.isdir(ctx.repo) else None
+        return cls(
+            changed_files=ctx.changed_files or (),
+            changed_lines=getattr(ctx, "changed_lines", None),
+            repo_root=root,
+            **kwargs,
+        )
+
+    def file_facts(self, path: str) -> Tuple[str, bool, str]:
+        """
+        (repo-relative path, recently changed, team), memoized per raw path.
+        """
+        facts = self._files.get(path)
+        if facts is None:
+            rel = relative_path(path, self.repo_root)
+            # "./a.py" and "a.py" share one evaluation
+            facts = self._relative.get(rel) if rel else None
+            if facts is None:
+                # Endpoints (DAST) are owned by their URL path
+                owned = rel or urlparse(path).path.strip("/")
+                index = self.trie.match(owned) if owned else -1
+                facts = (
+                    rel,
+                    rel in self.changed or rel in self.lines,
+                    self.teams[index] if index >= 0 else self.default_team,
+                )
+                if rel:
+                    self._relative[rel] = facts
+            self._files[path] = facts
+        return facts
+
+    def triage(self, finding: Finding) -> Dict:
+        rel, is_recent, team = self.file_facts(finding.file or "")
+        return {
+            "recently_changed": is_recent,
+            "changed_line": is_recent and self.lines.contains(rel, finding.line or 0),
+            "priority_boost": "HIGH" if is_recent else "NONE",
+            "suggested_team": team,
+        }
+
+
+def triage_findings(
+    findings: List[Finding],
+    ctx: AgentContext,
+    engine: Optional[TriageEngine] = None,
+) -> List[Finding]:
     """
     Enrich findings with triage metadata:
-    1. recently_changed: Did this finding occur in a file changed in the PR?
-    2. ownership: (Placeholder) Who owns this code?
+    1. recently_changed: Does this finding's file belong to the PR?
+       changed_line: Does it sit on a line the PR diff changed?
+    2. suggested_team: Owning team from the CODEOWNERS-style team rules.
     """
-    
-    changed_set = set(ctx.changed_files) if ctx.changed_files else set()
+    engine = engine or TriageEngine.from_context(ctx)
+    triage = engine.triage
 
     for finding in findings:
-        # 1. Check for recent changes
-        is_recent = False
-        if finding.file and finding.file in changed_set:
-            is_recent = True
-        
         if finding.evidence is None:
             finding.evidence = {}
-            
-        finding.evidence["triage"] = {
-            "recently_changed": is_recent,
-            "priority_boost": "HIGH" if is_recent else "NONE"
-        }
-
-        # 2. Logic for Ownership
-        finding.evidence["triage"]["suggested_team"] = "Security"
-        if "frontend" in str(finding.file):
-             finding.evidence["triage"]["suggested_team"] = "Frontend"
-        elif "api" in str(finding.file) or ".py" in str(finding.file):
-             finding.evidence["triage"]["suggested_team"] = "Backend"
+        finding.evidence["triage"] = triage(finding)
 
-    return findings
\ No newline at end of file
+    return findings
@@ -3,11 +3,12 @@ import json
 import docker
 import uuid
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query
 from sqlmodel import SQLModel, Session, create_engine, select
 from pydantic import BaseModel
 from typing import List, Optional, Dict
 from api.models import Scan
+from api.telemetry import rollup, scan_llm_telemetry
 
 # 1. Database Setup
 DATABASE_URL = os.environ.get("DATABASE_URL")
@@ -76,6 +77,13 @@ def trigger_scan(req: ScanRequest, session: Session = Depends(get_session)):
             environment={
                 "OPENROUTER_API_KEY": os.environ.get("OPENROUTER_API_KEY"),
                 "SCAN_INPUT_JSON": json.dumps(worker_input)
+            },
+            # Pinned Grype DB snapshot, shared read-only across workers
+            volumes={
+                os.environ.get("GRYPE_DB_VOLUME", "deplai-grype-db"): {
+                    "bind": "/var/lib/deplai/grype-db",
+                    "mode": "ro",
+                }
             }
         )
         return {"scan_id": scan_id, "status": "started"}
@@ -105,4 +113,23 @@ def get_scan(scan_id: str, session: Session = Depends(get_session)):
     scan = session.get(Scan, scan_id)
     if not scan:
         raise HTTPException(404, "Scan not found")
-    return scan
\ No newline at end of file
+    return scan
+
+# LLM telemetry (latency histograms, tokens, retries, cache hits, fallbacks)
+@app.get("/scans/{scan_id}/telemetry")
+def get_scan_telemetry(scan_id: str, session: Session = Depends(get_session)):
+    scan = session.get(Scan, scan_id)
+    if not scan:
+        raise HTTPException(404, "Scan not found")
+    return {"scan_id": scan_id, "status": scan.status, "llm": scan_llm_telemetry(scan.raw_results)}
+
+@app.get("/telemetry/llm")
+def get_llm_telemetry(limit: int = Query(100, ge=1, le=1000), session: Session = Depends(get_session)):
+    """Rollup over the most recent completed scans."""
+    scans = session.exec(
+        select(Scan)
+        .where(Scan.status == "completed")
+        .order_by(Scan.created_at.desc())
+        .limit(limit)
+    ).all()
+    return rollup([scan.raw_results for scan in scans])
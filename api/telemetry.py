@@ -0,0 +1,81 @@
+"""
+Cross-scan LLM telemetry rollup for the control plane.
+
+Workers report result["telemetry"]["llm"] (see agents/telemetry.py);
+histogram buckets use the same fixed bounds, so merging is a plain sum.
+Self-contained: the API image ships only the api/ package.
+"""
+
+from typing import Any, Dict, Iterable, List
+import math
+
+COUNTERS = ("calls", "errors", "retries", "prompt_tokens", "completion_tokens")
+
+
+def _quantile(buckets: Dict[str, int], q: float) -> float:
+    bounds = sorted(
+        ((math.inf if label == "+Inf" else float(label)), count) for label, count in buckets.items()
+    )
+    total = sum(count for _, count in bounds)
+    if not total:
+        return 0.0
+    rank = math.ceil(q * total)
+    finite = [b for b, _ in bounds if b != math.inf]
+    seen = 0
+    for bound, count in bounds:
+        seen += count
+        if seen >= rank:
+            return bound if bound != math.inf else (finite[-1] if finite else 0.0)
+    return finite[-1] if finite else 0.0
+
+
+def merge_llm_telemetry(snapshots: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Sum per-stage counters, latency buckets, cache lookups and fallback
+    reasons over many scan snapshots.
+    """
+    stages: Dict[str, Dict[str, Any]] = {}
+    scans = 0
+    for snap in snapshots:
+        if not snap:
+            continue
+        scans += 1
+        for name, stage in (snap.get("stages") or {}).items():
+            out = stages.setdefault(name, {
+                **{key: 0 for key in COUNTERS},
+                "latency": {"buckets": {}, "count": 0, "sum": 0.0, "max": 0.0},
+                "cache": {"hits": 0, "misses": 0},
+                "fallbacks": {},
+            })
+            for key in COUNTERS:
+                out[key] += stage.get(key, 0)
+            latency = stage.get("latency") or {}
+            for label, count in (latency.get("buckets") or {}).items():
+                out["latency"]["buckets"][label] = out["latency"]["buckets"].get(label, 0) + count
+            out["latency"]["count"] += latency.get("count", 0)
+            out["latency"]["sum"] += latency.get("sum", 0.0)
+            out["latency"]["max"] = max(out["latency"]["max"], latency.get("max", 0.0))
+            cache = stage.get("cache") or {}
+            out["cache"]["hits"] += cache.get("hits", 0)
+            out["cache"]["misses"] += cache.get("misses", 0)
+            for reason, count in (stage.get("fallbacks") or {}).items():
+                out["fallbacks"][reason] = out["fallbacks"].get(reason, 0) + count
+
+    for out in stages.values():
+        latency = out["latency"]
+        latency["sum"] = round(latency["sum"], 4)
+        latency["mean"] = round(latency["sum"] / latency["count"], 4) if latency["count"] else 0.0
+        latency["p50"] = _quantile(latency["buckets"], 0.50)
+        latency["p95"] = _quantile(latency["buckets"], 0.95)
+        lookups = out["cache"]["hits"] + out["cache"]["misses"]
+        out["cache"]["hit_rate"] = round(out["cache"]["hits"] / lookups, 4) if lookups else 0.0
+
+    return {"scans": scans, "stages": stages}
+
+
+def scan_llm_telemetry(raw_results: Dict[str, Any]) -> Dict[str, Any]:
+    return ((raw_results or {}).get("telemetry") or {}).get("llm") or {}
+
+
+def rollup(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return merge_llm_telemetry(scan_llm_telemetry(r) for r in results)
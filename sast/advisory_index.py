@@ -0,0 +1,443 @@
+"""
+Local Advisory Index (in-process SCA backend)
+============================================
+
+Purpose:
+- Convert a local OSV dataset into ONE sorted, memory-mapped index file
+  keyed by (ecosystem, package)
+- Match SBOM components against affected version ranges in-process,
+  producing the same `matches` shape as `grype -o json` so normalize_osv
+  consumes it unchanged
+
+The index is opened read-only with mmap, so every worker process on a
+host shares the same page-cache copy; per-process state is a bounded
+LRU of decoded package records.
+
+File layout (little endian):
+
+    header   magic(8) count(u32) reserved(u32) hashes(u64) table(u64) data(u64)
+    hashes   count x u64     blake2b-64 of each key, sorted
+    table    count x (key_off u64, key_len u32, rec_off u64, rec_len u32)
+    data     keys blob, then JSON records (one list of advisories per key)
+"""
+
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import unquote
+import bisect
+import hashlib
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import zipfile
+
+from sast.versions import version_key
+
+MAGIC = b"DPLOSV01"
+HEADER = struct.Struct("<8sIIQQQ")
+ENTRY = struct.Struct("<QIQI")
+
+DEFAULT_INDEX_PATH = "/var/lib/deplai/osv/advisories.idx"
+MATCHER_NAME = "deplai-osv-index"
+
+
+class AdvisoryIndexError(RuntimeError):
+    pass
+
+
+# -------------------------
+# Keys
+# -------------------------
+PURL_ECOSYSTEMS = {
+    "pypi": "PyPI",
+    "npm": "npm",
+    "golang": "Go",
+    "maven": "Maven",
+    "cargo": "crates.io",
+    "composer": "Packagist",
+    "gem": "RubyGems",
+    "nuget": "NuGet",
+    "hex": "Hex",
+    "pub": "Pub",
+}
+
+# Grype artifact.type for components without a Syft type property
+PURL_ARTIFACT_TYPES = {
+    "pypi": "python",
+    "npm": "npm",
+    "golang": "go-module",
+    "maven": "java-archive",
+    "cargo": "rust-crate",
+    "composer": "php-composer",
+    "gem": "gem",
+    "nuget": "dotnet",
+}
+
+
+def package_key(ecosystem: str, name: str) -> bytes:
+    ecosystem = ecosystem.split(":", 1)[0]  # "Debian:11" -> "Debian"
+    if ecosystem == "PyPI":
+        name = re.sub(r"[-_.]+", "-", name)
+    return f"{ecosystem.lower()}\0{name.lower()}".encode("utf-8")
+
+
+def key_hash(key: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def parse_purl(purl: str) -> Optional[Tuple[str, str, str]]:
+    """
+    "pkg:npm/%40scope/name@1.0.0" -> ("npm", "@scope/name", "1.0.0")
+    """
+    if not purl or not purl.startswith("pkg:"):
+        return None
+    body = purl[4:].split("#", 1)[0].split("?", 1)[0]
+    if "/" not in body:
+        return None
+    purl_type, rest = body.split("/", 1)
+    rest, _, version = rest.rpartition("@") if "@" in rest else (rest, "", "")
+    if "%" in rest:
+        segments = [unquote(s) for s in rest.split("/") if s]
+    else:
+        segments = [s for s in rest.split("/") if s]
+    if not segments:
+        return None
+
+    purl_type = purl_type.lower()
+    if purl_type == "maven" and len(segments) >= 2:
+        name = f"{segments[-2]}:{segments[-1]}"
+    else:
+        name = "/".join(segments)
+    return purl_type, name, unquote(version) if "%" in version else version
+
+
+# -------------------------
+# Severity
+# -------------------------
+_CVSS3 = {
+    "AV": {"N": 0.85, "A": 0.62, "L": 0.55, "P": 0.2},
+    "AC": {"L": 0.77, "H": 0.44},
+    "UI": {"N": 0.85, "R": 0.62},
+    "CIA": {"H": 0.56, "L": 0.22, "N": 0.0},
+}
+
+
+def cvss3_base_score(vector: str) -> Optional[float]:
+    try:
+        m = dict(p.split(":", 1) for p in vector.split("/")[1:])
+        changed = m["S"] == "C"
+        pr = {"N": 0.85, "L": 0.68 if changed else 0.62, "H": 0.5 if changed else 0.27}[m["PR"]]
+        iss = 1 - (
+            (1 - _CVSS3["CIA"][m["C"]]) * (1 - _CVSS3["CIA"][m["I"]]) * (1 - _CVSS3["CIA"][m["A"]])
+        )
+        impact = 7.52 * (iss - 0.029) - 3.25 * (iss - 0.02) ** 15 if changed else 6.42 * iss
+        exploitability = 8.22 * _CVSS3["AV"][m["AV"]] * _CVSS3["AC"][m["AC"]] * pr * _CVSS3["UI"][m["UI"]]
+    except (KeyError, ValueError):
+        return None
+
+    if impact <= 0:
+        return 0.0
+    total = (1.08 if changed else 1.0) * (impact + exploitability)
+    return math.ceil(min(total, 10.0) * 10) / 10
+
+
+def severity_label(score: float) -> str:
+    if score >= 9.0:
+        return "Critical"
+    if score >= 7.0:
+        return "High"
+    if score >= 4.0:
+        return "Medium"
+    if score > 0:
+        return "Low"
+    return "Negligible"
+
+
+def osv_severity(vuln: Dict[str, Any], affected: Dict[str, Any]) -> str:
+    for source in (vuln.get("database_specific"), affected.get("ecosystem_specific"), affected.get("database_specific")):
+        label = (source or {}).get("severity")
+        if isinstance(label, str) and label:
+            label = label.capitalize()
+            return "Medium" if label == "Moderate" else label
+
+    for entry in vuln.get("severity", []):
+        if entry.get("type") == "CVSS_V3":
+            score = cvss3_base_score(entry.get("score", ""))
+            if score is not None:
+                return severity_label(score)
+
+    return "Unknown"
+
+
+# -------------------------
+# Index build
+# -------------------------
+def iter_osv_records(sources: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    OSV JSON documents from directories, .zip exports or single files.
+    """
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            for file in sorted(path.rglob("*.json")):
+                with open(file, "rb") as f:
+                    yield json.load(f)
+        elif zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as archive:
+                for member in archive.namelist():
+                    if member.endswith(".json"):
+                        yield json.loads(archive.read(member))
+        else:
+            with open(path, "rb") as f:
+                yield json.load(f)
+
+
+def compile_advisory(vuln: Dict[str, Any], affected: Dict[str, Any]) -> Optional[list]:
+    """
+    Compact record: [id, severity, source, ranges, versions]
+    where ranges are event lists [[kind, version], ...] pre-sorted by version.
+    """
+    ranges = []
+    for r in affected.get("ranges", []):
+        if r.get("type") not in ("ECOSYSTEM", "SEMVER"):
+            continue
+        events = []
+        for ev in r.get("events", []):
+            for kind in ("introduced", "fixed", "last_affected"):
+                if kind in ev:
+                    events.append([kind, str(ev[kind])])
+        events.sort(key=lambda e: (e[1] != "0", version_key(e[1]) if e[1] != "0" else ()))
+        if events:
+            ranges.append(events)
+
+    versions = [str(v) for v in affected.get("versions", [])]
+    if not ranges and not versions:
+        return None
+
+    vuln_id = vuln.get("id", "UNKNOWN")
+    cve = next((a for a in vuln.get("aliases", []) if a.startswith("CVE-")), None)
+    return [
+        cve or vuln_id,
+        osv_severity(vuln, affected),
+        f"https://osv.dev/vulnerability/{vuln_id}",
+        ranges,
+        versions,
+    ]
+
+
+def build_index(sources: Iterable[str], index_path: str) -> Dict[str, Any]:
+    """
+    Convert OSV documents into the sorted memory-mappable index file.
+    """
+    by_key: Dict[bytes, List[list]] = defaultdict(list)
+    documents = 0
+
+    for vuln in iter_osv_records(sources):
+        documents += 1
+        if vuln.get("withdrawn"):
+            continue
+        for affected in vuln.get("affected", []):
+            pkg = affected.get("package", {})
+            if not pkg.get("ecosystem") or not pkg.get("name"):
+                continue
+            record = compile_advisory(vuln, affected)
+            if record:
+                by_key[package_key(pkg["ecosystem"], pkg["name"])].append(record)
+
+    keys = sorted(by_key, key=lambda k: (key_hash(k), k))
+    count = len(keys)
+
+    hashes_off = HEADER.size
+    table_off = hashes_off + 8 * count
+    data_off = table_off + ENTRY.size * count
+
+    keys_blob = bytearray()
+    records_blob = bytearray()
+    entries = []
+    for key in keys:
+        record = json.dumps(by_key[key], separators=(",", ":")).encode("utf-8")
+        entries.append((len(keys_blob), len(key), len(records_blob), len(record)))
+        keys_blob += key
+        records_blob += record
+
+    records_off = data_off + len(keys_blob)
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    Path(index_path).parent.mkdir(parents=True, exist_ok=True)
+
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, count, 0, hashes_off, table_off, data_off))
+        f.write(struct.pack(f"<{count}Q", *(key_hash(k) for k in keys)))
+        for key_off, key_len, rec_off, rec_len in entries:
+            f.write(ENTRY.pack(data_off + key_off, key_len, records_off + rec_off, rec_len))
+        f.write(keys_blob)
+        f.write(records_blob)
+    os.replace(tmp_path, index_path)
+
+    return {"documents": documents, "packages": count, "bytes": os.path.getsize(index_path)}
+
+
+# -------------------------
+# Matching
+# -------------------------
+def is_affected(version: str, events: List[list]) -> bool:
+    """
+    OSV range evaluation over events pre-sorted by version.
+    """
+    v = version_key(version)
+    affected = False
+    for kind, at in events:
+        if kind == "introduced" and at == "0":
+            affected = True
+            continue
+        k = version_key(at)
+        if v < k:
+            break
+        if kind == "introduced":
+            affected = True
+        elif kind == "fixed":
+            affected = False
+        elif kind == "last_affected" and v > k:
+            affected = False
+    return affected
+
+
+class AdvisoryIndex:
+    """
+    Read-only, memory-mapped view of an index built by build_index().
+    """
+
+    def __init__(self, index_path: Optional[str] = None, cache_size: int = 4096):
+        self.path = index_path or os.environ.get("DEPLAI_OSV_INDEX") or DEFAULT_INDEX_PATH
+        try:
+            self._file = open(self.path, "rb")
+        except OSError as e:
+            raise AdvisoryIndexError(f"Advisory index not found at {self.path}: {e}")
+
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, _, hashes_off, table_off, _ = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise AdvisoryIndexError(f"Not an advisory index: {self.path}")
+
+        self._table_off = table_off
+        self._hashes = memoryview(self._mm)[hashes_off:hashes_off + 8 * self.count].cast("Q")
+        # Shared across SCA worker threads (get_advisory_index): the LRU is
+        # only touched under the lock; the mmap reads need none
+        self._cache: "OrderedDict[bytes, List[list]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_lock = threading.Lock()
+
+    def close(self) -> None:
+        self._hashes.release()
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def lookup(self, ecosystem: str, name: str) -> List[list]:
+        """
+        All compiled advisories for a package (empty list if none).
+        """
+        key = package_key(ecosystem, name)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        records: List[list] = []
+        h = key_hash(key)
+        i = bisect.bisect_left(self._hashes, h)
+        while i < self.count and self._hashes[i] == h:
+            key_off, key_len, rec_off, rec_len = ENTRY.unpack_from(self._mm, self._table_off + i * ENTRY.size)
+            if self._mm[key_off:key_off + key_len] == key:
+                records = json.loads(self._mm[rec_off:rec_off + rec_len])
+                break
+            i += 1
+
+        with self._cache_lock:
+            self._cache[key] = records
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return records
+
+    def affected_by(self, ecosystem: str, name: str, version: str) -> List[Tuple[list, List[str]]]:
+        """
+        (advisory, fix_versions) for every advisory affecting name@version.
+        """
+        hits = []
+        for record in self.lookup(ecosystem, name):
+            _, _, _, ranges, versions = record
+            matched = [events for events in ranges if is_affected(version, events)]
+            if not matched and version not in versions:
+                continue
+            v = version_key(version)
+            fixes = sorted(
+                {at for events in matched for kind, at in events if kind == "fixed" and version_key(at) > v},
+                key=version_key,
+            )
+            hits.append((record, fixes))
+        return hits
+
+    def match_sbom(self, sbom: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Match every CycloneDX component; returns a Grype-shaped document.
+        """
+        matches: List[Dict[str, Any]] = []
+
+        for component in sbom.get("components", []):
+            parsed = parse_purl(component.get("purl", ""))
+            if not parsed:
+                continue
+            purl_type, name, version = parsed
+            version = component.get("version") or version
+            ecosystem = PURL_ECOSYSTEMS.get(purl_type)
+            if not ecosystem or not version:
+                continue
+
+            hits = self.affected_by(ecosystem, name, version)
+            if not hits:
+                continue
+
+            props = {p.get("name"): p.get("value") for p in component.get("properties", [])}
+            location = props.get("syft:location:0:path")
+            artifact = {
+                "name": component.get("name", name),
+                "version": version,
+                "type": props.get("syft:package:type") or PURL_ARTIFACT_TYPES.get(purl_type, purl_type),
+                "locations": [{"path": location}] if location else [],
+                "purl": component.get("purl"),
+            }
+
+            for (vuln_id, severity, source, _, _), fixes in hits:
+                matches.append({
+                    "vulnerability": {
+                        "id": vuln_id,
+                        "severity": severity,
+                        "dataSource": source,
+                        "fix": {"versions": fixes, "state": "fixed" if fixes else "not-fixed"},
+                    },
+                    "artifact": artifact,
+                    "matchDetails": [{"type": "exact-direct-match", "matcher": MATCHER_NAME}],
+                })
+
+        return {
+            "matches": matches,
+            "descriptor": {
+                "name": MATCHER_NAME,
+                "db": {
+                    "location": self.path,
+                    "built": datetime.fromtimestamp(os.path.getmtime(self.path), timezone.utc).isoformat(),
+                },
+            },
+        }
@@ -0,0 +1,52 @@
+"""
+Local Cache Location
+====================
+
+Single place that decides where scan caches live on disk.
+Caches are always written OUTSIDE the scanned tree so later stages
+(and the next scan) never pick them up as project files.
+
+Override with DEPLAI_CACHE_DIR (e.g. a shared volume in worker containers).
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "deplai"
+
+
+def cache_root() -> Path:
+    return Path(os.environ.get("DEPLAI_CACHE_DIR") or DEFAULT_CACHE_DIR)
+
+
+def cache_dir(*parts: str) -> Path:
+    """
+    Return (and create) a namespaced cache directory, e.g. cache_dir("sbom").
+    """
+    path = cache_root().joinpath(*parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def stable_hash(value: Any) -> str:
+    """
+    sha256 of a canonical JSON encoding (sorted keys), for cache keys.
+    """
+    raw = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def write_json_atomic(path: Path, data: Any) -> None:
+    """
+    Write JSON via a temp file + rename so concurrent readers never see
+    a partially written cache entry.
+    """
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
@@ -0,0 +1,233 @@
+"""
+CODEOWNERS
+==========
+
+Parse a GitHub/GitLab-style CODEOWNERS file and compile it once into a
+glob trie. The last matching rule wins (GitHub semantics).
+
+    owners = CodeOwners.load(repo_path)
+    owners.owners_of("src/api/routes.py")  # ["@org/backend"]
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+import re
+
+CODEOWNERS_LOCATIONS = ("CODEOWNERS", ".github/CODEOWNERS", "docs/CODEOWNERS", ".gitlab/CODEOWNERS")
+
+
+@dataclass(frozen=True)
+class OwnerRule:
+    pattern: str
+    owners: Tuple[str, ...]
+    regex: "re.Pattern[str]"
+
+
+def glob_to_regex(pattern: str) -> str:
+    """
+    CODEOWNERS pattern -> regex over repo-relative posix paths.
+
+    gitignore syntax, except that a trailing "/*" matches one level only:
+    "docs/*" owns docs/a.md but not docs/build/a.md (GitHub semantics).
+    """
+    anchored = pattern.startswith("/") or "/" in pattern.rstrip("/")
+    directory = pattern.endswith("/")
+    body = pattern.strip("/")
+    single_level = pattern.endswith("/*")
+
+    out = []
+    i = 0
+    while i < len(body):
+        c = body[i]
+        if c == "*":
+            if body[i:i + 2] == "**":
+                # "**/" matches zero or more directories
+                if body[i + 2:i + 3] == "/":
+                    out.append("(?:.*/)?")
+                    i += 3
+                    continue
+                out.append(".*")
+                i += 2
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        else:
+            out.append(re.escape(c))
+        i += 1
+
+    prefix = "" if anchored else "(?:.*/)?"
+    # A match on a directory covers everything below it
+    suffix = "/.*" if directory else "" if single_level else "(?:/.*)?"
+    return f"^{prefix}{''.join(out)}{suffix}$"
+
+
+def parse_codeowners(text: str) -> List[OwnerRule]:
+    rules: List[OwnerRule] = []
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line or line.startswith("["):  # GitLab sections
+            continue
+        parts = line.split()
+        pattern, owners = parts[0], tuple(parts[1:])
+        rules.append(OwnerRule(pattern, owners, re.compile(glob_to_regex(pattern))))
+    return rules
+
+
+# -------------------------
+# Glob trie
+# -------------------------
+def _segment_regex(segment: str) -> "re.Pattern[str]":
+    return re.compile("".join(
+        "[^/]*" if c == "*" else "[^/]" if c == "?" else re.escape(c) for c in segment
+    ))
+
+
+# What may follow a terminal segment: anything, at least one more
+# segment ("dir/"), or nothing ("dir/*" matches one level only)
+ANY, DIRECTORY, LEAF = 0, 1, 2
+
+
+class _Node:
+    __slots__ = ("literal", "globs", "star", "is_star", "terminal", "closure")
+
+    def __init__(self, is_star: bool = False):
+        self.literal = {}
+        self.globs = []      # [(segment regex, node)]
+        self.star = None     # "**" child
+        self.is_star = is_star
+        self.terminal = []   # [(rule index, mode)]: ANY / DIRECTORY / LEAF
+        self.closure = ()    # self + "**" chain (entered without consuming)
+
+
+class GlobTrie:
+    """
+    CODEOWNERS patterns compiled into one trie over path segments,
+    matched as an NFA in a single pass over the path: cost grows with the
+    path depth, not with the number of rules. Same semantics as
+    glob_to_regex; the highest matching rule index wins.
+
+    Patterns with "**" inside a segment (e.g. "foo**") cross "/" and are
+    matched by regex instead.
+    """
+
+    def __init__(self, patterns: List[str]):
+        self.root = _Node()
+        self._fallback: List[Tuple[int, "re.Pattern[str]"]] = []
+        for index, pattern in enumerate(patterns):
+            self._add(index, pattern)
+        self._seal(self.root)
+
+    def _add(self, index: int, pattern: str) -> None:
+        anchored = pattern.startswith("/") or "/" in pattern.rstrip("/")
+        directory = pattern.endswith("/")
+        single_level = pattern.endswith("/*")
+        segments = [seg for seg in pattern.strip("/").split("/") if seg]
+        if not segments:
+            return
+        if segments[-1] == "**":
+            if directory:
+                # "dir/**/": at least two levels below dir
+                segments[-1] = "*"
+            else:
+                # "dir/**" == "dir/": anything below dir
+                segments.pop()
+                directory = True
+            while segments and segments[-1] == "**":
+                segments.pop()
+        if not segments or any("**" in seg and seg != "**" for seg in segments):
+            self._fallback.append((index, re.compile(glob_to_regex(pattern))))
+            return
+        if not anchored:
+            segments.insert(0, "**")
+
+        node = self.root
+        for seg in segments:
+            if seg == "**":
+                if node.star is None:
+                    node.star = _Node(is_star=True)
+                node = node.star
+            elif "*" in seg or "?" in seg:
+                child = next((n for rx, n in node.globs if rx.pattern == _segment_regex(seg).pattern), None)
+                if child is None:
+                    child = _Node()
+                    node.globs.append((_segment_regex(seg), child))
+                node = child
+            else:
+                node = node.literal.setdefault(seg, _Node())
+        node.terminal.append((index, DIRECTORY if directory else LEAF if single_level else ANY))
+
+    def _seal(self, root: _Node) -> None:
+        # Precompute each node's epsilon closure once
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            chain = [node]
+            while chain[-1].star is not None and chain[-1].star is not node:
+                chain.append(chain[-1].star)
+            node.closure = tuple(chain)
+            stack.extend(node.literal.values())
+            stack.extend(child for _, child in node.globs)
+            if node.star is not None:
+                stack.append(node.star)
+
+    def match(self, path: str) -> int:
+        """
+        Index of the last pattern matching `path` (-1 if none).
+        """
+        path = path.lstrip("/")
+        segments = path.split("/")
+        n = len(segments)
+        best = -1
+
+        states = self.root.closure
+        for i, seg in enumerate(segments):
+            nxt = {}
+            for node in states:
+                child = node.literal.get(seg)
+                if child is not None:
+                    nxt.update(dict.fromkeys(child.closure))
+                for rx, child in node.globs:
+                    if rx.fullmatch(seg):
+                        nxt.update(dict.fromkeys(child.closure))
+                if node.is_star:
+                    nxt.update(dict.fromkeys(node.closure))
+            if not nxt:
+                break
+            states = nxt
+            more = i + 1 < n
+            for node in states:
+                for index, mode in node.terminal:
+                    if index > best and mode != (LEAF if more else DIRECTORY):
+                        best = index
+
+        for index, rx in self._fallback:
+            if index > best and rx.match(path):
+                best = index
+        return best
+
+
+class CodeOwners:
+    def __init__(self, rules: List[OwnerRule]):
+        self.rules = rules
+        self._trie = GlobTrie([r.pattern for r in rules])
+
+    @classmethod
+    def load(cls, repo_path: str) -> "CodeOwners":
+        for rel in CODEOWNERS_LOCATIONS:
+            path = Path(repo_path, rel)
+            if path.is_file():
+                return cls(parse_codeowners(path.read_text(encoding="utf-8", errors="replace")))
+        return cls([])
+
+    def match(self, path: str) -> Optional[OwnerRule]:
+        index = self._trie.match(path)
+        return self.rules[index] if index >= 0 else None
+
+    def owners_of(self, path: str) -> List[str]:
+        rule = self.match(path)
+        return list(rule.owners) if rule else []
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
@@ -11,11 +11,15 @@ Owned by: Security
 Obeys: ScopePolicy (DAST scope)
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict
 import requests
-from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from urllib.parse import urljoin, urlparse
 
 from sast.schema import Finding
+from sast.response_cache import TargetCache
 
 
 # -------------------------
@@ -29,52 +33,121 @@ SECURITY_HEADERS = {
     "Referrer-Policy": "Missing Referrer-Policy header",
 }
 
+USER_AGENT = "deplai-security-check"
+
+# Paths sampled per host by the fleet checker (plain GETs: the landing
+# page and the usual login page, where session cookies are set)
+DEFAULT_SAMPLE_PATHS = ("/", "/login")
+
+# Fleet defaults (bounded so a large target list never floods a network)
+DEFAULT_MAX_WORKERS = 64
+DEFAULT_PER_HOST_LIMIT = 4
+
 
 # -------------------------
-# Runner
+# HTTP helpers
 # -------------------------
-def run_config_checks(target_url: str, timeout: int = 10) -> List[Finding]:
+def build_session(
+    max_hosts: int = DEFAULT_MAX_WORKERS,
+    per_host: int = DEFAULT_PER_HOST_LIMIT,
+) -> requests.Session:
     """
-    Perform safe config & auth checks against target URL.
+    Shared keep-alive session: one cached pool per host (up to `max_hosts`),
+    `per_host` reusable sockets in each.
     """
-    findings: List[Finding] = []
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=max(max_hosts, 1),
+        pool_maxsize=max(per_host, 1),
+        max_retries=0,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT})
+    return session
+
 
+def base_url(target_url: str) -> str:
     parsed = urlparse(target_url)
-    base = f"{parsed.scheme}://{parsed.netloc}"
+    return f"{parsed.scheme}://{parsed.netloc}"
 
-    try:
-        resp = requests.get(
-            base,
-            timeout=timeout,
-            allow_redirects=True,
-            headers={"User-Agent": "deplai-security-check"},
-        )
-    except Exception as e:
-        findings.append(
-            Finding(
-                category="SYSTEM",
-                tool="config",
-                rule_id="config-request-failed",
-                title="Config check failed to reach target",
-                severity="LOW",
-                confidence="HIGH",
-                file=base,
-                line_start=0,
-                line_end=None,
-                fingerprint=f"config:error:{hash(str(e))}",
-                occurrences=1,
-                evidence={"error": str(e)},
-            )
-        )
-        return findings
 
-    headers = {k.lower(): v for k, v in resp.headers.items()}
+def sample_url(base: str, path: str) -> str:
+    """
+    `path` resolved against `base`; it must stay on the target's host.
+    """
+    url = urljoin(base + "/", path)
+    target, sampled = urlparse(base), urlparse(url)
+    if (sampled.scheme, sampled.netloc) != (target.scheme, target.netloc):
+        raise ValueError(f"Sample path {path!r} leaves target {base}")
+    return url
+
+
+def get_set_cookies(resp: requests.Response) -> List[str]:
+    """
+    Every Set-Cookie header on the response, unfolded.
+
+    `resp.headers` joins repeated headers with ", ", which is ambiguous for
+    cookies (Expires contains commas), so read the raw header list instead.
+    """
+    raw = getattr(resp, "raw", None)
+    raw_headers = getattr(raw, "headers", None)
+    if raw_headers is not None and hasattr(raw_headers, "getlist"):
+        return list(raw_headers.getlist("Set-Cookie"))
+
+    value = resp.headers.get("Set-Cookie", "")
+    return [value] if value else []
+
+
+def parse_cookie(set_cookie: str) -> Dict[str, Any]:
+    """
+    Split a single Set-Cookie value into its name and lower-cased attributes.
+    """
+    parts = [p.strip() for p in set_cookie.split(";")]
+    name = parts[0].split("=", 1)[0].strip() if parts else ""
+    flags = {p.split("=", 1)[0].strip().lower() for p in parts[1:] if p}
+    return {"name": name, "flags": flags, "raw": set_cookie}
+
+
+# -------------------------
+# Checks
+# -------------------------
+def request_failed_finding(base: str, error: Exception) -> Finding:
+    return Finding(
+        category="SYSTEM",
+        tool="config",
+        rule_id="config-request-failed",
+        title="Config check failed to reach target",
+        severity="LOW",
+        confidence="HIGH",
+        file=base,
+        line_start=0,
+        line_end=None,
+        fingerprint=f"config:error:{hash(str(error))}",
+        occurrences=1,
+        evidence={"error": str(error)},
+    )
+
+
+def check_responses(base: str, responses: Dict[str, requests.Response]) -> List[Finding]:
+    """
+    Evaluate header & cookie checks over the sampled responses of one host.
+    `responses` maps sampled path -> response.
+    """
+    findings: List[Finding] = []
 
     # -------------------------
     # Security headers
     # -------------------------
+    missing: Dict[str, List[str]] = defaultdict(list)
+    for path, resp in responses.items():
+        present = {k.lower() for k in resp.headers.keys()}
+        for header in SECURITY_HEADERS:
+            if header.lower() not in present:
+                missing[header].append(path)
+
     for header, message in SECURITY_HEADERS.items():
-        if header.lower() not in headers:
+        if header in missing:
             findings.append(
                 Finding(
                     category="CONFIG",
@@ -88,49 +161,157 @@ def run_config_checks(target_url: str, timeout: int = 10) -> List[Finding]:
                     line_end=None,
                     fingerprint=f"config:header:{header.lower()}:{base}",
                     occurrences=1,
-                    evidence={"header": header},
+                    evidence={"header": header, "paths": missing[header]},
                 )
             )
 
     # -------------------------
     # Cookie flags (auth safety)
     # -------------------------
-    cookies = resp.headers.get("Set-Cookie", "")
-    if cookies:
-        if "secure" not in cookies.lower():
-            findings.append(
-                Finding(
-                    category="AUTH",
-                    tool="config",
-                    rule_id="cookie-missing-secure",
-                    title="Session cookie missing Secure flag",
-                    severity="MEDIUM",
-                    confidence="HIGH",
-                    file=base,
-                    line_start=0,
-                    line_end=None,
-                    fingerprint=f"config:cookie:secure:{base}",
-                    occurrences=1,
-                    evidence={"set-cookie": cookies},
-                )
-            )
+    cookies: List[Dict[str, Any]] = []
+    seen = set()
+    for resp in responses.values():
+        for raw in get_set_cookies(resp):
+            if raw not in seen:
+                seen.add(raw)
+                cookies.append(parse_cookie(raw))
 
-        if "httponly" not in cookies.lower():
-            findings.append(
-                Finding(
-                    category="AUTH",
-                    tool="config",
-                    rule_id="cookie-missing-httponly",
-                    title="Session cookie missing HttpOnly flag",
-                    severity="MEDIUM",
-                    confidence="HIGH",
-                    file=base,
-                    line_start=0,
-                    line_end=None,
-                    fingerprint=f"config:cookie:httponly:{base}",
-                    occurrences=1,
-                    evidence={"set-cookie": cookies},
-                )
+    for flag, rule_id, title in (
+        ("secure", "cookie-missing-secure", "Session cookie missing Secure flag"),
+        ("httponly", "cookie-missing-httponly", "Session cookie missing HttpOnly flag"),
+    ):
+        offenders = [c for c in cookies if flag not in c["flags"]]
+        if not offenders:
+            continue
+
+        findings.append(
+            Finding(
+                category="AUTH",
+                tool="config",
+                rule_id=rule_id,
+                title=title,
+                severity="MEDIUM",
+                confidence="HIGH",
+                file=base,
+                line_start=0,
+                line_end=None,
+                fingerprint=f"config:cookie:{flag}:{base}",
+                occurrences=1,
+                evidence={
+                    "cookies": [c["name"] for c in offenders],
+                    "set-cookie": [c["raw"] for c in offenders],
+                },
             )
+        )
+
+    return findings
+
+
+# -------------------------
+# Runner
+# -------------------------
+def run_config_checks(
+    target_url: str,
+    timeout: int = 10,
+    session: Optional[requests.Session] = None,
+    cache: Optional[TargetCache] = None,
+) -> List[Finding]:
+    """
+    Perform safe config & auth checks against target URL.
+    With a `cache`, an unchanged deployment reuses the previous findings.
+    """
+    base = base_url(target_url)
+    http = session or requests
+
+    if cache is not None:
+        cached = cache.get_findings(target_url, "config")
+        if cached is not None:
+            return cached
+
+    try:
+        resp = http.get(
+            base,
+            timeout=timeout,
+            allow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+        )
+    except Exception as e:
+        return [request_failed_finding(base, e)]
+
+    findings = check_responses(base, {"/": resp})
+    if cache is not None:
+        cache.put(target_url, "config", findings)
 
     return findings
+
+
+def run_config_checks_many(
+    targets: Iterable[str],
+    paths: Sequence[str] = DEFAULT_SAMPLE_PATHS,
+    timeout: int = 10,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+    session: Optional[requests.Session] = None,
+) -> Dict[str, List[Finding]]:
+    """
+    Config & auth checks for a fleet of targets.
+
+    Requests for every (host, path) pair share one keep-alive pool and run on
+    a bounded worker pool. Each host's paths are split into at most
+    `per_host_limit` lanes fetched one after the other, so no host sees more
+    in-flight requests than that and no worker ever waits on a busy host.
+    Returns findings keyed by base URL.
+    """
+    bases = list(dict.fromkeys(base_url(t) for t in targets))
+    if not bases:
+        return {}
+    # Resolved up front: a bad path fails before any request is sent
+    urls = {(b, p): sample_url(b, p) for b in bases for p in paths}
+
+    http = session or build_session(max_hosts=len(bases), per_host=per_host_limit)
+    lanes_per_host = max(1, min(per_host_limit, len(paths)))
+    # Lane i of every host before lane i + 1 of any: hosts start in parallel
+    lanes = [
+        [(b, p) for p in paths[i::lanes_per_host]]
+        for i in range(lanes_per_host)
+        for b in bases
+    ]
+
+    def fetch(base: str, path: str):
+        try:
+            return http.get(
+                urls[base, path],
+                timeout=timeout,
+                allow_redirects=True,
+                headers={"User-Agent": USER_AGENT},
+            )
+        except Exception as e:
+            return e
+
+    def run_lane(lane):
+        return [(job, fetch(*job)) for job in lane]
+
+    outcomes: Dict[tuple, Any] = {}
+    workers = max(1, min(max_workers, len(lanes)))
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="config-check") as pool:
+            for done in pool.map(run_lane, lanes):
+                outcomes.update(done)
+    finally:
+        if session is None:
+            http.close()
+
+    per_host: Dict[str, Dict[str, Any]] = {
+        base: {path: outcomes[base, path] for path in paths} for base in bases
+    }
+
+    results: Dict[str, List[Finding]] = {}
+    for base in bases:
+        responses = {p: r for p, r in per_host[base].items() if not isinstance(r, Exception)}
+        if not responses:
+            error = next(iter(per_host[base].values()))
+            results[base] = [request_failed_finding(base, error)]
+        else:
+            results[base] = check_responses(base, responses)
+
+    return results
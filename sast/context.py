@@ -0,0 +1,247 @@
+"""
+Repository Context (entity enrichment)
+=====================================
+
+Purpose:
+- Build one index per scan with everything enrichment needs per file:
+  CODEOWNERS owners, size, language, last commit author/date (one
+  batched `git log`), and test / vendored / generated flags
+- Make enrich_context an O(1) dict lookup per entity: no git calls and
+  no tree walks per finding
+
+    index = RepoContextIndex.build(repo_path)
+    for entity in entities:
+        enrich_context(entity, index)
+"""
+
+from dataclasses import dataclass, field
+from pathlib import PurePosixPath
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+import os
+import subprocess
+
+from sast.codeowners import CodeOwners
+from sast.entity import FindingEntity
+
+LANGUAGES = {
+    ".py": "python", ".js": "javascript", ".jsx": "javascript", ".mjs": "javascript",
+    ".ts": "typescript", ".tsx": "typescript", ".go": "go", ".java": "java",
+    ".kt": "kotlin", ".rb": "ruby", ".php": "php", ".cs": "csharp", ".rs": "rust",
+    ".c": "c", ".h": "c", ".cpp": "cpp", ".cc": "cpp", ".hpp": "cpp",
+    ".swift": "swift", ".scala": "scala", ".sh": "shell", ".tf": "terraform",
+    ".yml": "yaml", ".yaml": "yaml", ".json": "json", ".xml": "xml",
+    ".html": "html", ".sql": "sql", ".dockerfile": "dockerfile",
+}
+
+VENDORED_DIRS = {"vendor", "node_modules", "third_party", "third-party", ".venv", "venv", "site-packages", "bower_components"}
+TEST_DIRS = {"test", "tests", "__tests__", "spec", "specs", "testing", "testdata"}
+GENERATED_DIRS = {"dist", "build", "generated", "__generated__", "gen"}
+GENERATED_SUFFIXES = (".min.js", ".min.css", "_pb2.py", "_pb2_grpc.py", ".pb.go", ".g.dart", ".designer.cs", ".lock")
+
+# Not walked for sizes: VCS metadata and installed dependency trees
+WALK_SKIP_DIRS = {".git", ".hg", ".svn", "node_modules", ".venv", "venv", "site-packages", "bower_components"}
+
+
+@dataclass
+class FileContext:
+    path: str
+    language: str = "unknown"
+    size: Optional[int] = None
+    owners: List[str] = field(default_factory=list)
+    last_author: Optional[str] = None
+    last_commit: Optional[str] = None
+    last_commit_date: Optional[str] = None
+    is_test: bool = False
+    is_vendored: bool = False
+    is_generated: bool = False
+
+    def to_dict(self) -> Dict:
+        return {
+            "file": self.path,
+            "language": self.language,
+            "size": self.size,
+            "owners": self.owners,
+            "last_author": self.last_author,
+            "last_commit": self.last_commit,
+            "last_commit_date": self.last_commit_date,
+            "is_test": self.is_test,
+            "is_vendored": self.is_vendored,
+            "is_generated": self.is_generated,
+        }
+
+
+# -------------------------
+# Path classification
+# -------------------------
+def detect_language(path: str) -> str:
+    p = PurePosixPath(path)
+    if p.name.lower() == "dockerfile":
+        return "dockerfile"
+    return LANGUAGES.get(p.suffix.lower(), "unknown")
+
+
+def classify_path(path: str) -> Dict[str, bool]:
+    p = PurePosixPath(path)
+    dirs = {part.lower() for part in p.parts[:-1]}
+    name = p.name.lower()
+    stem = name.split(".", 1)[0]
+    return {
+        "is_test": bool(dirs & TEST_DIRS)
+        or stem.startswith("test_")
+        or stem.endswith(("_test", "_spec"))
+        or ".test." in name
+        or ".spec." in name,
+        "is_vendored": bool(dirs & VENDORED_DIRS),
+        "is_generated": bool(dirs & GENERATED_DIRS) or name.endswith(GENERATED_SUFFIXES) or ".generated." in name,
+    }
+
+
+def relative_path(path: str, repo_root: Optional[str] = None) -> str:
+    """
+    Finding file/location -> repo-relative posix path ("" for URLs).
+    """
+    if not path or path == "unknown" or ("://" in path and urlparse(path).scheme in ("http", "https")):
+        return ""
+    path = path.replace("\\", "/")
+    if repo_root:
+        root = repo_root.replace("\\", "/").rstrip("/") + "/"
+        if path.startswith(root):
+            path = path[len(root):]
+    while path.startswith("./"):
+        path = path[2:]
+    return path.lstrip("/")
+
+
+# -------------------------
+# Git history (one pass)
+# -------------------------
+def git_last_commits(repo_path: str, max_commits: int = 5000, timeout: int = 60) -> Dict[str, tuple]:
+    """
+    {path: (commit, author, date)} for the newest commit touching each
+    file, from a single `git log` over the last `max_commits` commits.
+    """
+    try:
+        proc = subprocess.run(
+            [
+                "git", "-C", repo_path, "log", f"-n{max_commits}", "--no-renames", "--relative",
+                "--name-only", "--format=%x00%H%x09%an%x09%aI",
+            ],
+            capture_output=True,
+            text=True,
+            errors="replace",
+            timeout=timeout,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return {}
+    if proc.returncode != 0:
+        return {}
+
+    last: Dict[str, tuple] = {}
+    for block in proc.stdout.split("\x00"):
+        if not block.strip():
+            continue
+        header, _, names = block.partition("\n")
+        commit, author, date = (header.split("\t") + ["", "", ""])[:3]
+        for name in names.splitlines():
+            if name and name not in last:
+                last[name] = (commit, author, date)
+    return last
+
+
+# -------------------------
+# Index
+# -------------------------
+class RepoContextIndex:
+    """
+    Per-scan file index. Sizes and git history are collected up front;
+    the per-file context is assembled on first lookup and memoized, so
+    CODEOWNERS rules are evaluated once per distinct file, not per file
+    in the tree.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str],
+        sizes: Dict[str, int],
+        history: Dict[str, tuple],
+        owners: CodeOwners,
+    ):
+        self.root = root
+        self.sizes = sizes
+        self.history = history
+        self.codeowners = owners
+        self._files: Dict[str, FileContext] = {}
+
+    @classmethod
+    def build(cls, repo_path: str, max_commits: int = 5000) -> "RepoContextIndex":
+        root = os.path.abspath(repo_path)
+        owners = CodeOwners.load(root)
+        history = git_last_commits(root, max_commits=max_commits)
+
+        sizes: Dict[str, int] = {}
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in WALK_SKIP_DIRS]
+            rel_dir = os.path.relpath(dirpath, root).replace(os.sep, "/")
+            prefix = "" if rel_dir == "." else rel_dir + "/"
+            for name in filenames:
+                try:
+                    sizes[prefix + name] = os.lstat(os.path.join(dirpath, name)).st_size
+                except OSError:
+                    continue
+
+        return cls(root, sizes, history, owners)
+
+    def _file_context(self, rel: str) -> FileContext:
+        ctx = FileContext(
+            path=rel,
+            language=detect_language(rel),
+            size=self.sizes.get(rel),
+            owners=self.codeowners.owners_of(rel) if self.codeowners else [],
+            **classify_path(rel),
+        )
+        commit = self.history.get(rel)
+        if commit:
+            ctx.last_commit, ctx.last_author, ctx.last_commit_date = commit
+        return ctx
+
+    def lookup(self, path: str) -> Optional[FileContext]:
+        rel = relative_path(path, self.root)
+        if not rel:
+            return None
+        found = self._files.get(rel)
+        if found is None:
+            found = self._files[rel] = self._file_context(rel)
+        return found
+
+    def __contains__(self, path: str) -> bool:
+        return relative_path(path, self.root) in self.sizes
+
+
+def entity_path(entity: FindingEntity) -> str:
+    for signal in entity.signals:
+        path = signal.file_path or signal.file
+        if path and path != "unknown":
+            return path
+    return ""
+
+
+def enrich_context(entity: FindingEntity, index: Optional[RepoContextIndex] = None) -> FindingEntity:
+    """
+    Attach per-file repository context to `entity.context`.
+    Without an index only path-derived facts are added.
+    """
+    path = entity_path(entity)
+    if not path:
+        return entity
+
+    if index is not None:
+        ctx = index.lookup(path)
+        if ctx is not None:
+            entity.context.update(ctx.to_dict())
+        return entity
+
+    rel = relative_path(path)
+    if rel:
+        entity.context.update({"file": rel, "language": detect_language(rel), **classify_path(rel)})
+    return entity
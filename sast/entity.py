@@ -0,0 +1,143 @@
+"""
+Finding Entities (intelligence plane)
+====================================
+
+An entity is one canonical issue built from one or more raw Findings
+("signals"): the same vulnerability seen by several tools, in several
+places, or across several CVEs of one dependency.
+
+Entities do not copy their findings: they keep indices (`members`) into
+one shared findings table, so a scan's entities cost a few small arrays
+on top of the findings themselves.
+"""
+
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sast.schema import Finding
+
+SEVERITY_RANK = {"UNKNOWN": 0, "INFO": 0, "LOW": 1, "MEDIUM": 2, "HIGH": 3, "CRITICAL": 4}
+CONFIDENCE_RANK = {"UNKNOWN": 0, "LOW": 1, "MEDIUM": 2, "HIGH": 3}
+
+# Tool-specific levels (Semgrep: ERROR / WARNING / INFO)
+SEVERITY_ALIASES = {"ERROR": "HIGH", "WARNING": "MEDIUM", "INFO": "LOW"}
+
+
+def normalize_severity(value: Optional[str]) -> str:
+    """
+    Canonical severity: upper-cased, tool levels mapped onto the scale.
+    """
+    severity = (value or "UNKNOWN").upper()
+    return SEVERITY_ALIASES.get(severity, severity)
+
+
+def severity_rank(value: Optional[str]) -> int:
+    return SEVERITY_RANK.get(normalize_severity(value), 0)
+
+
+def max_severity(values: Iterable[str]) -> str:
+    return max(values, key=severity_rank, default="LOW")
+
+
+def max_confidence(values: Iterable[str]) -> str:
+    return max(values, key=lambda c: CONFIDENCE_RANK.get(c, 0), default="UNKNOWN")
+
+
+def _members() -> array:
+    return array("I")
+
+
+@dataclass(slots=True)
+class FindingEntity:
+    """
+    Canonical issue as shown to users (API / UI / remediation).
+    """
+    entity_id: str
+    title: str
+    category: str
+    severity: str
+    confidence: str
+    weakness: str  # rule id / CVE the entity is about
+    location: str
+    members: array = field(default_factory=_members)  # indices into `table`
+    table: Sequence[Finding] = ()  # shared findings table of the scan
+
+    risk_score: float = 0.0
+    status: str = "open"
+    first_seen: str = ""
+    last_seen: str = ""
+
+    context: Dict[str, Any] = field(default_factory=dict)
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_finding(
+        cls,
+        finding: Finding,
+        entity_id: Optional[str] = None,
+        table: Optional[Sequence[Finding]] = None,
+        index: int = 0,
+    ) -> "FindingEntity":
+        """
+        Single-signal entity. `table`/`index` place the finding in a shared
+        table; without them the entity gets a private one-row table.
+        """
+        return cls(
+            entity_id=entity_id or finding.fingerprint,
+            title=finding.title,
+            category=finding.category,
+            severity=normalize_severity(finding.severity),
+            confidence=finding.confidence,
+            weakness=finding.rule_id,
+            location=finding.location,
+            members=array("I", (index,)),
+            table=(finding,) if table is None else table,
+            status=finding.status,
+            first_seen=finding.first_seen,
+            last_seen=finding.last_seen,
+        )
+
+    @property
+    def signals(self) -> List[Finding]:
+        table = self.table
+        return [table[i] for i in self.members]
+
+    @property
+    def tools(self) -> List[str]:
+        return sorted({s.tool for s in self.signals if s.tool})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "entity_id": self.entity_id,
+            "title": self.title,
+            "category": self.category,
+            "severity": self.severity,
+            "confidence": self.confidence,
+            "weakness": self.weakness,
+            "location": self.location,
+            "risk_score": self.risk_score,
+            "status": self.status,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "tools": self.tools,
+            "signals": len(self.members),
+            "context": self.context,
+            "attributes": self.attributes,
+        }
+
+
+def merge_members(entities: Sequence[FindingEntity]) -> Tuple[Sequence[Finding], array]:
+    """
+    (table, members) covering the signals of all `entities`. Entities of one
+    scan share a table and only their indices are concatenated.
+    """
+    table = entities[0].table
+    if all(e.table is table for e in entities):
+        members = array("I")
+        for e in entities:
+            members.extend(e.members)
+        return table, members
+
+    signals = [s for e in entities for s in e.signals]
+    return signals, array("I", range(len(signals)))
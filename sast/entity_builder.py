@@ -0,0 +1,107 @@
+"""
+Entity Builder
+==============
+
+Purpose:
+- Group raw Findings into FindingEntity objects in one hash-join pass
+  (finding key -> entity slot), linear in the number of findings
+- Keep member indices into the shared findings table instead of copies
+
+Grouping key: the finding fingerprint (tool-level identity). Findings
+without one are keyed by (category, rule, location).
+"""
+
+from array import array
+from contextlib import contextmanager
+from typing import Hashable, Iterator, List, Sequence
+import gc
+import hashlib
+
+from sast.entity import CONFIDENCE_RANK, SEVERITY_RANK, FindingEntity, normalize_severity
+from sast.schema import Finding
+
+UNKNOWN_FINGERPRINT = "unknown-hash"
+
+
+def entity_key(finding: Finding) -> Hashable:
+    fingerprint = finding.fingerprint
+    if fingerprint and fingerprint != UNKNOWN_FINGERPRINT:
+        return fingerprint
+    return (finding.category, finding.rule_id, finding.location)
+
+
+def entity_id_for(key: Hashable) -> str:
+    if isinstance(key, str):
+        return key
+    return hashlib.sha256("|".join(map(str, key)).encode()).hexdigest()
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    """
+    Entities are acyclic; cyclic GC passes triggered by allocating
+    hundreds of thousands of them are pure overhead.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def build_entities(findings: Sequence[Finding]) -> List[FindingEntity]:
+    """
+    Findings -> entities, in first-seen order. `findings` becomes the
+    shared table every entity indexes into (it is not copied).
+    """
+    with gc_paused():
+        return _build(findings)
+
+
+def _build(findings: Sequence[Finding]) -> List[FindingEntity]:
+    keys = [entity_key(f) for f in findings]
+
+    slots = {}
+    entities: List[FindingEntity] = []
+    severity_rank = SEVERITY_RANK
+    confidence_rank = CONFIDENCE_RANK
+
+    for i, key in enumerate(keys):
+        slot = slots.get(key)
+        f = findings[i]
+
+        if slot is None:
+            slots[key] = len(entities)
+            entities.append(
+                FindingEntity(
+                    entity_id=entity_id_for(key),
+                    title=f.title,
+                    category=f.category,
+                    severity=normalize_severity(f.severity),
+                    confidence=f.confidence,
+                    weakness=f.rule_id,
+                    location=f.location,
+                    members=array("I", (i,)),
+                    table=findings,
+                    status=f.status,
+                    first_seen=f.first_seen,
+                    last_seen=f.last_seen,
+                )
+            )
+            continue
+
+        e = entities[slot]
+        e.members.append(i)
+        severity = normalize_severity(f.severity)
+        if severity_rank.get(severity, 0) > severity_rank.get(e.severity, 0):
+            e.severity = severity
+        if confidence_rank.get(f.confidence, 0) > confidence_rank.get(e.confidence, 0):
+            e.confidence = f.confidence
+        if f.first_seen < e.first_seen:
+            e.first_seen = f.first_seen
+        if f.last_seen > e.last_seen:
+            e.last_seen = f.last_seen
+
+    return entities
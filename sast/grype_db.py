@@ -0,0 +1,214 @@
+"""
+Grype Vulnerability DB Store
+============================
+
+Purpose:
+- Keep ONE pinned, pre-downloaded Grype DB on a shared volume
+- Workers never download: auto-update is disabled and Grype is pointed
+  at the active snapshot (fast, offline-safe cold start)
+- A single scheduled updater (scripts/update_grype_db.py) refreshes it
+
+Layout (DEPLAI_GRYPE_DB_DIR, default /var/lib/deplai/grype-db):
+
+    snapshots/<id>/                 GRYPE_DB_CACHE_DIR of one DB download
+    snapshots/<id>/snapshot.json    metadata recorded by the updater
+    current -> snapshots/<id>       swapped atomically after each update
+    .update.lock                    held by the running updater
+
+DEPLAI_GRYPE_DB_PIN=<id> pins workers to a specific snapshot.
+"""
+
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+import fcntl
+import json
+import logging
+import os
+import shutil
+import subprocess
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_ROOT = "/var/lib/deplai/grype-db"
+KEEP_SNAPSHOTS = 3
+
+
+class GrypeDBError(RuntimeError):
+    pass
+
+
+# -------------------------
+# Locations
+# -------------------------
+def db_root() -> Path:
+    return Path(os.environ.get("DEPLAI_GRYPE_DB_DIR") or DEFAULT_DB_ROOT)
+
+
+def active_snapshot(root: Optional[Path] = None) -> Optional[Path]:
+    """
+    The snapshot workers should use: the pinned one if set, else `current`.
+    """
+    root = Path(root) if root else db_root()
+
+    pin = os.environ.get("DEPLAI_GRYPE_DB_PIN")
+    if pin:
+        pinned = root / "snapshots" / pin
+        return pinned if pinned.is_dir() else None
+
+    current = root / "current"
+    if current.exists():
+        return current.resolve()
+    return None
+
+
+def snapshot_info(snapshot: Optional[Path]) -> Dict[str, Any]:
+    if snapshot is None:
+        return {}
+    try:
+        with open(snapshot / "snapshot.json", "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {"id": snapshot.name}
+
+
+# -------------------------
+# Worker side
+# -------------------------
+def worker_env(root: Optional[Path] = None) -> Dict[str, str]:
+    """
+    Environment for Grype in a worker: read-only use of the shared snapshot.
+    Without a snapshot Grype keeps its default (self-updating) behavior.
+    """
+    env = dict(os.environ)
+    snapshot = active_snapshot(root)
+
+    if snapshot is None:
+        logger.warning("No Grype DB snapshot found; Grype will manage its own DB")
+        return env
+
+    env.update({
+        "GRYPE_DB_CACHE_DIR": str(snapshot),
+        "GRYPE_DB_AUTO_UPDATE": "false",
+        "GRYPE_DB_VALIDATE_AGE": "false",
+        "GRYPE_CHECK_FOR_APP_UPDATE": "false",
+    })
+    return env
+
+
+def describe_db(grype_json: Optional[Dict[str, Any]] = None, root: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    DB version details to record alongside SCA results: the snapshot
+    metadata plus what Grype itself reported in its descriptor.
+    """
+    info: Dict[str, Any] = {"snapshot": snapshot_info(active_snapshot(root)) or None}
+    if grype_json:
+        info["grype"] = grype_json.get("descriptor", {}).get("db")
+    return info
+
+
+# -------------------------
+# Updater side
+# -------------------------
+def _grype_db_status(env: Dict[str, str]) -> Dict[str, Any]:
+    proc = subprocess.run(
+        ["grype", "db", "status", "-o", "json"],
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=60,
+    )
+    try:
+        return json.loads(proc.stdout)
+    except json.JSONDecodeError:
+        pass
+
+    # Older Grype: "Key: value" text output
+    status: Dict[str, Any] = {}
+    for line in proc.stdout.splitlines():
+        if ":" in line:
+            key, value = line.split(":", 1)
+            status[key.strip().lower()] = value.strip()
+    return status
+
+
+def _swap_current(root: Path, snapshot: Path) -> None:
+    tmp_link = root / ".current.tmp"
+    if tmp_link.is_symlink() or tmp_link.exists():
+        tmp_link.unlink()
+    os.symlink(Path("snapshots") / snapshot.name, tmp_link)
+    os.replace(tmp_link, root / "current")
+
+
+def _prune(root: Path, keep: int) -> None:
+    active = {p.name for p in (active_snapshot(root), (root / "current").resolve()) if p}
+    snapshots = sorted(
+        (p for p in (root / "snapshots").iterdir() if p.is_dir() and not p.name.startswith(".")),
+        key=lambda p: p.name,
+    )
+    for old in snapshots[:-keep]:
+        if old.name not in active:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def update_db(root: Optional[Path] = None, keep: int = KEEP_SNAPSHOTS) -> Dict[str, Any]:
+    """
+    Download the latest Grype DB into a new snapshot and make it current.
+    Only one updater runs at a time (flock); a concurrent call returns
+    {"updated": False, "reason": "locked"} instead of downloading twice.
+    """
+    root = Path(root) if root else db_root()
+    (root / "snapshots").mkdir(parents=True, exist_ok=True)
+
+    with open(root / ".update.lock", "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            logger.info("Grype DB update already running elsewhere")
+            return {"updated": False, "reason": "locked"}
+
+        snapshot_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        staging = root / "snapshots" / f".staging-{snapshot_id}"
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir()
+
+        env = dict(os.environ, GRYPE_DB_CACHE_DIR=str(staging), GRYPE_DB_AUTO_UPDATE="true")
+        try:
+            proc = subprocess.run(
+                ["grype", "db", "update"],
+                capture_output=True,
+                text=True,
+                env=env,
+                timeout=900,
+            )
+            if proc.returncode != 0:
+                raise GrypeDBError(f"grype db update failed: {proc.stderr.strip()}")
+
+            status = _grype_db_status(env)
+            built = status.get("built") or status.get("Built")
+
+            previous = snapshot_info(active_snapshot(root))
+            if built and previous.get("built") == built:
+                return {"updated": False, "reason": "up-to-date", "snapshot": previous}
+
+            info = {
+                "id": snapshot_id,
+                "built": built,
+                "schema": status.get("schemaVersion") or status.get("schema"),
+                "checksum": status.get("checksum"),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }
+            with open(staging / "snapshot.json", "w", encoding="utf-8") as f:
+                json.dump(info, f, indent=2)
+
+            snapshot = root / "snapshots" / snapshot_id
+            os.replace(staging, snapshot)
+            _swap_current(root, snapshot)
+            _prune(root, keep)
+
+            return {"updated": True, "snapshot": info}
+
+        except subprocess.TimeoutExpired:
+            raise GrypeDBError("grype db update timed out")
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
@@ -0,0 +1,132 @@
+"""
+Streaming Grype JSON
+====================
+
+Purpose:
+- Read Grype's `-o json` output straight from the pipe and hand out the
+  entries of the top-level `matches` array one at a time
+- Keep memory bounded by the largest single match, not the whole report
+
+Every other top-level key (descriptor, source, distro, ...) is small and
+collected into `document` as the stream is consumed.
+"""
+
+from typing import Any, Dict, Iterator, TextIO
+import json
+
+CHUNK_SIZE = 1 << 16
+
+_WS = " \t\n\r"
+
+
+class GrypeStreamError(ValueError):
+    pass
+
+
+class GrypeMatchStream:
+    """
+    Iterate over `matches` of a Grype JSON report read from `stream`.
+    After iteration, `document` holds the remaining top-level keys
+    (with `matches` left out).
+    """
+
+    def __init__(self, stream: TextIO, chunk_size: int = CHUNK_SIZE):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self.document: Dict[str, Any] = {}
+        self.count = 0
+
+    # -------------------------
+    # Buffer
+    # -------------------------
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._stream.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        # Drop what has been consumed before growing the buffer
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WS:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise GrypeStreamError("Unexpected end of Grype output")
+
+    def _expect(self, char: str) -> None:
+        found = self._peek()
+        if found != char:
+            raise GrypeStreamError(f"Expected {char!r} at offset {self._pos}, found {found!r}")
+        self._pos += 1
+
+    def _value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                raise GrypeStreamError(f"Invalid JSON returned by Grype: {e}")
+            # A number ending exactly at the buffer edge may continue
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    # -------------------------
+    # Document walk
+    # -------------------------
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+
+        while True:
+            key = self._value()
+            if not isinstance(key, str):
+                raise GrypeStreamError("Expected an object key in Grype output")
+            self._expect(":")
+
+            if key == "matches":
+                yield from self._matches()
+            else:
+                self.document[key] = self._value()
+
+            sep = self._peek()
+            self._pos += 1
+            if sep == "}":
+                return
+            if sep != ",":
+                raise GrypeStreamError(f"Expected ',' or '}}' in Grype output, found {sep!r}")
+
+    def _matches(self) -> Iterator[Dict[str, Any]]:
+        if self._peek() == "n":  # "matches": null
+            self._value()
+            return
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+
+        while True:
+            yield self._value()
+            self.count += 1
+            sep = self._peek()
+            self._pos += 1
+            if sep == "]":
+                return
+            if sep != ",":
+                raise GrypeStreamError(f"Expected ',' or ']' in matches, found {sep!r}")
@@ -0,0 +1,393 @@
+"""
+Incremental Intelligence
+========================
+
+Purpose:
+- Recompute only what a scan changed: diff the scan's fingerprints
+  against the repo's previous scan, rebuild the entities of the affected
+  partitions, and patch scores and summary counts
+- Keep the repo's finding / entity state in SQLite (WAL) between scans
+
+Findings are stored per state key with every copy the scan reported
+(repeats count, as in a full rebuild) and a digest of their content, so a
+finding whose fingerprint is unchanged but whose severity / evidence
+changed is rebuilt too.
+
+Partitions: every pipeline stage groups findings within a partition
+(SCA: package@version per sub-project; otherwise category + rule), so an
+entity never spans two of them and an unaffected partition's entities
+are reused as they are.
+
+Location: DEPLAI_INTEL_DB, default <cache root>/intelligence.sqlite3.
+"""
+
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+import json
+import os
+import sqlite3
+import threading
+
+from sast.cache import cache_root, stable_hash
+from sast.context import RepoContextIndex, enrich_context
+from sast.entity import FindingEntity
+from sast.entity_builder import build_entities, entity_id_for, entity_key
+from sast.lifecycle import LifecycleStore, default_store as default_lifecycle_store
+from sast.sca_collapse import collapse_sca_entities, finding_package_evidence, package_key
+from sast.schema import Finding
+from sast.scoring import score_entities
+from sast.semantic_merge import SKIP_CATEGORIES, entity_signature, semantic_merge
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS findings (
+    repo        TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    part        TEXT NOT NULL,
+    seq         INTEGER NOT NULL,
+    record      TEXT NOT NULL,  -- JSON list: every copy in the scan
+    signature   BLOB,
+    copies      INTEGER NOT NULL,
+    digest      TEXT NOT NULL,
+    PRIMARY KEY (repo, fingerprint)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS findings_part ON findings (repo, part, seq);
+
+CREATE TABLE IF NOT EXISTS entities (
+    repo      TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    part      TEXT NOT NULL,
+    category  TEXT NOT NULL,
+    payload   TEXT NOT NULL,
+    PRIMARY KEY (repo, entity_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entities_part ON entities (repo, part);
+
+CREATE TABLE IF NOT EXISTS summaries (
+    repo    TEXT PRIMARY KEY,
+    seq     INTEGER NOT NULL,
+    payload TEXT NOT NULL
+);
+"""
+
+
+def default_db_path() -> Path:
+    return Path(os.environ.get("DEPLAI_INTEL_DB") or cache_root() / "intelligence.sqlite3")
+
+
+def partition_key(finding: Finding) -> str:
+    if finding.category == "SCA":
+        evidence = finding_package_evidence(finding)
+        if evidence is not None:
+            return json.dumps(["SCA", *package_key(evidence)])
+    return json.dumps([finding.category, finding.rule_id])
+
+
+def state_key(finding: Finding) -> str:
+    """
+    Stored identity of a finding (the fingerprint; findings without one
+    are keyed like build_entities keys them).
+    """
+    return entity_id_for(entity_key(finding))
+
+
+# Per-scan bookkeeping, not content: excluded from the digest
+_VOLATILE_FIELDS = ("first_seen", "last_seen", "status")
+
+
+def finding_digest(copies: Sequence[Finding]) -> str:
+    """
+    Content hash of every copy of one state key in a scan.
+    """
+    return stable_hash([
+        {k: v for k, v in f.to_record().items() if k not in _VOLATILE_FIELDS}
+        for f in copies
+    ])
+
+
+def group_by_key(findings: Sequence[Finding]) -> Dict[str, List[Finding]]:
+    groups: Dict[str, List[Finding]] = {}
+    for f in findings:
+        groups.setdefault(state_key(f), []).append(f)
+    return groups
+
+
+def finding_signature(finding: Finding) -> Optional[bytes]:
+    """
+    MinHash signature of the finding's single-signal entity, stored so
+    rebuilt partitions skip re-hashing in semantic_merge.
+    """
+    if finding.category in SKIP_CATEGORIES:
+        return None
+    return array("I", entity_signature(FindingEntity.from_finding(finding))).tobytes()
+
+
+def entity_payload(entity: FindingEntity) -> Dict[str, Any]:
+    payload = entity.to_dict()
+    payload["members"] = [state_key(s) for s in entity.signals]
+    return payload
+
+
+def _empty_summary() -> Dict[str, Any]:
+    return {"total_findings": 0, "total_entities": 0, "by_category": {}}
+
+
+class IntelligenceState:
+    """
+    Per-repo findings, entities and summary of the last scan.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else default_db_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._migrate()
+        self._conn.executescript(_SCHEMA)
+
+    def _migrate(self) -> None:
+        # State written before per-key copies / digests: start over (the
+        # next scan of each repo is applied as a full delta)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(findings)")}
+        if columns and "digest" not in columns:
+            self._conn.executescript(
+                "DROP TABLE findings; DROP TABLE IF EXISTS entities; DROP TABLE IF EXISTS summaries;"
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # -------------------------
+    # Reads
+    # -------------------------
+    def summary(self, repo: str) -> Dict[str, Any]:
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM summaries WHERE repo = ?", (repo,)).fetchone()
+        return json.loads(row[0]) if row else _empty_summary()
+
+    def entities(self, repo: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT payload FROM entities WHERE repo = ?", (repo,)).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def diff(self, repo: str, digests: Dict[str, str]) -> Tuple[Set[str], List[str]]:
+        """
+        (added or changed, removed) finding keys relative to the repo's last
+        scan. `digests`: finding_digest per state key of this scan.
+        """
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS scan_fps (fingerprint TEXT PRIMARY KEY, digest TEXT) WITHOUT ROWID"
+            )
+            cur.execute("DELETE FROM scan_fps")
+            cur.execute(
+                "INSERT INTO scan_fps SELECT key, value FROM json_each(?)",
+                (json.dumps(digests),),
+            )
+            removed = [
+                r[0] for r in cur.execute(
+                    """
+                    SELECT fingerprint FROM findings
+                    WHERE repo = ? AND fingerprint NOT IN (SELECT fingerprint FROM scan_fps)
+                    """,
+                    (repo,),
+                )
+            ]
+            unchanged = {
+                r[0] for r in cur.execute(
+                    """
+                    SELECT s.fingerprint FROM scan_fps s JOIN findings f
+                      ON f.repo = ? AND f.fingerprint = s.fingerprint AND f.digest = s.digest
+                    """,
+                    (repo,),
+                )
+            }
+            cur.execute("DELETE FROM scan_fps")
+        return set(digests) - unchanged, removed
+
+    # -------------------------
+    # Delta application
+    # -------------------------
+    def apply_delta(
+        self,
+        repo: str,
+        added: Sequence[Finding],
+        removed: Sequence[str],
+        repo_path: Optional[str] = None,
+        lifecycle: Optional[LifecycleStore] = None,
+    ) -> Dict[str, Any]:
+        """
+        Patch the repo's state with added findings / removed fingerprints.
+        `added` holds every copy of each new or changed key; their stored
+        state is replaced. Returns {"summary", "entities" (rebuilt), "removed_entities",
+        "delta": {...}}.
+        """
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                result = self._apply(cur, repo, added, list(removed), repo_path, lifecycle)
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+        return result
+
+    def _apply(self, cur, repo, added, removed, repo_path, lifecycle) -> Dict[str, Any]:
+        row = cur.execute("SELECT seq, payload FROM summaries WHERE repo = ?", (repo,)).fetchone()
+        seq, summary = (row[0], json.loads(row[1])) if row else (0, _empty_summary())
+
+        # 1. Partitions touched by the delta (old and new place of a key)
+        groups = group_by_key(added)
+        stale = removed + list(groups)
+        dirty: Set[str] = {partition_key(copies[0]) for copies in groups.values()}
+        old_copies = 0
+        if stale:
+            for part, copies in cur.execute(
+                "SELECT part, copies FROM findings WHERE repo = ? AND fingerprint IN (SELECT value FROM json_each(?))",
+                (repo, json.dumps(stale)),
+            ):
+                dirty.add(part)
+                old_copies += copies
+
+        # 2. Findings table
+        if stale:
+            cur.execute(
+                "DELETE FROM findings WHERE repo = ? AND fingerprint IN (SELECT value FROM json_each(?))",
+                (repo, json.dumps(stale)),
+            )
+        rows = []
+        for key, copies in groups.items():
+            seq += 1
+            rows.append((
+                repo, key, partition_key(copies[0]), seq,
+                json.dumps([f.to_record() for f in copies], default=str), finding_signature(copies[0]),
+                len(copies), finding_digest(copies),
+            ))
+        cur.executemany(
+            """
+            INSERT INTO findings (repo, fingerprint, part, seq, record, signature, copies, digest)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        summary["total_findings"] += len(added) - old_copies
+
+        # 3. Rebuild the dirty partitions only
+        parts = json.dumps(sorted(dirty))
+        findings: List[Finding] = []
+        known: Dict[str, Tuple[int, ...]] = {}
+        for key, record, signature in cur.execute(
+            """
+            SELECT fingerprint, record, signature FROM findings
+            WHERE repo = ? AND part IN (SELECT value FROM json_each(?))
+            ORDER BY part, seq
+            """,
+            (repo, parts),
+        ):
+            findings.extend(Finding.from_record(r) for r in json.loads(record))
+            if signature:
+                known[key] = tuple(array("I", signature))
+        old = cur.execute(
+            "SELECT entity_id, category FROM entities WHERE repo = ? AND part IN (SELECT value FROM json_each(?))",
+            (repo, parts),
+        ).fetchall()
+
+        entities = (
+            collapse_sca_entities(semantic_merge(build_entities(findings), known=known))
+            if findings else []
+        )
+
+        # 4. Lifecycle for the rebuilt / vanished entities only
+        new_ids = {e.entity_id for e in entities}
+        gone = [eid for eid, _ in old if eid not in new_ids]
+        seen_at = datetime.utcnow().isoformat()
+        state, _ = (lifecycle or default_lifecycle_store()).record_delta(repo, new_ids, gone, seen_at)
+        for entity in entities:
+            entity.first_seen, entity.status = state[entity.entity_id]
+            entity.last_seen = seen_at
+
+        # 5. Context + scores for the rebuilt entities
+        index = RepoContextIndex.build(repo_path) if repo_path and os.path.isdir(repo_path) else None
+        for entity in entities:
+            enrich_context(entity, index)
+        score_entities(entities)
+
+        # 6. Entities + summary counts
+        by_category = summary["by_category"]
+        for _, category in old:
+            by_category[category] -= 1
+            if not by_category[category]:
+                del by_category[category]
+        for entity in entities:
+            by_category[entity.category] = by_category.get(entity.category, 0) + 1
+        summary["total_entities"] += len(entities) - len(old)
+
+        cur.execute(
+            "DELETE FROM entities WHERE repo = ? AND part IN (SELECT value FROM json_each(?))",
+            (repo, parts),
+        )
+        cur.executemany(
+            "INSERT INTO entities (repo, entity_id, part, category, payload) VALUES (?, ?, ?, ?, ?)",
+            [
+                (repo, e.entity_id, partition_key(e.signals[0]), e.category, json.dumps(entity_payload(e), default=str))
+                for e in entities
+            ],
+        )
+        cur.execute(
+            """
+            INSERT INTO summaries (repo, seq, payload) VALUES (?, ?, ?)
+            ON CONFLICT (repo) DO UPDATE SET seq = excluded.seq, payload = excluded.payload
+            """,
+            (repo, seq, json.dumps(summary)),
+        )
+
+        return {
+            "summary": summary,
+            "entities": entities,
+            "removed_entities": gone,
+            "delta": {
+                "added_findings": len(added),
+                "removed_findings": len(removed),
+                "partitions": len(dirty),
+                "rebuilt_findings": len(findings),
+            },
+        }
+
+
+_default_state: Optional[IntelligenceState] = None
+_default_lock = threading.Lock()
+
+
+def default_state() -> IntelligenceState:
+    global _default_state
+    with _default_lock:
+        if _default_state is None or _default_state.path != default_db_path():
+            _default_state = IntelligenceState()
+        return _default_state
+
+
+def update_intelligence(
+    repo: str,
+    findings: Sequence[Finding],
+    repo_path: Optional[str] = None,
+    state: Optional[IntelligenceState] = None,
+    lifecycle: Optional[LifecycleStore] = None,
+) -> Dict[str, Any]:
+    """
+    Incremental entry point: diff `findings` against the repo's last scan
+    and apply only the delta.
+    """
+    state = state or default_state()
+    groups = group_by_key(findings)
+    changed, removed = state.diff(repo, {key: finding_digest(copies) for key, copies in groups.items()})
+    added = [f for key, copies in groups.items() if key in changed for f in copies]
+
+    return state.apply_delta(repo, added, removed, repo_path=repo_path, lifecycle=lifecycle)
@@ -1,32 +1,44 @@
 from typing import List, Dict, Any, Optional
+import os
 
 from sast.schema import Finding
 from sast.entity import FindingEntity
 from sast.entity_builder import build_entities
 from sast.semantic_merge import semantic_merge
 from sast.sca_collapse import collapse_sca_entities
-from sast.context import enrich_context
-from sast.scoring import score_entity
+from sast.context import RepoContextIndex, enrich_context
+from sast.scoring import score_entities
 from sast.lifecycle import apply_lifecycle
+from sast.incremental import update_intelligence
 
 
 # -------------------------
 # Core entity pipeline
 # -------------------------
-def build_finding_entities(findings: List[Finding]) -> List[FindingEntity]:
+def build_finding_entities(
+    findings: List[Finding],
+    repo: Optional[str] = None,
+    repo_path: Optional[str] = None,
+) -> List[FindingEntity]:
     if not findings:
+        # A clean scan resolves everything still open for the repo
+        apply_lifecycle([], repo=repo)
         return []
 
     entities = build_entities(findings)
     entities = semantic_merge(entities)
     entities = collapse_sca_entities(entities)
 
-    # Lifecycle tracking
-    apply_lifecycle(entities)
+    # Lifecycle tracking (persisted per repo)
+    apply_lifecycle(entities, repo=repo)
 
+    # Repository context: one index per scan, O(1) lookups per entity
+    index = RepoContextIndex.build(repo_path) if repo_path and os.path.isdir(repo_path) else None
     for entity in entities:
-        enrich_context(entity)
-        score_entity(entity)
+        enrich_context(entity, index)
+
+    # One batch over all entities (table lookups, no per-entity branching)
+    score_entities(entities)
 
     return entities
 
@@ -39,6 +51,9 @@ def build_intelligence(
     *,
     run_id: Optional[str] = None,
     include_summary: bool = False,
+    repo: Optional[str] = None,
+    repo_path: Optional[str] = None,
+    incremental: bool = False,
 ) -> Any:
     """
     INTELLIGENCE PLANE ENTRYPOINT
@@ -48,9 +63,24 @@ def build_intelligence(
 
     Structured behavior (API/UI):
         build_intelligence(findings, run_id=..., include_summary=True) -> Dict
+
+    `repo` enables lifecycle tracking (new / recurring / fixed) across scans.
+    `repo_path` (local checkout) enables ownership / git / file context.
+
+    Incremental behavior (requires repo):
+        build_intelligence(findings, repo=..., incremental=True) -> Dict
+        Only the delta against the repo's previous scan is recomputed;
+        "entities" holds the rebuilt entities, "summary" covers all.
     """
+    if incremental:
+        if not repo:
+            raise ValueError("incremental intelligence requires repo")
+        payload = update_intelligence(repo, findings, repo_path=repo_path)
+        if run_id is not None:
+            payload["run_id"] = run_id
+        return payload
 
-    entities = build_finding_entities(findings)
+    entities = build_finding_entities(findings, repo=repo, repo_path=repo_path)
 
     # 🔒 DEFAULT: return entities only (matches test expectations)
     if not include_summary:
@@ -66,6 +96,11 @@ def build_intelligence(
         summary["by_category"].setdefault(entity.category, 0)
         summary["by_category"][entity.category] += 1
 
+    if repo:
+        summary["by_status"] = {}
+        for entity in entities:
+            summary["by_status"][entity.status] = summary["by_status"].get(entity.status, 0) + 1
+
     payload: Dict[str, Any] = {
         "summary": summary,
         "entities": entities,
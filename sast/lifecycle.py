@@ -0,0 +1,247 @@
+"""
+Finding Lifecycle
+=================
+
+Purpose:
+- Track every entity across scans of the same repo: new, recurring or
+  fixed, with first_seen preserved from the scan that first reported it
+- Persist in a local SQLite DB (WAL) keyed by (repo, fingerprint), so no
+  scan history is ever loaded into memory
+
+One transaction per scan: the scan's fingerprints go into a temp table,
+then a few set-based statements insert the new ones and flip the status
+of those that changed (open -> fixed, fixed -> open).
+
+Location: DEPLAI_LIFECYCLE_DB, default <cache root>/lifecycle.sqlite3.
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+import os
+import sqlite3
+import threading
+
+from sast.cache import cache_root
+from sast.entity import FindingEntity
+
+NEW = "new"
+RECURRING = "recurring"
+FIXED = "fixed"
+
+# Stored status: "open" or "fixed". new vs recurring is derived per scan
+# (first_seen == this scan), so nothing is rewritten when "new" expires.
+_OPEN = "open"
+
+# last_seen is only written when an entity stops being seen; while it is
+# open, it was last seen by the repo's latest scan (repo_scans). A routine
+# scan therefore only writes the rows whose state changed.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lifecycle (
+    repo        TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    first_seen  TEXT NOT NULL,
+    last_seen   TEXT,
+    status      TEXT NOT NULL,
+    PRIMARY KEY (repo, fingerprint)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS lifecycle_repo_status ON lifecycle (repo, status);
+
+CREATE TABLE IF NOT EXISTS repo_scans (
+    repo      TEXT PRIMARY KEY,
+    last_scan TEXT NOT NULL
+);
+"""
+
+
+def default_db_path() -> Path:
+    return Path(os.environ.get("DEPLAI_LIFECYCLE_DB") or cache_root() / "lifecycle.sqlite3")
+
+
+class LifecycleStore:
+    """
+    SQLite-backed lifecycle state. Safe to share between threads.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else default_db_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def record_scan(
+        self,
+        repo: str,
+        fingerprints: Iterable[str],
+        seen_at: Optional[str] = None,
+    ) -> Tuple[Dict[str, Tuple[str, str]], int]:
+        """
+        Record one full scan of `repo`. Returns ({fingerprint: (first_seen,
+        status)} for the scan's fingerprints, number newly marked fixed).
+        """
+        return self._record(repo, fingerprints, None, seen_at)
+
+    def record_delta(
+        self,
+        repo: str,
+        present: Iterable[str],
+        removed: Iterable[str],
+        seen_at: Optional[str] = None,
+    ) -> Tuple[Dict[str, Tuple[str, str]], int]:
+        """
+        Incremental variant: only `present` (rebuilt) and `removed`
+        fingerprints are touched; everything else stays open as is.
+        """
+        return self._record(repo, present, list(removed), seen_at)
+
+    def _record(
+        self,
+        repo: str,
+        fingerprints: Iterable[str],
+        removed: Optional[List[str]],
+        seen_at: Optional[str],
+    ) -> Tuple[Dict[str, Tuple[str, str]], int]:
+        seen_at = seen_at or datetime.utcnow().isoformat()
+        # One JSON parameter instead of 100k executemany round trips
+        payload = json.dumps(list(set(fingerprints)))
+
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                cur.execute("CREATE TEMP TABLE IF NOT EXISTS scan_seen (fingerprint TEXT PRIMARY KEY) WITHOUT ROWID")
+                cur.execute("DELETE FROM scan_seen")
+                cur.execute("INSERT INTO scan_seen (fingerprint) SELECT value FROM json_each(?)", (payload,))
+
+                prev = cur.execute("SELECT last_scan FROM repo_scans WHERE repo = ?", (repo,)).fetchone()
+                prev_scan = prev[0] if prev else seen_at
+
+                # Gone since the previous scan
+                if removed is None:
+                    cur.execute(
+                        """
+                        UPDATE lifecycle SET status = ?, last_seen = ?
+                        WHERE repo = ? AND status = ?
+                          AND fingerprint NOT IN (SELECT fingerprint FROM scan_seen)
+                        """,
+                        (FIXED, prev_scan, repo, _OPEN),
+                    )
+                else:
+                    cur.execute(
+                        """
+                        UPDATE lifecycle SET status = ?, last_seen = ?
+                        WHERE repo = ? AND status = ?
+                          AND fingerprint IN (SELECT value FROM json_each(?))
+                          AND fingerprint NOT IN (SELECT fingerprint FROM scan_seen)
+                        """,
+                        (FIXED, prev_scan, repo, _OPEN, json.dumps(removed)),
+                    )
+                fixed = cur.rowcount
+                # Back again after a fix
+                cur.execute(
+                    """
+                    UPDATE lifecycle SET status = ?, last_seen = NULL
+                    WHERE repo = ? AND status = ?
+                      AND fingerprint IN (SELECT fingerprint FROM scan_seen)
+                    """,
+                    (_OPEN, repo, FIXED),
+                )
+                # First sighting (`WHERE true` disambiguates the upsert clause)
+                cur.execute(
+                    """
+                    INSERT INTO lifecycle (repo, fingerprint, first_seen, last_seen, status)
+                    SELECT ?, fingerprint, ?, NULL, ? FROM scan_seen WHERE true
+                    ON CONFLICT (repo, fingerprint) DO NOTHING
+                    """,
+                    (repo, seen_at, _OPEN),
+                )
+                cur.execute(
+                    """
+                    INSERT INTO repo_scans (repo, last_scan) VALUES (?, ?)
+                    ON CONFLICT (repo) DO UPDATE SET last_scan = excluded.last_scan
+                    """,
+                    (repo, seen_at),
+                )
+
+                state = {
+                    fp: (first_seen, NEW if first_seen == seen_at else RECURRING)
+                    for fp, first_seen in cur.execute(
+                        """
+                        SELECT l.fingerprint, l.first_seen
+                        FROM scan_seen s JOIN lifecycle l
+                          ON l.repo = ? AND l.fingerprint = s.fingerprint
+                        """,
+                        (repo,),
+                    )
+                }
+                cur.execute("DELETE FROM scan_seen")
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+
+        return state, fixed
+
+    def fixed(self, repo: str, limit: int = 1000) -> List[Dict[str, str]]:
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT fingerprint, first_seen, last_seen FROM lifecycle
+                WHERE repo = ? AND status = ? ORDER BY last_seen DESC LIMIT ?
+                """,
+                (repo, FIXED, limit),
+            ).fetchall()
+        return [{"fingerprint": fp, "first_seen": first, "last_seen": last} for fp, first, last in rows]
+
+
+_default_store: Optional[LifecycleStore] = None
+_default_lock = threading.Lock()
+
+
+def default_store() -> LifecycleStore:
+    global _default_store
+    with _default_lock:
+        if _default_store is None or _default_store.path != default_db_path():
+            _default_store = LifecycleStore()
+        return _default_store
+
+
+def apply_lifecycle(
+    entities: List[FindingEntity],
+    repo: Optional[str] = None,
+    store: Optional[LifecycleStore] = None,
+) -> Dict[str, int]:
+    """
+    Set status / first_seen / last_seen on every entity from the repo's
+    lifecycle history. Without a repo (from the argument or the findings)
+    nothing is persisted and entities are left as built. A clean scan (no
+    entities) still counts: every open entity of the repo becomes fixed.
+    """
+    if repo is None:
+        repo = next((s.repo for e in entities for s in e.signals if s.repo), "")
+    if not repo:
+        return {"new": 0, "recurring": 0, "fixed": 0}
+
+    store = store or default_store()
+    seen_at = datetime.utcnow().isoformat()
+    state, fixed = store.record_scan(repo, (e.entity_id for e in entities), seen_at)
+
+    counts = {NEW: 0, RECURRING: 0, FIXED: fixed}
+    for entity in entities:
+        first_seen, status = state[entity.entity_id]
+        entity.first_seen = first_seen
+        entity.last_seen = seen_at
+        entity.status = status
+        counts[status] += 1
+    return counts
@@ -0,0 +1,258 @@
+"""
+Native Lockfile Parsers (SBOM fast path)
+=======================================
+
+Purpose:
+- Build the CycloneDX SBOM that Grype consumes directly from common
+  lockfiles, without starting Syft
+- Cover the ecosystems listed in MANIFEST_FILES that pin exact versions:
+  requirements.txt, poetry.lock, package-lock.json, yarn.lock, go.sum
+
+Anything else (pom.xml, Cargo.lock, Gemfile.lock, a package.json without
+a lockfile, ...) is reported as unsupported and the caller falls back to
+Syft for the whole project, so no ecosystem is dropped from the SBOM.
+"""
+
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+import json
+import re
+import tomllib
+
+GENERATOR = "deplai-lockfiles/1"
+
+
+class LockfileParseError(ValueError):
+    pass
+
+
+# (name, version, ecosystem)
+Package = Tuple[str, str, str]
+
+
+# -------------------------
+# Python
+# -------------------------
+_REQ_PIN = re.compile(r"^([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*===?\s*([^\s;,#\\]+)")
+
+
+def parse_requirements(text: str) -> List[Package]:
+    """
+    Pinned `name==version` lines. Unpinned requirements carry no version to
+    match and are skipped (Syft does the same).
+    """
+    packages: List[Package] = []
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line or line.startswith("-"):
+            continue
+        m = _REQ_PIN.match(line)
+        if m:
+            packages.append((m.group(1), m.group(2), "pypi"))
+    return packages
+
+
+def parse_poetry_lock(text: str) -> List[Package]:
+    try:
+        data = tomllib.loads(text)
+    except tomllib.TOMLDecodeError as e:
+        raise LockfileParseError(f"poetry.lock: {e}")
+    return [(p["name"], p["version"], "pypi") for p in data.get("package", [])]
+
+
+# -------------------------
+# Node
+# -------------------------
+def parse_package_lock(text: str) -> List[Package]:
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise LockfileParseError(f"package-lock.json: {e}")
+
+    packages: List[Package] = []
+
+    # lockfileVersion 2/3: flat "packages" map keyed by install path
+    if "packages" in data:
+        for path, meta in data["packages"].items():
+            if not path or meta.get("link") or "version" not in meta:
+                continue
+            name = meta.get("name") or path.rsplit("node_modules/", 1)[-1]
+            packages.append((name, meta["version"], "npm"))
+        return packages
+
+    # lockfileVersion 1: nested "dependencies"
+    def walk(deps: Dict[str, Dict]):
+        for name, meta in deps.items():
+            if "version" in meta:
+                packages.append((name, meta["version"], "npm"))
+            walk(meta.get("dependencies", {}))
+
+    walk(data.get("dependencies", {}))
+    return packages
+
+
+_YARN_VERSION = re.compile(r'^\s+version:?\s+"?([^"\s]+)"?\s*$')
+
+
+def _yarn_entry_name(header: str) -> str:
+    spec = header.rstrip(":").split(",")[0].strip().strip('"')
+    at = spec.find("@", 1)  # skip the leading @ of scoped packages
+    return spec[:at] if at > 0 else spec
+
+
+def parse_yarn_lock(text: str) -> List[Package]:
+    """
+    Yarn v1 (`version "x"`) and Berry (`version: x`) lockfiles.
+    """
+    packages: List[Package] = []
+    name: Optional[str] = None
+
+    for line in text.splitlines():
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        if not line[0].isspace():
+            name = None if line.startswith("__metadata") else _yarn_entry_name(line)
+            continue
+        if name is None:
+            continue
+        m = _YARN_VERSION.match(line)
+        if m:
+            version = m.group(1)
+            if "use.local" not in version:
+                packages.append((name, version, "npm"))
+            name = None
+
+    return packages
+
+
+# -------------------------
+# Go
+# -------------------------
+def parse_go_sum(text: str) -> List[Package]:
+    """
+    Modules whose sources are in the build (a `h1:` line without /go.mod).
+    Entries with only a /go.mod hash were resolved but never downloaded.
+    """
+    packages: List[Package] = []
+    seen = set()
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) != 3 or parts[1].endswith("/go.mod"):
+            continue
+        key = (parts[0], parts[1])
+        if key not in seen:
+            seen.add(key)
+            packages.append((parts[0], parts[1], "golang"))
+    return packages
+
+
+# -------------------------
+# Registry
+# -------------------------
+PARSERS: Dict[str, Callable[[str], List[Package]]] = {
+    "requirements.txt": parse_requirements,
+    "poetry.lock": parse_poetry_lock,
+    "package-lock.json": parse_package_lock,
+    "yarn.lock": parse_yarn_lock,
+    "go.sum": parse_go_sum,
+}
+
+# Manifests that are fine to skip when their lockfile sits next to them
+COVERED_BY = {
+    "pyproject.toml": ("poetry.lock",),
+    "package.json": ("package-lock.json", "yarn.lock"),
+    "go.mod": ("go.sum",),
+}
+
+# CycloneDX purl type / Syft package type per ecosystem
+_ECOSYSTEMS = {
+    "pypi": ("pypi", "python", "python"),
+    "npm": ("npm", "npm", "javascript"),
+    "golang": ("golang", "go-module", "go"),
+}
+
+
+def can_parse(manifests: Iterable[Path]) -> bool:
+    """
+    True if every manifest is either a supported lockfile or is covered by
+    a supported lockfile in the same directory.
+
+    `manifests` must be everything Syft would catalogue (discover_manifests):
+    a single file of another ecosystem (Gemfile.lock, Cargo.lock, ...)
+    makes the native path unsafe.
+    """
+    manifests = list(manifests)
+    present = {(m.parent, m.name) for m in manifests}
+    if not manifests:
+        return False
+
+    for m in manifests:
+        if m.name in PARSERS:
+            continue
+        siblings = COVERED_BY.get(m.name, ())
+        if not any((m.parent, s) in present for s in siblings):
+            return False
+    return True
+
+
+def purl(name: str, version: str, ecosystem: str) -> str:
+    purl_type = _ECOSYSTEMS[ecosystem][0]
+    if ecosystem == "pypi":
+        name = re.sub(r"[-_.]+", "-", name).lower()
+    if ecosystem == "npm" and name.startswith("@"):
+        scope, _, bare = name.partition("/")
+        return f"pkg:npm/{quote(scope)}/{quote(bare)}@{quote(version)}"
+    return f"pkg:{purl_type}/{name}@{quote(version)}"
+
+
+def build_sbom(project_root: str, manifests: Iterable[Path]) -> Dict:
+    """
+    CycloneDX JSON (Syft-compatible location properties) from lockfiles.
+    Raises LockfileParseError if any supported file cannot be parsed.
+    """
+    components: List[Dict] = []
+    seen = set()
+
+    for rel in manifests:
+        parser = PARSERS.get(rel.name)
+        if parser is None:
+            continue
+        try:
+            text = (Path(project_root) / rel).read_text(encoding="utf-8")
+            packages = parser(text)
+        except LockfileParseError:
+            raise
+        except (OSError, UnicodeDecodeError, KeyError, TypeError, AttributeError) as e:
+            raise LockfileParseError(f"{rel}: {e}")
+
+        location = "/" + rel.as_posix()
+        for name, version, ecosystem in packages:
+            ref = purl(name, version, ecosystem)
+            if (ref, location) in seen:
+                continue
+            seen.add((ref, location))
+            _, pkg_type, language = _ECOSYSTEMS[ecosystem]
+            components.append({
+                "bom-ref": f"{ref}?location={location}",
+                "type": "library",
+                "name": name,
+                "version": version,
+                "purl": ref,
+                "properties": [
+                    {"name": "syft:package:type", "value": pkg_type},
+                    {"name": "syft:package:language", "value": language},
+                    {"name": "syft:location:0:path", "value": location},
+                ],
+            })
+
+    return {
+        "bomFormat": "CycloneDX",
+        "specVersion": "1.5",
+        "version": 1,
+        "metadata": {
+            "tools": {"components": [{"type": "application", "name": GENERATOR}]},
+            "component": {"type": "file", "name": str(project_root)},
+        },
+        "components": components,
+    }
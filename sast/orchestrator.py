@@ -1,10 +1,12 @@
 from typing import Dict, Any, List, Optional
+from concurrent.futures import Future
 import tempfile
+import time
 import subprocess
 import shutil
 import os
 
-from agents.contracts import ExecutionPlan, AgentContext
+from agents.contracts import ExecutionPlan, AgentContext, StageTuning
 from agents.planner.planner_fallback import FallbackPlanner
 
 from sast.runner import run_semgrep
@@ -13,12 +15,12 @@ from sast.normalize import normalize_semgrep
 from sast.dast_runner import run_nuclei
 from sast.normalize_dast import normalize_nuclei
 
-from sast.sbom_runner import generate_sbom
-# Imports kept as 'osv' for compatibility, but they now point to Grype logic
-from sast.sca_runner import run_osv_scan
-from sast.normalize_sca import normalize_osv
+from sast.sbom_runner import discover_manifests
+from sast.sca_subprojects import run_sca
 
 from sast.config_runner import run_config_checks
+from sast.response_cache import cache_from_config
+from sast.cache import stable_hash
 from sast.dedup import dedup_findings 
 
 from sast.schema import Finding
@@ -64,25 +66,147 @@ def resolve_repo(repo_input: str) -> tuple[str, bool]:
 def has_dependencies(repo_path: str) -> bool:
     """
     Checks for the existence of dependency manifest files for various languages.
+    Looks below the top level too, so monorepo sub-projects are found.
     """
-    # List of common dependency files for Python, Node, Go, Java, Rust, PHP
-    supported_files = {
-        "requirements.txt", "pyproject.toml", "poetry.lock", 
-        "package.json", "package-lock.json", "yarn.lock",
-        "go.mod", "go.sum",
-        "pom.xml", "build.gradle",
-        "Cargo.toml", "composer.json"
-    }
-    
-    # Check top-level directory only for speed
     try:
-        for f in os.listdir(repo_path):
-            if f in supported_files:
-                return True
+        return bool(discover_manifests(repo_path))
     except OSError:
-        pass
-        
-    return False
+        return False
+
+
+# ============================================================
+# Repo stages (SAST / SCA)
+# ============================================================
+# Each stage takes the scan input + resolved checkout and never raises:
+# failures become SYSTEM findings. Returns {"findings", "tools", ...}.
+# Kept side-effect free towards the scan target, so they may also be
+# started speculatively (agents/speculation.py).
+def run_sast_stage(input: Dict[str, Any], repo_path: str) -> Dict[str, Any]:
+    languages: List[str] = input.get("languages", ["python"])
+    try:
+        # [FIX] Pass languages to runner
+        raw = run_semgrep(
+            repo_path,
+            languages,
+            profile=input.get("semgrep_profile") or "standard",
+            jobs=input.get("semgrep_jobs"),
+        )
+        return {"findings": normalize_semgrep(raw), "tools": ["semgrep"]}
+    except Exception as e:
+        return {
+            "tools": ["semgrep-error"],
+            "findings": [
+                Finding(
+                    category="SYSTEM",
+                    tool="semgrep",
+                    rule_id="semgrep-execution-error",
+                    title="SAST execution failed",
+                    severity="LOW",
+                    confidence="HIGH",
+                    file="semgrep",
+                    line_start=0,
+                    line_end=None,
+                    fingerprint=f"sast-error:{type(e).__name__}",
+                    occurrences=1,
+                    evidence={"error": str(e)},
+                )
+            ],
+        }
+
+
+def run_sca_stage(input: Dict[str, Any], repo_path: str) -> Dict[str, Any]:
+    run_id: str = input["run_id"]
+    sca_backend: str = input.get("sca_backend") or os.environ.get("DEPLAI_SCA_BACKEND", "grype")
+
+    # [FIX] Use generic dependency checker
+    if not has_dependencies(repo_path):
+        return {"findings": [], "tools": ["sca-skipped"]}
+
+    try:
+        # Per sub-project SBOM + matcher, in parallel (monorepos)
+        sca = run_sca(repo_path, run_id, backend=sca_backend, max_workers=input.get("sca_workers"))
+        # [FIX] Correct tool label
+        tools = ["sca-osv-index" if sca_backend == "osv-index" else "sca-grype"]
+        if sca["errors"]:
+            tools.append("sca-error")
+        return {
+            "findings": sca["findings"],
+            "tools": tools,
+            "sca_db": sca["db"],
+            "sca_subprojects": sca["subprojects"],
+        }
+    except Exception as e:
+        return {
+            "tools": ["sca-error"],
+            "findings": [
+                Finding(
+                    category="SYSTEM",
+                    tool="sca",
+                    rule_id="grype-execution-error", # [FIX] Correct rule ID
+                    title="SCA execution failed",
+                    severity="LOW",
+                    confidence="HIGH",
+                    file="dependency-resolution",
+                    line_start=0,
+                    line_end=None,
+                    fingerprint=f"sca-grype-error:{type(e).__name__}", # [FIX] Correct fingerprint
+                    occurrences=1,
+                    evidence={"error": str(e)},
+                )
+            ],
+        }
+
+
+STAGE_RUNNERS = {
+    "sast": run_sast_stage,
+    "sca": run_sca_stage,
+}
+
+
+def timed_stage(runner):
+    """
+    Adds the stage's wall time ("seconds") to its result (runtime history).
+    """
+    def run(input: Dict[str, Any], repo_path: str) -> Dict[str, Any]:
+        started = time.monotonic()
+        result = runner(input, repo_path)
+        return {**result, "seconds": round(time.monotonic() - started, 3)}
+    return run
+
+
+def apply_tuning(input: Dict[str, Any], tuning: Optional[StageTuning]) -> Dict[str, Any]:
+    """
+    Scan input with the plan's stage knobs; knobs set explicitly in the
+    input win (the cost model already sized around them).
+    """
+    if tuning is None:
+        return input
+    tuned = dict(input)
+    tuned.setdefault("semgrep_profile", tuning.semgrep_profile)
+    tuned.setdefault("semgrep_jobs", tuning.semgrep_jobs)
+    tuned.setdefault("sca_backend", tuning.sca_backend)
+    tuned.setdefault("sca_workers", tuning.sca_workers)
+    dast = dict(tuned.get("dast") or {})
+    if dast.get("target_url"):
+        dast.setdefault("profile", tuning.nuclei_profile)
+        tuned["dast"] = dast
+    return tuned
+
+
+def _stage_result(
+    name: str,
+    input: Dict[str, Any],
+    repo_path: str,
+    stages: Optional[Dict[str, Future]],
+) -> Dict[str, Any]:
+    """
+    Result of a precomputed (speculative) stage if one was handed in,
+    otherwise run the stage now.
+    """
+    future = (stages or {}).get(name)
+    if future is not None:
+        return future.result()
+    return timed_stage(STAGE_RUNNERS[name])(input, repo_path)
 
 
 # ============================================================
@@ -92,10 +216,17 @@ def run_security_checks(
     input: Dict[str, Any],
     plan: Optional[ExecutionPlan] = None,
     scope: Optional[ScopePolicy] = None,
+    stages: Optional[Dict[str, Future]] = None,
+    workspace: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Orchestrates all security checks based on the provided plan.
     Now includes fault tolerance for individual tool failures.
+
+    `stages`: already started repo stages ({"sast": Future, ...}) whose
+    results are used instead of running them again.
+    `workspace`: checkout of repo_path already resolved by the caller
+    (who also owns its cleanup).
     """
 
     # --------------------------------------------------------
@@ -131,6 +262,10 @@ def run_security_checks(
         )
         plan = FallbackPlanner().plan(ctx)
 
+    # Cost-model knobs (rule depth, shards, SCA mode, Nuclei profile)
+    input = apply_tuning(input, plan.tuning)
+    dast_cfg = input.get("dast", {})
+
     # --------------------------------------------------------
     # DEFAULT SCOPE (local / tests)
     # --------------------------------------------------------
@@ -179,7 +314,9 @@ def run_security_checks(
     repo_path: Optional[str] = None
     is_temp_clone = False
 
-    if repo_input:
+    if repo_input and workspace:
+        repo_path = workspace
+    elif repo_input:
         try:
             repo_path, is_temp_clone = resolve_repo(repo_input)
         except RuntimeError as e:
@@ -207,68 +344,32 @@ def run_security_checks(
 
     signals: List[Finding] = []
     tools_run: List[str] = []
+    sca_db: Optional[Dict[str, Any]] = None
+    sca_subprojects: Optional[List[str]] = None
+    stage_seconds: Dict[str, float] = {}
 
     try:
         # ====================================================
         # SAST (Semgrep)
         # ====================================================
         if repo_path and plan.run_sast:
-            try:
-                # [FIX] Pass languages to runner
-                raw = run_semgrep(repo_path, languages)
-                signals.extend(normalize_semgrep(raw))
-                tools_run.append("semgrep")
-            except Exception as e:
-                tools_run.append("semgrep-error")
-                signals.append(
-                    Finding(
-                        category="SYSTEM",
-                        tool="semgrep",
-                        rule_id="semgrep-execution-error",
-                        title="SAST execution failed",
-                        severity="LOW",
-                        confidence="HIGH",
-                        file="semgrep",
-                        line_start=0,
-                        line_end=None,
-                        fingerprint=f"sast-error:{type(e).__name__}",
-                        occurrences=1,
-                        evidence={"error": str(e)},
-                    )
-                )
+            sast = _stage_result("sast", input, repo_path, stages)
+            signals.extend(sast["findings"])
+            tools_run.extend(sast["tools"])
+            if "seconds" in sast:
+                stage_seconds["sast"] = sast["seconds"]
 
         # ====================================================
         # SCA (Syft + Grype)
         # ====================================================
         if repo_path and plan.run_sca:
-            # [FIX] Use generic dependency checker
-            if not has_dependencies(repo_path):
-                tools_run.append("sca-skipped")
-            else:
-                try:
-                    sbom_path = generate_sbom(repo_path)
-                    # [FIX] Changed variable names and logs to reflect Grype usage
-                    grype_raw = run_osv_scan(sbom_path) 
-                    signals.extend(normalize_osv(grype_raw, run_id))
-                    tools_run.append("sca-grype") # [FIX] Correct tool label
-                except Exception as e:
-                    tools_run.append("sca-error")
-                    signals.append(
-                        Finding(
-                            category="SYSTEM",
-                            tool="sca",
-                            rule_id="grype-execution-error", # [FIX] Correct rule ID
-                            title="SCA execution failed",
-                            severity="LOW",
-                            confidence="HIGH",
-                            file="dependency-resolution",
-                            line_start=0,
-                            line_end=None,
-                            fingerprint=f"sca-grype-error:{type(e).__name__}", # [FIX] Correct fingerprint
-                            occurrences=1,
-                            evidence={"error": str(e)},
-                        )
-                    )
+            sca = _stage_result("sca", input, repo_path, stages)
+            signals.extend(sca["findings"])
+            tools_run.extend(sca["tools"])
+            sca_db = sca.get("sca_db")
+            sca_subprojects = sca.get("sca_subprojects")
+            if "seconds" in sca:
+                stage_seconds["sca"] = sca["seconds"]
 
         # ====================================================
         # DAST + CONFIG
@@ -288,12 +389,36 @@ def run_security_checks(
                 # 1. Scope Check
                 try:
                     validate_target_url(target_url, scope)
+
+                    # Unchanged deployment -> reuse previous findings (opt-in)
+                    target_cache = cache_from_config(dast_cfg)
+                    nuclei_profile = dast_cfg.get("profile") or "ci"
+                    if scope.safe_mode:
+                        # Deep templates include intrusive checks
+                        nuclei_profile = "ci"
+                    # Header values count: a rotated token / other user is a new scan
+                    nuclei_stage = f"nuclei:{stable_hash(sorted(dast_headers.items()))}"
+                    if nuclei_profile != "ci":
+                        nuclei_stage += f":{nuclei_profile}"
                     
                     # 2. Nuclei (DAST)
                     try:
-                        raw = run_nuclei(target_url, headers=dast_headers)
-                        signals.extend(normalize_nuclei(raw))
-                        tools_run.append("nuclei")
+                        cached = (
+                            target_cache.get_findings(target_url, nuclei_stage)
+                            if target_cache else None
+                        )
+                        if cached is not None:
+                            signals.extend(cached)
+                            tools_run.append("nuclei-cached")
+                        else:
+                            started = time.monotonic()
+                            raw = run_nuclei(target_url, headers=dast_headers, profile=nuclei_profile)
+                            stage_seconds["dast"] = round(time.monotonic() - started, 3)
+                            nuclei_findings = normalize_nuclei(raw)
+                            if target_cache:
+                                target_cache.put(target_url, nuclei_stage, nuclei_findings)
+                            signals.extend(nuclei_findings)
+                            tools_run.append("nuclei")
                     except Exception as e:
                         tools_run.append("nuclei-error")
                         signals.append(Finding(
@@ -304,7 +429,7 @@ def run_security_checks(
 
                     # 3. Config Checks
                     try:
-                        signals.extend(run_config_checks(target_url))
+                        signals.extend(run_config_checks(target_url, cache=target_cache))
                         tools_run.append("config")
                     except Exception as e:
                         tools_run.append("config-error")
@@ -330,12 +455,20 @@ def run_security_checks(
         # [FIX] Deduplicate Findings
         deduped_findings = dedup_findings(signals)
 
-        return {
+        result = {
             "run_id": run_id,
             "status": "completed",
             "tools": tools_run,
             "findings": deduped_findings,
         }
+        if sca_db is not None:
+            result["sca_db"] = sca_db
+        if sca_subprojects is not None:
+            result["sca_subprojects"] = sca_subprojects
+        if stage_seconds:
+            result["stage_seconds"] = stage_seconds
+
+        return result
 
     finally:
         # --------------------------------------------------------
@@ -0,0 +1,226 @@
+"""
+Conditional-Request Cache (DAST / Config)
+=========================================
+
+Purpose:
+- Detect that a deployment is unchanged since the last scan using a few
+  cheap conditional requests (ETag / Last-Modified + content hash)
+- Reuse the previous findings of a stage inside a TTL instead of
+  re-running Nuclei / config checks
+
+One JSON entry per target base URL under cache_dir("targets").
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+
+from sast.cache import cache_dir, write_json_atomic
+from sast.schema import Finding
+
+
+DEFAULT_TTL_SECONDS = 6 * 60 * 60
+USER_AGENT = "deplai-security-check"
+
+
+def target_base(target_url: str) -> str:
+    parsed = urlparse(target_url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def default_probe_paths(target_url: str) -> List[str]:
+    """
+    "/" plus the target's own path (if any) — the key responses of a deployment.
+    """
+    path = urlparse(target_url).path or "/"
+    return list(dict.fromkeys(["/", path]))
+
+
+class TargetCache:
+    """
+    Per-target response cache.
+
+    Usage:
+        cache = TargetCache(ttl_seconds=3600)
+        findings = cache.get_findings(url, "nuclei")
+        if findings is None:
+            findings = ...full scan...
+            cache.put(url, "nuclei", findings)
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        directory: Optional[Path] = None,
+        probe_paths: Optional[Sequence[str]] = None,
+        timeout: int = 10,
+        session: Optional[requests.Session] = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.directory = Path(directory) if directory else cache_dir("targets")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.probe_paths = list(probe_paths) if probe_paths else None
+        self.timeout = timeout
+        self.session = session or requests.Session()
+
+        # Probe results of this process, so several stages share one probe
+        self._probes: Dict[str, Optional[Dict[str, Dict[str, Any]]]] = {}
+        self._verdicts: Dict[str, bool] = {}
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+    def _entry_path(self, base: str) -> Path:
+        key = hashlib.sha256(base.encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.json"
+
+    def _load(self, base: str) -> Dict[str, Any]:
+        path = self._entry_path(base)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    # ------------------------------------------------------------------
+    # Probing
+    # ------------------------------------------------------------------
+    def _probe(self, target_url: str, previous: Dict[str, Any]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Conditional GET of each probe path. Returns the fresh validators per
+        path, or None if any probe failed (treated as "changed").
+        """
+        base = target_base(target_url)
+        paths = self.probe_paths or default_probe_paths(target_url)
+        known = previous.get("probes", {})
+        probes: Dict[str, Dict[str, Any]] = {}
+
+        for path in paths:
+            old = known.get(path, {})
+            headers = {"User-Agent": USER_AGENT}
+            if old.get("etag"):
+                headers["If-None-Match"] = old["etag"]
+            if old.get("last_modified"):
+                headers["If-Modified-Since"] = old["last_modified"]
+
+            try:
+                resp = self.session.get(
+                    base + path,
+                    headers=headers,
+                    timeout=self.timeout,
+                    allow_redirects=True,
+                )
+            except Exception:
+                return None
+
+            if resp.status_code == 304 and old:
+                probes[path] = dict(old, not_modified=True)
+                continue
+
+            probes[path] = {
+                "status": resp.status_code,
+                "etag": resp.headers.get("ETag", ""),
+                "last_modified": resp.headers.get("Last-Modified", ""),
+                "content_hash": hashlib.sha256(resp.content or b"").hexdigest(),
+                "not_modified": False,
+            }
+
+        return probes
+
+    def is_unchanged(self, target_url: str) -> bool:
+        """
+        True if every probe path answered 304 or returned identical content.
+        Probed once per target per TargetCache instance.
+        """
+        base = target_base(target_url)
+        if base in self._verdicts:
+            return self._verdicts[base]
+
+        previous = self._load(base)
+        probes = self._probe(target_url, previous)
+        self._probes[base] = probes
+
+        unchanged = False
+        known = previous.get("probes", {})
+        if probes is not None and known and set(probes) == set(known):
+            unchanged = all(
+                p.get("not_modified")
+                or (
+                    p["status"] == known[path].get("status")
+                    and p["content_hash"] == known[path].get("content_hash")
+                )
+                for path, p in probes.items()
+            )
+
+        self._verdicts[base] = unchanged
+        return unchanged
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def get_findings(self, target_url: str, stage: str) -> Optional[List[Finding]]:
+        """
+        Previous findings of `stage` for this target, or None if the stage
+        must run (no entry, expired TTL, or the deployment changed).
+        """
+        base = target_base(target_url)
+        stored = self._load(base).get("stages", {}).get(stage)
+        if not stored:
+            return None
+
+        if time.time() - stored.get("stored_at", 0) > self.ttl_seconds:
+            return None
+
+        if not self.is_unchanged(target_url):
+            return None
+
+        return [Finding.from_record(r) for r in stored.get("findings", [])]
+
+    def put(self, target_url: str, stage: str, findings: List[Finding]) -> None:
+        """
+        Record fresh findings for `stage` together with current validators.
+        """
+        base = target_base(target_url)
+        unchanged = self.is_unchanged(target_url)
+        probes = self._probes.get(base)
+        entry = self._load(base)
+
+        # Changed deployment invalidates every other stage's findings too
+        if not unchanged:
+            entry["stages"] = {}
+
+        if probes is not None:
+            entry["probes"] = {
+                path: {k: v for k, v in p.items() if k != "not_modified"}
+                for path, p in probes.items()
+            }
+        entry.setdefault("stages", {})[stage] = {
+            "stored_at": time.time(),
+            "findings": [f.to_record() for f in findings],
+        }
+
+        write_json_atomic(self._entry_path(base), entry)
+        self._verdicts[base] = probes is not None
+
+
+def cache_from_config(dast_cfg: Dict[str, Any]) -> Optional[TargetCache]:
+    """
+    Build a TargetCache from the scan input's `dast` block.
+    Enabled by `cache_ttl_seconds` (or DEPLAI_DAST_CACHE_TTL); 0 disables.
+    """
+    ttl = dast_cfg.get("cache_ttl_seconds", os.environ.get("DEPLAI_DAST_CACHE_TTL", 0))
+    try:
+        ttl = int(ttl)
+    except (TypeError, ValueError):
+        return None
+
+    if ttl <= 0:
+        return None
+
+    return TargetCache(ttl_seconds=ttl, probe_paths=dast_cfg.get("cache_probe_paths"))
@@ -2,12 +2,29 @@ import subprocess
 import json
 import tempfile
 import os
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
-def run_semgrep(repo_path: str, languages: List[str] = None) -> Dict[str, Any]:
+# Rule depth (chosen by the planner cost model)
+#   fast      language rulesets, tests / vendored code skipped, short per-file timeout
+#   standard  language rulesets
+#   deep      + security-audit and secrets rulesets, longer per-file timeout
+SEMGREP_PROFILES = ("fast", "standard", "deep")
+FAST_EXCLUDES = ["tests", "test", "vendor", "node_modules", "third_party", "*.min.js"]
+
+
+def run_semgrep(
+    repo_path: str,
+    languages: List[str] = None,
+    profile: str = "standard",
+    jobs: Optional[int] = None,
+) -> Dict[str, Any]:
     """
     Run Semgrep in JSON mode with dynamic language support.
+    `jobs`: parallel subprocesses (semgrep --jobs); None = semgrep default.
     """
+    if profile not in SEMGREP_PROFILES:
+        raise ValueError(f"Unknown semgrep profile: {profile}")
+
     # [FIX] Handle dynamic languages
     if not languages:
         languages = ["python"] # Default fallback
@@ -21,6 +38,14 @@ def run_semgrep(repo_path: str, languages: List[str] = None) -> Dict[str, Any]:
         # Map common names to semgrep rulesets if needed, or use direct naming
         config_flags.append(f"--config=p/{lang}")
 
+    if profile == "fast":
+        config_flags += [f"--exclude={pattern}" for pattern in FAST_EXCLUDES]
+        config_flags += ["--timeout=5", "--max-target-bytes=500000"]
+    elif profile == "deep":
+        config_flags += ["--config=p/security-audit", "--config=p/secrets", "--timeout=30"]
+    if jobs:
+        config_flags.append(f"--jobs={int(jobs)}")
+
     cmd = [
         "semgrep",
         "scan",
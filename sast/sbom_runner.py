@@ -1,22 +1,195 @@
 from pathlib import Path
+from functools import lru_cache
+from typing import List, Optional, Sequence
+import fnmatch
+import hashlib
+import os
+import re
 import subprocess
+import threading
+
+from sast.cache import cache_dir, stable_hash, write_json_atomic
+from sast import lockfiles
 
 class SBOMGenerationError(RuntimeError):
     pass
 
-def generate_sbom(project_root: str) -> Path:
+# Every dependency manifest / lockfile Syft catalogues. One list for
+# sub-project discovery, the SBOM cache key and the native-parser check,
+# so a file Syft reads can never be missed by any of them.
+MANIFEST_FILES = {
+    # Python
+    "requirements.txt", "pyproject.toml", "poetry.lock", "Pipfile", "Pipfile.lock",
+    "setup.py", "uv.lock", "pdm.lock",
+    # JavaScript
+    "package.json", "package-lock.json", "npm-shrinkwrap.json", "yarn.lock", "pnpm-lock.yaml",
+    # Go
+    "go.mod", "go.sum",
+    # Java / JVM
+    "pom.xml", "build.gradle", "build.gradle.kts", "gradle.lockfile",
+    # Rust
+    "Cargo.toml", "Cargo.lock",
+    # PHP
+    "composer.json", "composer.lock",
+    # Ruby
+    "Gemfile", "Gemfile.lock",
+    # .NET
+    "packages.lock.json", "packages.config",
+    # Dart, Elixir, Erlang, Swift / CocoaPods, Haskell, C/C++
+    "pubspec.lock", "mix.lock", "rebar.lock", "Package.resolved", "Podfile.lock",
+    "stack.yaml.lock", "cabal.project.freeze", "conan.lock",
+}
+
+# Name patterns Syft matches as well (e.g. requirements-dev.txt)
+MANIFEST_PATTERNS = ("*requirements*.txt", "*.deps.json")
+_MANIFEST_PATTERN = re.compile("|".join(fnmatch.translate(p) for p in MANIFEST_PATTERNS))
+
+
+# Packaged artifacts Syft catalogues in a directory scan (Java archives)
+ARCHIVE_PATTERNS = ("*.jar", "*.war", "*.ear", "*.jpi", "*.hpi")
+_ARCHIVE_PATTERN = re.compile("|".join(fnmatch.translate(p) for p in ARCHIVE_PATTERNS))
+
+
+def is_manifest(name: str) -> bool:
+    return name in MANIFEST_FILES or _MANIFEST_PATTERN.match(name) is not None
+
+# Never descend into these when looking for manifests. Syft is told to
+# skip them too, so the SBOM cache key covers everything Syft reads.
+SKIP_DIRS = {
+    ".git", "node_modules", "vendor", ".venv", "venv",
+    "__pycache__", ".tox", ".nox", "dist", "build",
+}
+SYFT_EXCLUDES = tuple(f"**/{d}/**" for d in sorted(SKIP_DIRS))
+
+
+def discover_manifests(project_root: str) -> List[Path]:
+    """
+    All dependency manifests under project_root (relative, sorted).
+    """
+    root = Path(project_root)
+    found: List[Path] = []
+
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        for name in filenames:
+            if is_manifest(name):
+                found.append(Path(dirpath, name).relative_to(root))
+
+    return sorted(found)
+
+
+def discover_archives(project_root: str, exclude: Sequence[str] = ()) -> List[Path]:
+    """
+    Java archives under project_root (relative, sorted), outside SKIP_DIRS
+    and the `exclude`d sub-project dirs.
+    """
+    root = Path(project_root)
+    skipped = {Path(rel) for rel in exclude}
+    found: List[Path] = []
+
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = Path(dirpath).relative_to(root)
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and rel_dir / d not in skipped]
+        for name in filenames:
+            if _ARCHIVE_PATTERN.match(name):
+                found.append(rel_dir / name)
+
+    return sorted(found)
+
+
+@lru_cache(maxsize=1)
+def syft_version() -> str:
+    try:
+        out = subprocess.run(
+            ["syft", "version"],
+            capture_output=True,
+            text=True,
+            timeout=15,
+        ).stdout
+    except (OSError, subprocess.TimeoutExpired):
+        return "unknown"
+
+    for line in out.splitlines():
+        if line.lower().startswith("version:"):
+            return line.split(":", 1)[1].strip()
+    return out.strip() or "unknown"
+
+
+def sbom_cache_key(project_root: str, manifests: List[Path], generator: str = "") -> str:
+    """
+    Content hashes of `manifests` (the dependency files of MANIFEST_FILES,
+    plus the Java archives on the Syft path) + the SBOM generator version
+    (Syft version by default). Syft runs with SYFT_EXCLUDES, so files
+    under SKIP_DIRS never reach it and are not hashed.
+    """
+    files = {}
+    for rel in manifests:
+        with open(Path(project_root) / rel, "rb") as f:
+            files[rel.as_posix()] = hashlib.sha256(f.read()).hexdigest()
+
+    return stable_hash({"syft": generator or syft_version(), "files": files})
+
+
+def generate_sbom(
+    project_root: str,
+    use_cache: bool = True,
+    use_native: bool = True,
+    manifests: Optional[List[Path]] = None,
+    exclude: Sequence[str] = (),
+) -> Path:
     """
-    Generate a CycloneDX SBOM using Syft.
-    Syft is universal (Python, JS, Go, Rust, Java, etc.).
+    Generate a CycloneDX SBOM.
+
+    Lockfile-only repos (requirements.txt, poetry.lock, package-lock.json,
+    yarn.lock, go.sum) are parsed in-process; everything else goes through
+    Syft, which is universal (Python, JS, Go, Rust, Java, etc.).
+
+    `manifests` / `exclude` scope the SBOM to one sub-project of a monorepo
+    (its own manifests; nested sub-project dirs excluded from Syft).
+
+    The SBOM is written to the SBOM cache (outside the scanned tree) and
+    reused while no manifest/lockfile (or, for Syft, Java archive) changed.
     """
-    sbom_path = Path(project_root) / "sbom.json"
-    
+    if manifests is None:
+        manifests = discover_manifests(project_root)
+
+    if use_native and lockfiles.can_parse(manifests):
+        key = sbom_cache_key(project_root, manifests, generator=lockfiles.GENERATOR)
+        sbom_path = cache_dir("sbom") / f"{key}.json"
+
+        if use_cache and sbom_path.exists() and sbom_path.stat().st_size > 0:
+            print(f"📦 SBOM cache hit for: {project_root}")
+            return sbom_path
+
+        try:
+            print(f"📦 Generating SBOM from lockfiles for: {project_root}")
+            write_json_atomic(sbom_path, lockfiles.build_sbom(project_root, manifests))
+            return sbom_path
+        except lockfiles.LockfileParseError as e:
+            print(f"⚠️ Lockfile parsing failed ({e}); falling back to Syft")
+
+    generator = syft_version() + "|skip=" + ",".join(SYFT_EXCLUDES)
+    if exclude:
+        generator += "|exclude=" + ",".join(sorted(exclude))
+    key = sbom_cache_key(project_root, manifests + discover_archives(project_root, exclude), generator=generator)
+    sbom_path = cache_dir("sbom") / f"{key}.json"
+
+    if use_cache and sbom_path.exists() and sbom_path.stat().st_size > 0:
+        print(f"📦 SBOM cache hit for: {project_root}")
+        return sbom_path
+
+    tmp_path = sbom_path.with_name(f".{key}.{os.getpid()}.{threading.get_ident()}.tmp.json")
+
     # Syft command: Scan directory (.) and output CycloneDX JSON
     cmd = [
         "syft",
         f"dir:{project_root}",
-        "-o", f"cyclonedx-json={sbom_path}"
+        "-o", f"cyclonedx-json={tmp_path}"
     ]
+    for pattern in SYFT_EXCLUDES:
+        cmd.extend(["--exclude", pattern])
+    for rel in exclude:
+        cmd.extend(["--exclude", f"./{rel}/**"])
 
     try:
         print(f"📦 Generating SBOM with Syft for: {project_root}")
@@ -27,15 +200,18 @@ def generate_sbom(project_root: str) -> Path:
             text=True,
             timeout=120
         )
-        
-        if sbom_path.exists() and sbom_path.stat().st_size > 0:
+
+        if tmp_path.exists() and tmp_path.stat().st_size > 0:
+            os.replace(tmp_path, sbom_path)
             return sbom_path
-            
+
     except subprocess.CalledProcessError as e:
         raise SBOMGenerationError(f"Syft failed: {e.stderr}")
     except subprocess.TimeoutExpired:
         raise SBOMGenerationError("Syft timed out (limit: 120s)")
     except Exception as e:
         raise SBOMGenerationError(f"SBOM generation failed: {str(e)}")
+    finally:
+        tmp_path.unlink(missing_ok=True)
 
-    raise SBOMGenerationError("Syft produced an empty SBOM.")
\ No newline at end of file
+    raise SBOMGenerationError("Syft produced an empty SBOM.")
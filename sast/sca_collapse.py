@@ -0,0 +1,165 @@
+"""
+SCA Collapse
+============
+
+Purpose:
+- Aggregate SCA entities per vulnerable dependency (package@version,
+  per sub-project) instead of one entity per (package, version, CVE)
+- Carry the CVE set, the max severity and the minimal fix version that
+  resolves every CVE on the collapsed entity
+
+One hash-grouping pass over the entities; non-SCA entities pass through
+untouched and in order.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+
+from sast.entity import FindingEntity, SEVERITY_RANK, max_confidence, merge_members
+from sast.schema import Finding
+from sast.versions import max_version, version_key
+
+# (package, version, type, subproject)
+PackageKey = Tuple[str, str, str, str]
+
+
+def finding_package_evidence(finding: Finding) -> Optional[Dict[str, Any]]:
+    """
+    The Grype evidence of an SCA finding. Dedup may have nested it under
+    "signals", so look there too.
+    """
+    evidence = finding.evidence or {}
+    if "package" in evidence:
+        return evidence
+    for nested in evidence.get("signals", []):
+        if isinstance(nested, dict) and "package" in nested:
+            return nested
+    return None
+
+
+def package_evidence(entity: FindingEntity) -> Optional[Dict[str, Any]]:
+    for signal in entity.signals:
+        evidence = finding_package_evidence(signal)
+        if evidence is not None:
+            return evidence
+    return None
+
+
+def package_key(evidence: Dict[str, Any]) -> PackageKey:
+    return (
+        evidence.get("package", "unknown"),
+        evidence.get("version", "unknown"),
+        evidence.get("type", "unknown"),
+        evidence.get("subproject", ""),
+    )
+
+
+def minimal_fix(current: str, fixes_by_vuln: Dict[str, List[str]]) -> Tuple[Optional[str], List[str]]:
+    """
+    Lowest version that fixes every vulnerability: for each vuln the lowest
+    fix above `current`, then the highest of those.
+    Returns (fix_version, vulns_without_fix).
+    """
+    current_key = version_key(current)
+    required: List[str] = []
+    unfixed: List[str] = []
+
+    for vuln_id, fixes in fixes_by_vuln.items():
+        if not fixes:
+            unfixed.append(vuln_id)
+            continue
+        # A fix at or below `current` (e.g. on another release line) is no upgrade
+        newer = [f for f in fixes if f and version_key(f) > current_key]
+        if newer:
+            required.append(min(newer, key=version_key))
+        else:
+            unfixed.append(vuln_id)
+
+    return max_version(required), sorted(unfixed)
+
+
+def _collapse_group(key: PackageKey, members: List[FindingEntity], evidences: List[Dict[str, Any]]) -> FindingEntity:
+    package, version, pkg_type, subproject = key
+
+    fixes_by_vuln: Dict[str, List[str]] = {}
+    rank_by_vuln: Dict[str, int] = {}
+    severity_by_vuln: Dict[str, str] = {}
+    for entity, evidence in zip(members, evidences):
+        vuln = entity.weakness
+        fixes = evidence.get("fix_versions")
+        if vuln in fixes_by_vuln:
+            if fixes:
+                fixes_by_vuln[vuln].extend(fixes)
+        else:
+            fixes_by_vuln[vuln] = list(fixes or ())
+        rank = SEVERITY_RANK.get(entity.severity, 0)
+        if rank >= rank_by_vuln.get(vuln, -1):
+            rank_by_vuln[vuln] = rank
+            severity_by_vuln[vuln] = entity.severity
+
+    vulns = sorted(fixes_by_vuln)
+    table, members_idx = merge_members(members)
+    fix_version, unfixed = minimal_fix(version, fixes_by_vuln)
+    worst = max(vulns, key=lambda v: (rank_by_vuln[v], v))
+    severity = severity_by_vuln[worst]
+
+    identity = f"sca|{package}|{version}|{pkg_type}|{subproject}"
+    title = (
+        members[0].title if len(vulns) == 1
+        else f"{package} ({version}) has {len(vulns)} known vulnerabilities"
+    )
+
+    return FindingEntity(
+        entity_id=hashlib.sha256(identity.encode()).hexdigest(),
+        title=title,
+        category="SCA",
+        severity=severity,
+        confidence=max_confidence(e.confidence for e in members),
+        weakness=worst,
+        location=members[0].location,
+        members=members_idx,
+        table=table,
+        status=members[0].status,
+        first_seen=min(e.first_seen for e in members),
+        last_seen=max(e.last_seen for e in members),
+        context=dict(members[0].context),
+        attributes={
+            **members[0].attributes,
+            "package": package,
+            "version": version,
+            "type": pkg_type,
+            "subproject": subproject,
+            "vulnerabilities": vulns,
+            "severity_by_vulnerability": severity_by_vuln,
+            "fix_version": fix_version,
+            "unfixed": unfixed,
+        },
+    )
+
+
+def collapse_sca_entities(entities: List[FindingEntity]) -> List[FindingEntity]:
+    """
+    One entity per vulnerable package@version (per sub-project).
+    """
+    out: List[Optional[FindingEntity]] = []
+    groups: Dict[PackageKey, Tuple[int, List[FindingEntity], List[Dict[str, Any]]]] = {}
+
+    for entity in entities:
+        evidence = package_evidence(entity) if entity.category == "SCA" else None
+        if evidence is None:
+            out.append(entity)
+            continue
+
+        key = package_key(evidence)
+        group = groups.get(key)
+        if group is None:
+            groups[key] = (len(out), [entity], [evidence])
+            out.append(None)  # slot of the collapsed entity
+        else:
+            group[1].append(entity)
+            group[2].append(evidence)
+
+    for key, (slot, members, evidences) in groups.items():
+        out[slot] = _collapse_group(key, members, evidences)
+
+    return out
@@ -1,7 +1,18 @@
+from contextlib import contextmanager
 from pathlib import Path
+from functools import lru_cache
+from typing import Iterator, Optional
 import subprocess
+import tempfile
 import json
 
+from sast.grype_db import worker_env
+from sast.advisory_index import AdvisoryIndex, AdvisoryIndexError
+from sast.grype_stream import GrypeMatchStream, GrypeStreamError
+
+# Available SCA matchers ("grype" subprocess, or the in-process index)
+SCA_BACKENDS = ("grype", "osv-index")
+
 class SCARunnerError(RuntimeError):
     pass
 
@@ -14,6 +25,7 @@ def run_osv_scan(sbom_path: Path) -> dict:
         raise SCARunnerError(f"SBOM not found at {sbom_path}")
 
     # Grype command: Scan the SBOM file and output JSON
+    # (shared pinned DB, never auto-updates inside a worker)
     cmd = [
         "grype",
         f"sbom:{sbom_path}",
@@ -27,6 +39,7 @@ def run_osv_scan(sbom_path: Path) -> dict:
             check=True,
             capture_output=True,
             text=True,
+            env=worker_env(),
         )
         return json.loads(result.stdout)
 
@@ -36,5 +49,93 @@ def run_osv_scan(sbom_path: Path) -> dict:
         raise SCARunnerError(f"Invalid JSON returned by Grype: {str(e)}")
 
 
+@contextmanager
+def stream_osv_scan(sbom_path: Path) -> Iterator[GrypeMatchStream]:
+    """
+    Streaming variant of run_osv_scan for very large match sets.
+
+        with stream_osv_scan(sbom) as matches:
+            for match in matches: ...
+            descriptor = matches.document["descriptor"]
+
+    Matches are parsed from Grype's stdout as they arrive; the full report
+    is never held in memory. Grype's exit status is checked on exit.
+    """
+    if not sbom_path.exists():
+        raise SCARunnerError(f"SBOM not found at {sbom_path}")
+
+    cmd = [
+        "grype",
+        f"sbom:{sbom_path}",
+        "-o", "json"
+    ]
+
+    print(f"🔍 Scanning SBOM with Grype (streaming): {sbom_path}")
+    # stderr goes to a file so a chatty Grype cannot block on a full pipe
+    with tempfile.TemporaryFile(mode="w+", encoding="utf-8") as stderr:
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=stderr,
+            text=True,
+            encoding="utf-8",
+            env=worker_env(),
+        )
+        try:
+            stream = GrypeMatchStream(proc.stdout)
+            parse_error: Optional[GrypeStreamError] = None
+            try:
+                yield stream
+            except GrypeStreamError as e:
+                parse_error = e
+            # Drain before waiting: a Grype still writing would block on a
+            # full pipe while we block in wait()
+            while proc.stdout.read(1 << 16):
+                pass
+            proc.stdout.close()
+            # A truncated report is usually Grype dying mid-write: its own
+            # error is the one to report
+            if proc.wait() != 0:
+                stderr.seek(0)
+                raise SCARunnerError(f"Grype failed: {stderr.read().strip()}")
+            if parse_error is not None:
+                raise SCARunnerError(str(parse_error))
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            if proc.stdout and not proc.stdout.closed:
+                proc.stdout.close()
+
+
+# -------------------------
+# In-process backend (local advisory index)
+# -------------------------
+@lru_cache(maxsize=4)
+def get_advisory_index(index_path: Optional[str] = None) -> AdvisoryIndex:
+    """
+    One memory-mapped index per process (pages shared between workers).
+    """
+    return AdvisoryIndex(index_path)
+
+
+def run_index_scan(sbom_path: Path, index_path: Optional[str] = None) -> dict:
+    """
+    Match a CycloneDX SBOM against the local OSV advisory index.
+    Returns the same `matches` shape as run_osv_scan.
+    """
+    if not sbom_path.exists():
+        raise SCARunnerError(f"SBOM not found at {sbom_path}")
+
+    try:
+        index = get_advisory_index(index_path)
+        with open(sbom_path, "r", encoding="utf-8") as f:
+            sbom = json.load(f)
+    except AdvisoryIndexError as e:
+        raise SCARunnerError(str(e))
+    except json.JSONDecodeError as e:
+        raise SCARunnerError(f"Invalid SBOM JSON: {str(e)}")
 
+    print(f"🔍 Matching SBOM against local advisory index: {sbom_path}")
+    return index.match_sbom(sbom)
 
@@ -0,0 +1,173 @@
+"""
+Monorepo SCA (per sub-project, parallel)
+=======================================
+
+Purpose:
+- Split a repo into sub-projects by manifest location
+- Generate SBOMs and run the SCA matcher for each sub-project on a
+  bounded pool (no single Syft timeout for the whole monorepo)
+- Scan identical lockfile sets only once and attribute the results to
+  every sub-project sharing them
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import os
+
+from sast.cache import stable_hash
+from sast.grype_db import describe_db
+from sast.normalize_sca import normalize_match, normalize_osv
+from sast.sbom_runner import discover_manifests, generate_sbom
+from sast.sca_runner import run_index_scan, stream_osv_scan
+from sast.schema import Finding
+
+
+@dataclass(frozen=True)
+class SubProject:
+    """
+    One directory holding dependency manifests ("." = repo root).
+    """
+    path: str
+    manifests: Tuple[Path, ...]  # relative to the sub-project directory
+
+
+def split_subprojects(repo_path: str) -> List[SubProject]:
+    by_dir: Dict[str, List[Path]] = {}
+    for rel in discover_manifests(repo_path):
+        by_dir.setdefault(rel.parent.as_posix(), []).append(Path(rel.name))
+
+    return [SubProject(path=d, manifests=tuple(sorted(m))) for d, m in sorted(by_dir.items())]
+
+
+def nested_dirs(sub: SubProject, subprojects: List[SubProject]) -> List[str]:
+    """
+    Sub-project dirs below `sub`, relative to it (excluded from its Syft run).
+    """
+    prefix = "" if sub.path == "." else sub.path + "/"
+    return [
+        other.path[len(prefix):]
+        for other in subprojects
+        if other.path != sub.path and other.path != "." and other.path.startswith(prefix)
+    ]
+
+
+def lockfile_key(repo_path: str, sub: SubProject) -> str:
+    """
+    Identity of a sub-project's dependency set: manifest names + contents.
+    """
+    files = []
+    for name in sub.manifests:
+        with open(Path(repo_path, sub.path, name), "rb") as f:
+            files.append((name.as_posix(), hashlib.sha256(f.read()).hexdigest()))
+    return stable_hash(files)
+
+
+def scan_subproject(
+    repo_path: str,
+    members: List[SubProject],
+    subprojects: List[SubProject],
+    backend: str,
+    run_id: str,
+) -> Tuple[List[Finding], Optional[Dict[str, Any]]]:
+    """
+    One SBOM + matcher run for a group of identical sub-projects.
+
+    Grype output is streamed and normalized match by match: one decoded
+    match is held at a time and each finding goes straight into the
+    result. The raw Grype document is never buffered, but the returned
+    findings are (run_sca / dedup need all of them), so peak memory still
+    grows with the number of findings.
+    """
+    sub = members[0]
+    root = str(Path(repo_path, sub.path))
+    sbom_path = generate_sbom(
+        root,
+        manifests=list(sub.manifests),
+        exclude=nested_dirs(sub, subprojects),
+    )
+
+    findings: List[Finding] = []
+    if backend == "osv-index":
+        raw = run_index_scan(sbom_path)
+        for member in members:
+            findings.extend(normalize_osv(raw, run_id, subproject=member.path))
+        return findings, {"index": raw.get("descriptor", {}).get("db")}
+
+    with stream_osv_scan(sbom_path) as matches:
+        for match in matches:
+            for member in members:
+                findings.append(normalize_match(match, run_id, subproject=member.path))
+    return findings, describe_db(matches.document)
+
+
+def run_sca(
+    repo_path: str,
+    run_id: str,
+    backend: str = "grype",
+    max_workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    SCA over every sub-project. Returns:
+        {"findings": [...], "subprojects": [...], "deduplicated": int,
+         "errors": int, "db": {...}}
+    """
+    subprojects = split_subprojects(repo_path)
+    if not subprojects:
+        return {"findings": [], "subprojects": [], "deduplicated": 0, "errors": 0, "db": None}
+
+    # Identical lockfile sets -> one scan
+    groups: Dict[str, List[SubProject]] = {}
+    for sub in subprojects:
+        groups.setdefault(lockfile_key(repo_path, sub), []).append(sub)
+
+    workers = max_workers or min(32, os.cpu_count() or 1)
+    workers = max(1, min(workers, len(groups)))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sca") as pool:
+        futures = {
+            key: pool.submit(scan_subproject, repo_path, members, subprojects, backend, run_id)
+            for key, members in groups.items()
+        }
+
+    findings: List[Finding] = []
+    errors = 0
+    db = None
+
+    for key, members in groups.items():
+        try:
+            group_findings, group_db = futures[key].result()
+        except Exception as e:
+            errors += 1
+            for sub in members:
+                findings.append(
+                    Finding(
+                        category="SYSTEM",
+                        tool="sca",
+                        rule_id="grype-execution-error",
+                        title="SCA execution failed",
+                        severity="LOW",
+                        confidence="HIGH",
+                        file=sub.path,
+                        line_start=0,
+                        line_end=None,
+                        fingerprint=f"sca-grype-error:{type(e).__name__}:{sub.path}",
+                        occurrences=1,
+                        evidence={"error": str(e), "subproject": sub.path},
+                    )
+                )
+            continue
+
+        if db is None:
+            db = group_db
+        findings.extend(group_findings)
+
+    return {
+        "findings": findings,
+        "subprojects": [s.path for s in subprojects],
+        "deduplicated": len(subprojects) - len(groups),
+        "errors": errors,
+        "db": db,
+    }
@@ -70,4 +70,40 @@ class Finding:
             "rule_id": self.rule_id,
             "occurrences": self.occurrences,
             "evidence": self.evidence
-        }
\ No newline at end of file
+        }
+
+    # -------------------------
+    # Persistence (caches / state stores)
+    # -------------------------
+    def to_record(self) -> Dict[str, Any]:
+        """
+        Full, JSON-safe snapshot of the finding (unlike to_dict, which is
+        the API view and drops file/line).
+        """
+        return {
+            "fingerprint": self.fingerprint,
+            "title": self.title,
+            "severity": self.severity,
+            "status": self.status,
+            "repo": self.repo,
+            "category": self.category,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "file": self.file,
+            "file_path": self.file_path,
+            "line": self.line,
+            "url": self.url,
+            "confidence": self.confidence,
+            "tool": self.tool,
+            "rule_id": self.rule_id,
+            "occurrences": self.occurrences,
+            "evidence": self.evidence,
+        }
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "Finding":
+        finding = cls(**record)
+        # __init__ does not map confidence; restore it explicitly
+        if "confidence" in record:
+            finding.confidence = record["confidence"]
+        return finding
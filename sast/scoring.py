@@ -0,0 +1,193 @@
+"""
+Risk Scoring
+============
+
+Purpose:
+- Score entities 0-10 from severity, confidence, category, cross-tool
+  corroboration, triage `recently_changed` and reachability
+- Score in batches: every signal is encoded to a small integer code and
+  the score is one lookup in a precomputed table (no per-object branching)
+- Rank large entity sets by risk quickly for the dashboard
+
+The encoding is a plain Python loop over the entities either way; numpy
+(optional, not a requirement) only takes over the final table gather and
+the sort in rank_by_risk.
+
+Scores above KNEE are compressed towards MAX_SCORE instead of clamped, so
+stacked factors on CRITICAL findings still order the top of the ranking.
+"""
+
+from itertools import product
+from typing import Any, Dict, List, Optional, Sequence
+import math
+
+try:
+    import numpy as np
+except ImportError:  # optional
+    np = None
+
+from sast.entity import FindingEntity, normalize_severity
+
+# -------------------------
+# Factors (order of each tuple = integer code)
+# -------------------------
+SEVERITIES = ("UNKNOWN", "INFO", "LOW", "MEDIUM", "HIGH", "CRITICAL")
+SEVERITY_WEIGHT = (0.5, 0.5, 1.5, 4.0, 7.0, 9.0)
+
+CONFIDENCES = ("UNKNOWN", "LOW", "MEDIUM", "HIGH")
+CONFIDENCE_FACTOR = (0.7, 0.6, 0.8, 1.0)
+
+CATEGORIES = ("OTHER", "SAST", "DAST", "SCA", "CONFIG", "SYSTEM")
+CATEGORY_FACTOR = (1.0, 1.0, 1.1, 0.9, 0.8, 0.0)  # DAST = confirmed at runtime
+
+CORROBORATION_FACTOR = (1.0, 1.0, 1.15, 1.25)  # tools: 0, 1, 2, 3+
+RECENT_FACTOR = (1.0, 1.2)                     # recently_changed: no / yes
+REACHABILITY_FACTOR = (1.0, 1.3, 0.5)          # unknown / reachable / unreachable
+
+MAX_SCORE = 10.0
+KNEE = 7.0  # raw scores up to here are kept as is
+
+_SEV_CODE = {s: i for i, s in enumerate(SEVERITIES)}
+_CONF_CODE = {c: i for i, c in enumerate(CONFIDENCES)}
+_CAT_CODE = {c: i for i, c in enumerate(CATEGORIES)}
+_REACH_CODE = {None: 0, True: 1, False: 2}
+
+_DIMS = (
+    len(SEVERITIES),
+    len(CONFIDENCES),
+    len(CATEGORIES),
+    len(CORROBORATION_FACTOR),
+    len(RECENT_FACTOR),
+    len(REACHABILITY_FACTOR),
+)
+
+
+def _build_table() -> List[float]:
+    table = []
+    for sev, conf, cat, tools, recent, reach in product(*(range(d) for d in _DIMS)):
+        score = (
+            SEVERITY_WEIGHT[sev]
+            * CONFIDENCE_FACTOR[conf]
+            * CATEGORY_FACTOR[cat]
+            * CORROBORATION_FACTOR[tools]
+            * RECENT_FACTOR[recent]
+            * REACHABILITY_FACTOR[reach]
+        )
+        table.append(round(_compress(score), 2))
+    return table
+
+
+def _compress(score: float) -> float:
+    """
+    Identity up to KNEE, then strictly increasing and below MAX_SCORE.
+    """
+    if score <= KNEE:
+        return score
+    room = MAX_SCORE - KNEE
+    return KNEE + room * (1 - math.exp(-(score - KNEE) / room))
+
+
+# Flat table indexed by the mixed-radix code of all factors
+SCORE_TABLE = _build_table()
+_SCORE_ARRAY = np.array(SCORE_TABLE) if np is not None else None
+
+
+# -------------------------
+# Encoding
+# -------------------------
+def _encode(
+    severities: Sequence[str],
+    confidences: Sequence[str],
+    categories: Sequence[str],
+    tool_counts: Sequence[int],
+    recently_changed: Sequence[bool],
+    reachable: Sequence[Optional[bool]],
+) -> List[int]:
+    sev = map(_SEV_CODE.get, map(normalize_severity, severities), [0] * len(severities))
+    conf = map(_CONF_CODE.get, confidences, [0] * len(confidences))
+    cat = map(_CAT_CODE.get, categories, [0] * len(categories))
+    _, d_conf, d_cat, d_tools, d_recent, d_reach = _DIMS
+    max_tools = d_tools - 1
+
+    return [
+        ((((s * d_conf + c) * d_cat + k) * d_tools + (t if t < max_tools else max_tools)) * d_recent + (r is True)) * d_reach
+        + _REACH_CODE.get(x, 0)
+        for s, c, k, t, r, x in zip(sev, conf, cat, tool_counts, recently_changed, reachable)
+    ]
+
+
+# -------------------------
+# Batch API
+# -------------------------
+def score_batch(
+    severities: Sequence[str],
+    confidences: Sequence[str],
+    categories: Sequence[str],
+    tool_counts: Sequence[int],
+    recently_changed: Sequence[bool],
+    reachable: Sequence[Optional[bool]],
+) -> List[float]:
+    """
+    Risk scores for parallel arrays of signals (one position per entity).
+    `reachable`: True / False / None (unknown).
+    """
+    codes = _encode(severities, confidences, categories, tool_counts, recently_changed, reachable)
+    if _SCORE_ARRAY is not None:
+        return _SCORE_ARRAY[np.asarray(codes, dtype=np.intp)].tolist()
+    return list(map(SCORE_TABLE.__getitem__, codes))
+
+
+def rank_by_risk(scores: Sequence[float]) -> List[int]:
+    """
+    Indices ordered by descending score (stable for equal scores).
+    """
+    if np is not None:
+        return np.argsort(-np.asarray(scores), kind="stable").tolist()
+    return sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+
+
+# -------------------------
+# Entity wrappers
+# -------------------------
+def entity_signals(entity: FindingEntity) -> Dict[str, Any]:
+    """
+    Scoring inputs of one entity (context wins over per-finding triage).
+    """
+    recent = entity.context.get("recently_changed")
+    if recent is None:
+        recent = any(
+            (s.evidence or {}).get("triage", {}).get("recently_changed") for s in entity.signals
+        )
+    return {
+        "severity": entity.severity,
+        "confidence": entity.confidence,
+        "category": entity.category,
+        "tools": len(entity.tools),
+        "recently_changed": bool(recent),
+        "reachable": entity.context.get("reachable"),
+    }
+
+
+def score_entities(entities: Sequence[FindingEntity]) -> List[float]:
+    """
+    Batch-score entities and set `risk_score` on each.
+    """
+    signals = [entity_signals(e) for e in entities]
+    scores = score_batch(
+        [s["severity"] for s in signals],
+        [s["confidence"] for s in signals],
+        [s["category"] for s in signals],
+        [s["tools"] for s in signals],
+        [s["recently_changed"] for s in signals],
+        [s["reachable"] for s in signals],
+    )
+    for entity, score in zip(entities, scores):
+        entity.risk_score = score
+    return scores
+
+
+def score_entity(entity: FindingEntity) -> float:
+    """
+    Per-entity wrapper (kept for callers that score one at a time).
+    """
+    return score_entities([entity])[0]
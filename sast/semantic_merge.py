@@ -0,0 +1,219 @@
+"""
+Semantic Merge (near-duplicate entities)
+=======================================
+
+Purpose:
+- Merge entities that describe the same issue with slightly different
+  text or code, e.g. one vulnerable pattern copy-pasted into 300 files
+- Stay near-linear: MinHash signatures + LSH banding, so only entities
+  sharing a band bucket are ever compared
+
+Features per entity: normalized title words, 3-shingles of the
+normalized code snippet and location path components. Entities are only
+merged within the same (category, weakness); SCA (handled by
+sca_collapse) and SYSTEM entities pass through.
+"""
+
+from functools import lru_cache
+from operator import eq
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+import hashlib
+import os
+import re
+import struct
+
+from sast.entity import (
+    CONFIDENCE_RANK,
+    SEVERITY_RANK,
+    FindingEntity,
+    merge_members,
+)
+from sast.fingerprint import normalize_code
+
+DEFAULT_THRESHOLD = float(os.environ.get("DEPLAI_SEMANTIC_MERGE_THRESHOLD", "0.8"))
+NUM_PERM = 64
+BANDS = 16
+
+SKIP_CATEGORIES = {"SCA", "SYSTEM"}
+
+_WORD = re.compile(r"[a-z_][a-z0-9_]*|\d+")
+_PATH_SPLIT = re.compile(r"[/\\._:\-?=&]+")
+_CODE_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+# -------------------------
+# Features
+# -------------------------
+def entity_snippet(entity: FindingEntity) -> str:
+    for signal in entity.signals:
+        evidence = signal.evidence or {}
+        code = evidence.get("code") or getattr(signal, "code_snippet", "")
+        if code:
+            return code
+    return ""
+
+
+def content_features(title: str, snippet: str) -> FrozenSet[str]:
+    """
+    Title words + code shingles (location-independent part).
+    """
+    features = {"t:" + w for w in _WORD.findall(title.lower())}
+
+    code_tokens = _CODE_TOKEN.findall(normalize_code(snippet))
+    if len(code_tokens) < 3:
+        features.update("c:" + t for t in code_tokens)
+    else:
+        features.update(
+            "c:" + " ".join(code_tokens[i:i + 3]) for i in range(len(code_tokens) - 2)
+        )
+
+    return frozenset(features)
+
+
+def location_features(entity: FindingEntity) -> FrozenSet[str]:
+    location = entity.location.rsplit(":", 1)[0] if entity.location else ""
+    return frozenset("p:" + p for p in _PATH_SPLIT.split(location.lower()) if p)
+
+
+def entity_features(entity: FindingEntity) -> FrozenSet[str]:
+    return content_features(entity.title, entity_snippet(entity)) | location_features(entity)
+
+
+@lru_cache(maxsize=1 << 18)
+def token_hashes(token: str, num_perm: int = NUM_PERM) -> Tuple[int, ...]:
+    """
+    `num_perm` independent 32-bit hashes of one feature (one per MinHash
+    function), from a single extendable-output digest. Cached: titles and
+    code shingles repeat heavily across entities.
+    """
+    digest = hashlib.shake_128(token.encode()).digest(4 * num_perm)
+    return struct.unpack(f"<{num_perm}I", digest)
+
+
+def minhash(
+    features: Iterable[str],
+    num_perm: int = NUM_PERM,
+    base: Optional[Tuple[int, ...]] = None,
+) -> Tuple[int, ...]:
+    """
+    MinHash signature of `features`, optionally combined with the
+    signature `base` of another set (signature of the union).
+    """
+    columns = [token_hashes(f, num_perm) for f in features]
+    if base is not None:
+        columns.append(base)
+    if not columns:
+        return (0,) * num_perm
+    if len(columns) == 1:
+        return columns[0]
+    return tuple(map(min, *columns))
+
+
+def entity_signature(
+    entity: FindingEntity,
+    num_perm: int = NUM_PERM,
+    content_cache: Optional[Dict[Tuple[str, str], Tuple[int, ...]]] = None,
+) -> Tuple[int, ...]:
+    content = (entity.title, entity_snippet(entity))
+    base = content_cache.get(content) if content_cache is not None else None
+    if base is None:
+        base = minhash(content_features(*content), num_perm)
+        if content_cache is not None:
+            content_cache[content] = base
+    return minhash(location_features(entity), num_perm, base=base)
+
+
+def similarity(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+    """
+    Estimated Jaccard similarity of the underlying feature sets.
+    """
+    return sum(map(eq, sig_a, sig_b)) / len(sig_a)
+
+
+# -------------------------
+# Union-find
+# -------------------------
+def _find(parent: List[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _union(parent: List[int], a: int, b: int) -> None:
+    ra, rb = _find(parent, a), _find(parent, b)
+    if ra != rb:
+        # Keep the earliest entity as the representative
+        if rb < ra:
+            ra, rb = rb, ra
+        parent[rb] = ra
+
+
+def _merge_group(members: List[FindingEntity]) -> FindingEntity:
+    head = members[0]
+    table, indices = merge_members(members)
+    head.members = indices
+    head.table = table
+    head.severity = max((e.severity for e in members), key=lambda s: SEVERITY_RANK.get(s, 0))
+    head.confidence = max((e.confidence for e in members), key=lambda c: CONFIDENCE_RANK.get(c, 0))
+    head.first_seen = min(e.first_seen for e in members)
+    head.last_seen = max(e.last_seen for e in members)
+    head.attributes["merged_entities"] = [e.entity_id for e in members]
+    # Identity must not depend on scan order: lifecycle rows are keyed by it
+    head.entity_id = min(head.attributes["merged_entities"])
+    head.attributes["locations"] = list(dict.fromkeys(e.location for e in members))
+    return head
+
+
+# -------------------------
+# Public API
+# -------------------------
+def semantic_merge(
+    entities: List[FindingEntity],
+    threshold: Optional[float] = None,
+    num_perm: int = NUM_PERM,
+    bands: int = BANDS,
+    known: Optional[Dict[str, Tuple[int, ...]]] = None,
+) -> List[FindingEntity]:
+    """
+    Merge near-duplicate entities (estimated Jaccard >= threshold).
+    Each entity is compared only with the first entity of each LSH bucket
+    it lands in. `known`: signatures computed earlier, by entity_id.
+    """
+    threshold = DEFAULT_THRESHOLD if threshold is None else threshold
+    if num_perm % bands:
+        raise ValueError("num_perm must be a multiple of bands")
+    rows = num_perm // bands
+
+    parent = list(range(len(entities)))
+    signatures: Dict[int, Tuple[int, ...]] = {}
+    # Copy-pasted code shares title + snippet: hash that part once
+    by_content: Dict[Tuple[str, str], Tuple[int, ...]] = {}
+    buckets: Dict[tuple, int] = {}
+
+    for i, entity in enumerate(entities):
+        if entity.category in SKIP_CATEGORIES:
+            continue
+
+        sig = known.get(entity.entity_id) if known else None
+        if sig is None or len(sig) != num_perm:
+            sig = entity_signature(entity, num_perm, by_content)
+        signatures[i] = sig
+
+        scope = (entity.category, entity.weakness)
+        for band in range(bands):
+            key = (scope, band, sig[band * rows:(band + 1) * rows])
+            anchor = buckets.get(key)
+            if anchor is None:
+                buckets[key] = i
+            elif _find(parent, anchor) != _find(parent, i) and similarity(signatures[anchor], sig) >= threshold:
+                _union(parent, anchor, i)
+
+    groups: Dict[int, List[FindingEntity]] = {}
+    for i, entity in enumerate(entities):
+        groups.setdefault(_find(parent, i), []).append(entity)
+
+    return [
+        members[0] if len(members) == 1 else _merge_group(members)
+        for root, members in groups.items()
+    ]
@@ -0,0 +1,86 @@
+"""
+Version Ordering
+================
+
+Ecosystem-tolerant version comparison used by the in-process advisory
+matcher and SCA aggregation (semver, PEP 440 and Go module versions).
+
+Not a full implementation of any single spec: release segments compare
+numerically, pre-release tags (dev < alpha < beta < rc) sort before the
+release, post-releases after it.
+"""
+
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+import re
+
+_TOKEN = re.compile(r"\d+|[A-Za-z]+")
+
+_PRE_RANK = {
+    "dev": 0, "snapshot": 0,
+    "a": 1, "alpha": 1,
+    "b": 2, "beta": 2,
+    "c": 3, "rc": 3, "pre": 3, "preview": 3,
+}
+_RELEASE_WORDS = {"final", "ga", "release"}
+_POST_WORDS = {"post", "p", "rev", "r"}
+
+# (class, rank, text) — class: -1 pre-release < 0 end < 1 post < 2 number
+_END = (0, 0, "")
+_POST = (1, 0, "")
+
+VersionKey = Tuple[Tuple[int, int, str], ...]
+
+
+@lru_cache(maxsize=65536)
+def version_key(version: str) -> VersionKey:
+    """
+    Sortable key for a version string ("v1.2.3", "1.0.0-rc.1", "2.0.post1").
+    """
+    v = (version or "").strip().lower()
+    if v.startswith("v") and v[1:2].isdigit():
+        v = v[1:]
+    v = v.split("+", 1)[0]  # build metadata never orders
+
+    epoch = 0
+    if "!" in v:
+        head, v = v.split("!", 1)
+        epoch = int(head) if head.isdigit() else 0
+
+    parts = [(2, epoch, "")]
+    for token in _TOKEN.findall(v):
+        if token.isdigit():
+            parts.append((2, int(token), ""))
+        elif token in _RELEASE_WORDS:
+            continue
+        elif token in _POST_WORDS:
+            parts.append(_POST)
+        else:
+            parts.append((-1, _PRE_RANK.get(token, 4), token))
+
+    # 1.0 == 1.0.0: drop trailing zeros of the release segment
+    release_end = 1
+    while release_end < len(parts) and parts[release_end][0] == 2:
+        release_end += 1
+    cut = release_end
+    while cut > 1 and parts[cut - 1] == (2, 0, ""):
+        cut -= 1
+    del parts[cut:release_end]
+
+    parts.append(_END)
+    return tuple(parts)
+
+
+def compare(a: str, b: str) -> int:
+    ka, kb = version_key(a), version_key(b)
+    return (ka > kb) - (ka < kb)
+
+
+def max_version(versions: Iterable[str]) -> Optional[str]:
+    versions = [v for v in versions if v]
+    return max(versions, key=version_key) if versions else None
+
+
+def min_version(versions: Iterable[str]) -> Optional[str]:
+    versions = [v for v in versions if v]
+    return min(versions, key=version_key) if versions else None
@@ -0,0 +1,64 @@
+"""
+Entity builder benchmark: N findings with a given duplicate ratio.
+Reports build time and the memory the entities add on top of the findings.
+
+    PYTHONPATH=. python scripts/bench_entities.py --findings 500000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from sast.entity_builder import build_entities
+from sast.schema import Finding
+
+SEVERITIES = ["LOW", "MEDIUM", "HIGH", "CRITICAL"]
+
+
+def make_findings(n: int, unique: int):
+    rng = random.Random(7)
+    findings = []
+    for _ in range(n):
+        k = rng.randrange(unique)
+        findings.append(
+            Finding(
+                fingerprint=f"fp-{k}",
+                title=f"Issue {k % 500}",
+                severity=rng.choice(SEVERITIES),
+                category="SAST",
+                tool=rng.choice(["semgrep", "bandit"]),
+                rule_id=f"rule-{k % 500}",
+                file=f"src/module_{k % 5000}.py",
+                line=k % 400 + 1,
+            )
+        )
+    return findings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--findings", type=int, default=500_000)
+    parser.add_argument("--unique", type=float, default=0.5, help="Distinct issues as a fraction of findings")
+    args = parser.parse_args()
+
+    findings = make_findings(args.findings, max(1, int(args.findings * args.unique)))
+
+    start = time.perf_counter()
+    entities = build_entities(findings)
+    elapsed = time.perf_counter() - start
+    del entities
+
+    # Separate run: tracemalloc slows allocation-heavy code down a lot
+    tracemalloc.start()
+    entities = build_entities(findings)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"findings  : {len(findings)}")
+    print(f"entities  : {len(entities)}")
+    print(f"build     : {elapsed * 1000:8.1f} ms")
+    print(f"memory    : {current / 1e6:8.1f} MB retained   {peak / 1e6:8.1f} MB peak ({current / len(entities):.0f} B/entity)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Incremental intelligence benchmark: full rebuild vs delta update after a
+small change to a large scan.
+
+    PYTHONPATH=. python scripts/bench_incremental.py --findings 100000 --churn 0.01
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from sast.incremental import IntelligenceState, update_intelligence
+from sast.intelligence import build_finding_entities
+from sast.lifecycle import LifecycleStore
+from sast.schema import Finding
+
+
+def make_finding(i: int, rules: int) -> Finding:
+    r = i % rules
+    return Finding(
+        fingerprint=f"fp-{i}",
+        title=f"Issue from rule {r}",
+        severity=random.choice(["LOW", "MEDIUM", "HIGH", "CRITICAL"]),
+        category="SAST",
+        tool="semgrep",
+        rule_id=f"rule-{r}",
+        file=f"src/pkg{i % 300}/mod{i}.py",
+        line=i % 200 + 1,
+        evidence={"code": f"eval(request.args['p{r}'])  # site {i}"},
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--findings", type=int, default=100_000)
+    parser.add_argument("--rules", type=int, default=2_000)
+    parser.add_argument("--churn", type=float, default=0.01)
+    parser.add_argument("--touched-rules", type=int, default=50, help="Rules the day's change touches")
+    args = parser.parse_args()
+
+    random.seed(7)
+    base = [make_finding(i, args.rules) for i in range(args.findings)]
+    # A day's change: findings of a few rules disappear, new ones appear
+    churn = int(args.findings * args.churn)
+    touched = [f for f in base if int(f.rule_id.split("-")[1]) < args.touched_rules]
+    gone = {f.fingerprint for f in touched[:churn]}
+    fresh = [
+        make_finding(args.findings + i * args.rules // args.touched_rules, args.rules)
+        for i in range(churn)
+    ]
+    for i, f in enumerate(fresh):
+        r = i % args.touched_rules
+        f.rule_id, f.title = f"rule-{r}", f"Issue from rule {r}"
+    rescan = [f for f in base if f.fingerprint not in gone] + fresh
+
+    with tempfile.TemporaryDirectory(prefix="deplai-bench-") as tmp:
+        os.environ["DEPLAI_LIFECYCLE_DB"] = str(Path(tmp) / "full-lifecycle.sqlite3")
+        state = IntelligenceState(str(Path(tmp) / "intel.sqlite3"))
+        lifecycle = LifecycleStore(str(Path(tmp) / "lifecycle.sqlite3"))
+
+        start = time.perf_counter()
+        build_finding_entities(rescan, repo="bench")
+        full = time.perf_counter() - start
+
+        start = time.perf_counter()
+        update_intelligence("bench", base, state=state, lifecycle=lifecycle)
+        seed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = update_intelligence("bench", rescan, state=state, lifecycle=lifecycle)
+        delta = time.perf_counter() - start
+
+        print(f"findings     : {args.findings}   churn {churn} added / {len(gone)} removed over {args.touched_rules} rules")
+        print(f"full rebuild : {full * 1000:9.1f} ms")
+        print(f"first state  : {seed * 1000:9.1f} ms")
+        print(f"incremental  : {delta * 1000:9.1f} ms   ({result['delta']['partitions']} partitions, "
+              f"{result['delta']['rebuilt_findings']} findings rebuilt)")
+
+
+if __name__ == "__main__":
+    main()
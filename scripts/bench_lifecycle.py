@@ -0,0 +1,41 @@
+"""
+Lifecycle store benchmark: repeated scans of one repo with N fingerprints
+and a small daily churn.
+
+    PYTHONPATH=. python scripts/bench_lifecycle.py --fingerprints 100000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from sast.lifecycle import LifecycleStore
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fingerprints", type=int, default=100_000)
+    parser.add_argument("--churn", type=float, default=0.02)
+    parser.add_argument("--scans", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="deplai-bench-") as tmp:
+        store = LifecycleStore(str(Path(tmp) / "lifecycle.sqlite3"))
+        churn = int(args.fingerprints * args.churn)
+
+        for scan in range(args.scans):
+            offset = scan * churn
+            fingerprints = [f"fp-{i}" for i in range(offset, offset + args.fingerprints)]
+
+            start = time.perf_counter()
+            state, fixed = store.record_scan("github.com/org/repo", fingerprints)
+            elapsed = time.perf_counter() - start
+
+            new = sum(1 for _, status in state.values() if status == "new")
+            print(f"scan {scan}: {elapsed * 1000:8.1f} ms   new {new:7d}   fixed {fixed:7d}")
+
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Advisory index benchmark: build a synthetic OSV dataset, then time
+in-process matching of a large SBOM.
+
+    python scripts/bench_osv_index.py --packages 50000 --components 100000
+"""
+import argparse
+import json
+import random
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+from sast.advisory_index import AdvisoryIndex, build_index
+
+
+def synthetic_osv(n_packages: int) -> list:
+    docs = []
+    for i in range(n_packages):
+        docs.append({
+            "id": f"GHSA-bench-{i}",
+            "aliases": [f"CVE-2099-{i}"],
+            "database_specific": {"severity": random.choice(["LOW", "MODERATE", "HIGH", "CRITICAL"])},
+            "affected": [{
+                "package": {"ecosystem": "npm", "name": f"pkg-{i}"},
+                "ranges": [{"type": "SEMVER", "events": [{"introduced": "0"}, {"fixed": f"{i % 5 + 1}.0.0"}]}],
+            }],
+        })
+    return docs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--packages", type=int, default=50_000, help="Packages with advisories")
+    parser.add_argument("--components", type=int, default=100_000, help="SBOM components to match")
+    args = parser.parse_args()
+
+    random.seed(7)
+    with tempfile.TemporaryDirectory(prefix="deplai-osv-") as tmp:
+        docs = synthetic_osv(args.packages)
+
+        osv_dir = Path(tmp) / "osv"
+        osv_dir.mkdir()
+        for doc in docs:
+            (osv_dir / f"{doc['id']}.json").write_text(json.dumps(doc))
+
+        index_path = str(Path(tmp) / "advisories.idx")
+        start = time.perf_counter()
+        stats = build_index([str(osv_dir)], index_path)
+        print(f"build    : {time.perf_counter() - start:8.2f} s   {stats}")
+
+        # Half the components hit a known package, half miss entirely
+        components = [
+            {
+                "name": f"pkg-{random.randrange(args.packages * 2)}",
+                "version": f"{random.randrange(6)}.{random.randrange(10)}.0",
+            }
+            for _ in range(args.components)
+        ]
+        for c in components:
+            c["purl"] = f"pkg:npm/{c['name']}@{c['version']}"
+        sbom = {"components": components}
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        with AdvisoryIndex(index_path) as index:
+            start = time.perf_counter()
+            result = index.match_sbom(sbom)
+            elapsed = time.perf_counter() - start
+
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        print(
+            f"match    : {elapsed * 1000:8.1f} ms   "
+            f"{args.components / (elapsed * 1000):8.1f} components/ms   "
+            f"{len(result['matches'])} matches"
+        )
+        print(f"max RSS  : +{(rss_after - rss_before) / 1024:.1f} MiB during matching")
+
+
+if __name__ == "__main__":
+    main()
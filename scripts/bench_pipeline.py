@@ -0,0 +1,128 @@
+"""
+Offline end-to-end pipeline benchmark (planner + triage + remediation)
+with a replayed LLM: no network, deterministic latency.
+
+The repo stages are replaced by a synthetic finding generator, so only
+the agent overhead around them is measured.
+
+    # replay a recorded cassette at its recorded latency
+    PYTHONPATH=. python scripts/bench_pipeline.py --cassette llm.jsonl
+
+    # no cassette: canned responses with a simulated 0.5s per call
+    PYTHONPATH=. python scripts/bench_pipeline.py --latency 0.5 --concurrency 1,8,32
+
+Record a cassette from a live scan with
+DEPLAI_LLM_BACKEND=record DEPLAI_LLM_CASSETTE=llm.jsonl.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from agents.entrypoint import run_with_planner
+from agents.llm_clients.base import ReplayClient, load_cassette
+from agents.planner.planner_llm import LLMPlanner
+from sast import orchestrator
+from sast.schema import Finding
+from sast.scope import ScopePolicy
+
+CANNED_PLAN = json.dumps({
+    "run_sast": True,
+    "run_sca": True,
+    "run_dast": False,
+    "reason": "replayed plan",
+    "limits": {"max_runtime_seconds": 600, "max_requests": 500},
+})
+CANNED_FIX = "Use a parameterized query.\n\n```python\ncursor.execute(q, (user_id,))\n```"
+
+
+def canned_response(prompt: str) -> str:
+    """
+    Cassette misses: a plan for planner prompts, a fix for the rest.
+    """
+    return CANNED_PLAN if "DevSecOps planner" in prompt else CANNED_FIX
+
+
+def make_findings(n: int, high_ratio: float, rules: int):
+    findings = []
+    for i in range(n):
+        r = i % rules
+        findings.append(
+            Finding(
+                fingerprint=f"fp-{i}",
+                title=f"Issue from rule {r}",
+                severity="HIGH" if random.random() < high_ratio else random.choice(["LOW", "MEDIUM"]),
+                category="SAST",
+                tool="semgrep",
+                rule_id=f"rule-{r}",
+                file=f"src/pkg{i % 50}/mod{i}.py",
+                line=i % 200 + 1,
+                evidence={"code": f"cursor.execute('SELECT * FROM t WHERE id=' + p{i})"},
+            )
+        )
+    return findings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cassette", help="Recorded JSONL cassette (default: canned responses)")
+    parser.add_argument("--latency", type=float, default=None, help="Simulated seconds per LLM call")
+    parser.add_argument("--findings", type=int, default=2_000)
+    parser.add_argument("--high-ratio", type=float, default=0.05)
+    # dedup_findings collapses findings per (category, tool, rule): one rule
+    # per finding keeps them all distinct
+    parser.add_argument("--rules", type=int, default=None, help="Distinct rules (default: one per finding)")
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--fix-cache", action="store_true", help="Enable the remediation cache")
+    args = parser.parse_args()
+
+    if args.cassette is None and args.latency is None:
+        args.latency = 0.5
+    entries = load_cassette(args.cassette) if args.cassette else {}
+
+    random.seed(7)
+    findings = make_findings(args.findings, args.high_ratio, args.rules or args.findings)
+    stage_result = {"findings": findings, "tools": ["semgrep-synthetic"]}
+    orchestrator.STAGE_RUNNERS["sast"] = lambda input, repo_path: stage_result
+    orchestrator.STAGE_RUNNERS["sca"] = lambda input, repo_path: {"findings": [], "tools": ["sca-synthetic"]}
+
+    scope = ScopePolicy(allowed_repo_prefixes=[""], allowed_domains=[], safe_mode=True, max_requests=1000)
+    highs = sum(f.severity == "HIGH" for f in findings)
+    print(f"Findings: {len(findings)} ({highs} HIGH) | latency: {args.latency if args.latency is not None else 'recorded'}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DEPLAI_PLAN_CACHE_TTL"] = "0"
+        os.environ["DEPLAI_REMEDIATION_RPS"] = "0"
+        os.environ["DEPLAI_FIX_CACHE_DB"] = os.path.join(tmp, "fixes.sqlite3")
+        os.environ["DEPLAI_RUNTIME_DB"] = os.path.join(tmp, "runtimes.sqlite3")
+        if not args.fix_cache:
+            os.environ["DEPLAI_FIX_CACHE_MAX_MB"] = "0"
+
+        for workers in [int(c) for c in args.concurrency.split(",")]:
+            os.environ["DEPLAI_REMEDIATION_CONCURRENCY"] = str(workers)
+            for f in findings:
+                f.evidence.pop("ai_remediation", None)
+
+            llm = ReplayClient(entries=entries, latency_seconds=args.latency, default_response=canned_response)
+            planner = LLMPlanner(llm, cache=None)
+            t0 = time.perf_counter()
+            result = run_with_planner(
+                {"run_id": f"bench-{workers}", "repo_path": tmp, "languages": ["python"], "dependencies": ["flask"]},
+                planner,
+                scope,
+                llm_client=llm,
+            )
+            total = time.perf_counter() - t0
+
+            stats = llm.summary()
+            fixed = sum("ai_remediation" in (f.evidence or {}) for f in result["findings"])
+            print(
+                f"concurrency={workers:>3}: total {total:6.2f}s | LLM calls {stats['calls']} "
+                f"(simulated {stats['simulated_seconds']:.1f}s, cassette hits {stats['hits']}) | fixed {fixed}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+SBOM benchmark: native lockfile parsers vs Syft.
+
+Generates sample lockfiles (requirements.txt, poetry.lock, package-lock.json,
+yarn.lock, go.sum) with N packages each and times both SBOM paths.
+Syft is skipped if it is not installed.
+
+    python scripts/bench_sbom.py --packages 2000 --runs 5
+"""
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from sast import lockfiles
+from sast.sbom_runner import discover_manifests
+
+
+def write_samples(root: Path, n: int) -> None:
+    (root / "requirements.txt").write_text(
+        "".join(f"pkg-{i}=={i % 10}.{i % 7}.{i % 3}\n" for i in range(n))
+    )
+    (root / "pyproject.toml").write_text('[tool.poetry]\nname = "bench"\n')
+    (root / "poetry.lock").write_text(
+        "".join(f'[[package]]\nname = "poetry-{i}"\nversion = "1.{i}.0"\n\n' for i in range(n))
+    )
+    (root / "package.json").write_text('{"name": "bench"}')
+    (root / "package-lock.json").write_text(json.dumps({
+        "lockfileVersion": 3,
+        "packages": {"": {"name": "bench"}, **{
+            f"node_modules/npm-{i}": {"version": f"2.{i}.1"} for i in range(n)
+        }},
+    }))
+    (root / "yarn.lock").write_text(
+        "".join(f'yarn-{i}@^3.{i}.0:\n  version "3.{i}.4"\n\n' for i in range(n))
+    )
+    (root / "go.mod").write_text("module bench\n")
+    (root / "go.sum").write_text(
+        "".join(f"example.com/mod{i} v0.{i}.0 h1:x=\n" for i in range(n))
+    )
+
+
+def time_runs(fn, runs: int):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), min(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--packages", type=int, default=1000, help="Packages per lockfile")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="deplai-bench-") as tmp:
+        root = Path(tmp)
+        write_samples(root, args.packages)
+        manifests = discover_manifests(str(root))
+
+        native = time_runs(lambda: lockfiles.build_sbom(str(root), manifests), args.runs)
+        components = len(lockfiles.build_sbom(str(root), manifests)["components"])
+        print(f"native  : median {native[0] * 1000:8.1f} ms   min {native[1] * 1000:8.1f} ms   ({components} components)")
+
+        if shutil.which("syft") is None:
+            print("syft    : not installed, skipped")
+            return
+
+        out = root.parent / f"{root.name}-syft.json"
+
+        def run_syft():
+            subprocess.run(
+                ["syft", f"dir:{root}", "-o", f"cyclonedx-json={out}", "-q"],
+                check=True,
+                capture_output=True,
+            )
+
+        syft = time_runs(run_syft, args.runs)
+        out.unlink(missing_ok=True)
+        print(f"syft    : median {syft[0] * 1000:8.1f} ms   min {syft[1] * 1000:8.1f} ms")
+        print(f"speedup : {syft[0] / native[0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
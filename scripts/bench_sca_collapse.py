@@ -0,0 +1,61 @@
+"""
+SCA collapse benchmark: N findings spread over P vulnerable packages.
+
+    PYTHONPATH=. python scripts/bench_sca_collapse.py --findings 100000 --packages 2000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from sast.entity_builder import build_entities
+from sast.normalize_sca import normalize_match
+from sast.sca_collapse import collapse_sca_entities
+
+SEVERITIES = ["LOW", "MEDIUM", "HIGH", "CRITICAL"]
+
+
+def make_entities(n: int, packages: int):
+    rng = random.Random(7)
+    findings = []
+    for i in range(n):
+        p = rng.randrange(packages)
+        match = {
+            "vulnerability": {
+                "id": f"CVE-2024-{i}",
+                "severity": rng.choice(SEVERITIES),
+                "fix": {"versions": [f"1.{p % 10}.{rng.randrange(1, 20)}"]},
+            },
+            "artifact": {
+                "name": f"pkg-{p}",
+                "version": f"1.{p % 10}.0",
+                "type": "npm",
+                "locations": [{"path": "/package-lock.json"}],
+            },
+        }
+        findings.append(normalize_match(match, "bench"))
+    return build_entities(findings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--findings", type=int, default=100_000)
+    parser.add_argument("--packages", type=int, default=2_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    entities = make_entities(args.findings, args.packages)
+
+    samples = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        collapsed = collapse_sca_entities(entities)
+        samples.append(time.perf_counter() - start)
+
+    print(f"findings  : {len(entities)}")
+    print(f"entities  : {len(collapsed)}")
+    print(f"collapse  : median {statistics.median(samples) * 1000:8.1f} ms   min {min(samples) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Scoring benchmark: batch-score N entities' signals and rank them by risk.
+
+    PYTHONPATH=. python scripts/bench_scoring.py --entities 1000000
+"""
+import argparse
+import random
+import time
+
+from sast import scoring
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entities", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    n = args.entities
+    columns = (
+        [rng.choice(scoring.SEVERITIES) for _ in range(n)],
+        [rng.choice(scoring.CONFIDENCES) for _ in range(n)],
+        [rng.choice(("SAST", "DAST", "SCA")) for _ in range(n)],
+        [rng.randrange(1, 4) for _ in range(n)],
+        [rng.random() < 0.1 for _ in range(n)],
+        [rng.choice((None, True, False)) for _ in range(n)],
+    )
+
+    start = time.perf_counter()
+    scores = scoring.score_batch(*columns)
+    scored = time.perf_counter() - start
+
+    start = time.perf_counter()
+    order = scoring.rank_by_risk(scores)
+    ranked = time.perf_counter() - start
+
+    backend = "numpy" if scoring.np is not None else "pure python"
+    print(f"entities  : {n} ({backend})")
+    print(f"score     : {scored * 1000:8.1f} ms")
+    print(f"rank      : {ranked * 1000:8.1f} ms   (top score {scores[order[0]]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Semantic merge benchmark: N SAST entities over R rules, each rule's
+pattern copy-pasted (with small edits) across many files.
+
+    PYTHONPATH=. python scripts/bench_semantic_merge.py --entities 50000
+"""
+import argparse
+import random
+import time
+
+from sast.entity_builder import build_entities
+from sast.schema import Finding
+from sast.semantic_merge import semantic_merge
+
+
+def make_findings(n: int, rules: int):
+    rng = random.Random(7)
+    findings = []
+    for i in range(n):
+        r = rng.randrange(rules)
+        variant = rng.randrange(4)
+        code = (
+            f"cursor.execute(\"SELECT * FROM t{r} WHERE id = \" + request.args['id{variant}'])\n"
+            f"rows = cursor.fetchall()  # handler {r}"
+        )
+        findings.append(
+            Finding(
+                fingerprint=f"fp-{i}",
+                title=f"SQL built from user input in handler {r}",
+                severity="HIGH",
+                category="SAST",
+                tool="semgrep",
+                rule_id=f"python.sqli.rule-{r}",
+                file=f"services/svc{i % 40}/handlers/h{i}.py",
+                line=10,
+                evidence={"code": code},
+            )
+        )
+    return findings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entities", type=int, default=50_000)
+    parser.add_argument("--rules", type=int, default=200)
+    parser.add_argument("--threshold", type=float, default=None)
+    args = parser.parse_args()
+
+    entities = build_entities(make_findings(args.entities, args.rules))
+
+    start = time.perf_counter()
+    merged = semantic_merge(entities, threshold=args.threshold)
+    elapsed = time.perf_counter() - start
+
+    print(f"entities  : {args.entities}")
+    print(f"merged    : {len(merged)}")
+    print(f"merge     : {elapsed * 1000:8.1f} ms   ({elapsed / args.entities * 1e6:.1f} us/entity)")
+
+
+if __name__ == "__main__":
+    main()
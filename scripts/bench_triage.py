@@ -0,0 +1,61 @@
+"""
+Triage benchmark: findings vs a large PR (changed files + diff line ranges)
+and CODEOWNERS-style team rules.
+
+    PYTHONPATH=. python scripts/bench_triage.py --findings 100000 --changed-files 5000
+"""
+import argparse
+import random
+import time
+
+from agents.contracts import AgentContext
+from agents.triage.triage import TriageEngine, triage_findings
+from sast.schema import Finding
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--findings", type=int, default=100_000)
+    parser.add_argument("--files", type=int, default=20_000)
+    parser.add_argument("--changed-files", type=int, default=5_000)
+    parser.add_argument("--team-rules", type=int, default=500)
+    args = parser.parse_args()
+
+    random.seed(3)
+    files = [f"services/svc{i % 40}/{'api' if i % 3 else 'web'}/pkg{i % 400}/mod{i}.py" for i in range(args.files)]
+    changed = random.sample(files, args.changed_files)
+    changed_lines = {f: [(s, s + random.randint(0, 20)) for s in sorted(random.sample(range(1, 2000), 8))] for f in changed}
+
+    rules = [(f"/services/svc{i % 40}/*/pkg{i}/", f"team-{i}") for i in range(args.team_rules)]
+    rules += [("*.py", "Backend"), ("*frontend*", "Frontend")]
+
+    findings = [
+        Finding(
+            fingerprint=f"fp-{i}",
+            file=("./" if i % 2 else "") + random.choice(files),
+            line=random.randint(1, 2000),
+            category="SAST",
+        )
+        for i in range(args.findings)
+    ]
+    ctx = AgentContext(
+        repo="repo", languages=["python"], frameworks=[], dependencies=[], is_pr=True,
+        changed_files=changed, has_public_endpoint=False, changed_lines=changed_lines,
+    )
+
+    t0 = time.perf_counter()
+    engine = TriageEngine.from_context(ctx, team_rules=rules)
+    build = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    triage_findings(findings, ctx, engine=engine)
+    run = time.perf_counter() - t0
+
+    recent = sum(f.evidence["triage"]["recently_changed"] for f in findings)
+    on_line = sum(f.evidence["triage"]["changed_line"] for f in findings)
+    print(f"{args.findings} findings, {args.changed_files} changed files, {len(rules)} team rules")
+    print(f"build: {build * 1000:.1f} ms | triage: {run * 1000:.1f} ms | recent: {recent} | on changed lines: {on_line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Build the local advisory index used by the in-process SCA backend.
+
+Download OSV exports first, e.g.
+    curl -O https://osv-vulnerabilities.storage.googleapis.com/PyPI/all.zip
+
+then:
+    python scripts/build_osv_index.py PyPI-all.zip npm-all.zip -o /var/lib/deplai/osv/advisories.idx
+
+Workers select it with DEPLAI_SCA_BACKEND=osv-index (and DEPLAI_OSV_INDEX=<path>).
+"""
+import argparse
+import json
+import time
+
+from sast.advisory_index import DEFAULT_INDEX_PATH, build_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the OSV advisory index")
+    parser.add_argument("sources", nargs="+", help="OSV .zip exports, directories or JSON files")
+    parser.add_argument("-o", "--output", default=DEFAULT_INDEX_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = build_index(args.sources, args.output)
+    stats["seconds"] = round(time.perf_counter() - start, 2)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ import requests
 from collections import Counter
 from dotenv import load_dotenv
 
+from agents.llm_clients.base import client_from_env
 from agents.llm_clients.openrouter_client import OpenRouterClient
 from agents.planner.planner_llm import LLMPlanner
 from agents.entrypoint import run_with_planner
@@ -19,7 +20,8 @@ class EnhancedJSONEncoder(json.JSONEncoder):
         return super().default(o)
 
 # 1. Initialize AI Planner
-client = OpenRouterClient(
+# DEPLAI_LLM_BACKEND=replay|record selects an offline / recording backend
+client = client_from_env() or OpenRouterClient(
     api_key=os.environ.get("OPENROUTER_API_KEY", "invalid-key-placeholder"),
     model="google/gemma-3n-e2b-it:free",
 )
@@ -0,0 +1,33 @@
+"""
+Scheduled Grype DB updater.
+
+Run exactly one of these per shared volume (see docker-compose.yml):
+    python scripts/update_grype_db.py                 # update once
+    python scripts/update_grype_db.py --interval 21600
+"""
+import argparse
+import json
+import time
+
+from sast.grype_db import GrypeDBError, db_root, update_db
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the shared Grype DB snapshot")
+    parser.add_argument("--interval", type=int, default=0, help="Seconds between updates (0 = run once)")
+    args = parser.parse_args()
+
+    while True:
+        print(f"🗄️ Updating Grype DB in {db_root()}...")
+        try:
+            print(json.dumps(update_db(), indent=2))
+        except GrypeDBError as e:
+            print(f"❌ Grype DB update failed: {e}")
+
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
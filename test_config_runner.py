@@ -0,0 +1,130 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from sast.response_cache import TargetCache
+from sast.config_runner import (
+    SECURITY_HEADERS,
+    run_config_checks,
+    run_config_checks_many,
+    sample_url,
+)
+
+
+# -----------------------------
+# Local stand-in web app
+# -----------------------------
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    etag = '"v1"'
+    hits = 0
+
+    def do_GET(self):
+        Handler.hits += 1
+        if self.headers.get("If-None-Match") == Handler.etag:
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = Handler.etag.encode()
+        self.send_response(200)
+        self.send_header("ETag", Handler.etag)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-Frame-Options", "DENY")
+        self.send_header("Set-Cookie", "session=abc; Path=/; Secure; HttpOnly")
+        self.send_header("Set-Cookie", "tracker=xyz; Expires=Wed, 21 Oct 2037 07:28:00 GMT; Path=/")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+# -----------------------------
+# Tests
+# -----------------------------
+def test_every_set_cookie_header_is_checked(server_url):
+    findings = run_config_checks(server_url)
+    by_rule = {f.rule_id: f for f in findings}
+
+    # Only the second cookie is missing flags; the first one must not mask it
+    assert by_rule["cookie-missing-secure"].evidence["cookies"] == ["tracker"]
+    assert by_rule["cookie-missing-httponly"].evidence["cookies"] == ["tracker"]
+
+
+def test_header_checks(server_url):
+    rules = {f.rule_id for f in run_config_checks(server_url)}
+
+    assert "missing-x-frame-options" not in rules
+    assert "missing-content-security-policy" in rules
+
+
+def test_many_targets_share_results_per_host(server_url):
+    results = run_config_checks_many(
+        [server_url, server_url + "/login", "http://127.0.0.1:1"],
+        paths=("/", "/login"),
+        timeout=2,
+        max_workers=8,
+    )
+
+    assert set(results) == {server_url, "http://127.0.0.1:1"}
+
+    headers = [f for f in results[server_url] if f.category == "CONFIG"]
+    assert len(headers) == len(SECURITY_HEADERS) - 1
+    assert headers[0].evidence["paths"] == ["/", "/login"]
+
+    assert results["http://127.0.0.1:1"][0].rule_id == "config-request-failed"
+
+
+def test_sample_paths_stay_on_target_host(server_url):
+    assert sample_url("https://example.com", "login") == "https://example.com/login"
+    assert sample_url("https://example.com", "/a/b") == "https://example.com/a/b"
+    for escaping in ("//evil.com/x", "https://evil.com/", "http://example.com/"):
+        with pytest.raises(ValueError):
+            sample_url("https://example.com", escaping)
+
+    # Default sampling covers more than the landing page
+    results = run_config_checks_many([server_url], timeout=2, per_host_limit=1)
+    headers = [f for f in results[server_url] if f.category == "CONFIG"]
+    assert headers[0].evidence["paths"] == ["/", "/login"]
+
+
+def test_unchanged_deployment_reuses_cached_findings(server_url, tmp_path):
+    first = run_config_checks(server_url, cache=TargetCache(directory=tmp_path))
+
+    # New scan, same deployment: one conditional probe, no full check
+    Handler.hits = 0
+    cache = TargetCache(directory=tmp_path)
+    second = run_config_checks(server_url, cache=cache)
+
+    assert Handler.hits == 1
+    assert cache.is_unchanged(server_url)
+    assert [f.fingerprint for f in second] == [f.fingerprint for f in first]
+
+    # Redeploy: validators change, findings are recomputed
+    Handler.etag = '"v2"'
+    try:
+        cache = TargetCache(directory=tmp_path)
+        assert cache.get_findings(server_url, "config") is None
+    finally:
+        Handler.etag = '"v1"'
+
+
+def test_expired_ttl_forces_rescan(server_url, tmp_path):
+    run_config_checks(server_url, cache=TargetCache(directory=tmp_path))
+
+    cache = TargetCache(directory=tmp_path, ttl_seconds=-1)
+    assert cache.get_findings(server_url, "config") is None
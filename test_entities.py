@@ -0,0 +1,399 @@
+import os
+import subprocess
+
+from sast.codeowners import CodeOwners, parse_codeowners
+from sast.context import RepoContextIndex, enrich_context
+from sast.entity import FindingEntity
+from sast.entity_builder import build_entities
+from sast.incremental import IntelligenceState, update_intelligence
+from sast.intelligence import build_intelligence
+from sast.lifecycle import LifecycleStore, apply_lifecycle
+from sast.normalize_sca import normalize_match
+from sast.sca_collapse import collapse_sca_entities, minimal_fix
+from sast.semantic_merge import semantic_merge
+from sast.schema import Finding
+from sast.scoring import rank_by_risk, score_batch, score_entities, score_entity
+
+
+def sca_entity(vuln_id, severity, fixes, package="lodash", version="4.17.10", subproject=""):
+    match = {
+        "vulnerability": {"id": vuln_id, "severity": severity, "fix": {"versions": fixes}},
+        "artifact": {"name": package, "version": version, "type": "npm",
+                     "locations": [{"path": "/package-lock.json"}]},
+    }
+    return FindingEntity.from_finding(normalize_match(match, "run", subproject=subproject))
+
+
+# -----------------------------
+# SCA collapse
+# -----------------------------
+def test_minimal_fix_covers_every_vulnerability():
+    fix, unfixed = minimal_fix("4.17.10", {
+        "CVE-1": ["4.17.11"],
+        "CVE-2": ["3.0.0", "4.17.21", "5.0.0"],
+        "CVE-3": [],
+    })
+    assert fix == "4.17.21"
+    assert unfixed == ["CVE-3"]
+
+
+def test_minimal_fix_never_downgrades():
+    fix, unfixed = minimal_fix("4.17.10", {"CVE-1": ["3.0.0", "4.17.10"]})
+    assert fix is None
+    assert unfixed == ["CVE-1"]
+
+
+def test_collapse_groups_per_package_version():
+    sast = FindingEntity.from_finding(Finding(category="SAST", tool="semgrep", rule_id="xss", title="XSS"))
+    entities = [
+        sca_entity("CVE-1", "Medium", ["4.17.11"]),
+        sast,
+        sca_entity("CVE-2", "Critical", ["4.17.21"]),
+        sca_entity("CVE-1", "High", ["4.17.12"]),  # same CVE seen twice
+        sca_entity("CVE-9", "Low", ["2.0.0"], package="minimist", version="1.2.0"),
+        sca_entity("CVE-1", "Medium", ["4.17.11"], subproject="web"),
+    ]
+
+    collapsed = collapse_sca_entities(entities)
+
+    assert [e.category for e in collapsed] == ["SCA", "SAST", "SCA", "SCA"]
+    assert collapsed[1] is sast
+
+    lodash = collapsed[0]
+    assert lodash.attributes["vulnerabilities"] == ["CVE-1", "CVE-2"]
+    assert lodash.attributes["fix_version"] == "4.17.21"
+    assert lodash.severity == "CRITICAL"
+    assert lodash.weakness == "CVE-2"
+    assert len(lodash.signals) == 3
+    assert lodash.title == "lodash (4.17.10) has 2 known vulnerabilities"
+
+    # Single-CVE packages keep their title; sub-projects stay separate
+    assert collapsed[2].title == "minimist (1.2.0) has CVE-9"
+    assert collapsed[3].attributes["subproject"] == "web"
+    assert collapsed[3].entity_id != lodash.entity_id
+
+
+# -----------------------------
+# Entity builder
+# -----------------------------
+def test_build_entities_groups_by_fingerprint_without_copies():
+    findings = [
+        Finding(fingerprint="a", title="SQLi", severity="MEDIUM", category="SAST", tool="semgrep", rule_id="sqli", file="app.py", line=3),
+        Finding(fingerprint="b", title="XSS", severity="LOW", category="SAST", tool="semgrep", rule_id="xss", file="ui.py"),
+        Finding(fingerprint="a", title="SQLi", severity="HIGH", category="SAST", tool="bandit", rule_id="sqli", file="app.py", line=3),
+        Finding(title="Header missing", category="DAST", rule_id="hsts", url="http://x/"),
+        Finding(title="Header missing", category="DAST", rule_id="hsts", url="http://x/"),
+    ]
+
+    entities = build_entities(findings)
+
+    assert [e.entity_id for e in entities[:2]] == ["a", "b"]
+    sqli = entities[0]
+    assert list(sqli.members) == [0, 2]
+    assert sqli.table is findings
+    assert sqli.signals[1] is findings[2]
+    assert sqli.severity == "HIGH"
+    assert sqli.tools == ["bandit", "semgrep"]
+    assert sqli.location == "app.py:3"
+
+    # No fingerprint: grouped by (category, rule, location)
+    assert len(entities) == 3
+    assert len(entities[2].signals) == 2
+
+
+def test_collapse_reuses_shared_table():
+    match = lambda vuln: {
+        "vulnerability": {"id": vuln, "severity": "High"},
+        "artifact": {"name": "a", "version": "1", "type": "npm"},
+    }
+    findings = [normalize_match(match("CVE-1"), "run"), normalize_match(match("CVE-2"), "run")]
+
+    [entity] = collapse_sca_entities(build_entities(findings))
+
+    assert entity.table is findings
+    assert list(entity.members) == [0, 1]
+
+
+# -----------------------------
+# Semantic merge
+# -----------------------------
+def sast_finding(i, rule="python.sqli", code=None, title="SQL query built from user input"):
+    code = code or 'cursor.execute("SELECT * FROM users WHERE id = " + request.args["id"])'
+    return Finding(
+        fingerprint=f"fp-{i}", title=title, severity="HIGH", category="SAST", tool="semgrep",
+        rule_id=rule, file=f"services/api/handlers/h{i}.py", line=12, evidence={"code": code},
+    )
+
+
+def test_semantic_merge_collapses_copy_pasted_pattern():
+    findings = [sast_finding(i) for i in range(300)]
+    findings.append(sast_finding(300, rule="python.xss", title="XSS", code="return render(request.args['q'])"))
+    # Same rule, whitespace-only edit of the snippet
+    findings.append(sast_finding(301, code='cursor.execute( "SELECT * FROM users WHERE id = "  +  request.args["id"] )'))
+
+    merged = semantic_merge(build_entities(findings), threshold=0.8)
+
+    assert len(merged) == 2
+    sqli, xss = merged
+    assert sqli.entity_id == "fp-0"
+    assert len(sqli.signals) == 301
+    assert len(sqli.attributes["locations"]) == 301
+    assert xss.weakness == "python.xss"
+
+
+def test_semantic_merge_threshold_is_configurable():
+    findings = [
+        sast_finding(0),
+        sast_finding(1, code='cursor.execute("SELECT * FROM orders WHERE id = " + request.args["order"])'),
+    ]
+
+    assert len(semantic_merge(build_entities(findings), threshold=0.5)) == 1
+    assert len(semantic_merge(build_entities(findings), threshold=1.0)) == 2
+
+
+# -----------------------------
+# Lifecycle
+# -----------------------------
+def test_lifecycle_tracks_new_recurring_fixed(tmp_path):
+    store = LifecycleStore(str(tmp_path / "lifecycle.sqlite3"))
+
+    state, fixed = store.record_scan("repo-a", ["a", "b"], seen_at="2026-01-01T00:00:00")
+    assert state == {"a": ("2026-01-01T00:00:00", "new"), "b": ("2026-01-01T00:00:00", "new")}
+
+    state, fixed = store.record_scan("repo-a", ["a", "c"], seen_at="2026-01-02T00:00:00")
+    assert state["a"] == ("2026-01-01T00:00:00", "recurring")
+    assert state["c"][1] == "new"
+    assert fixed == 1
+    assert store.fixed("repo-a") == [
+        {"fingerprint": "b", "first_seen": "2026-01-01T00:00:00", "last_seen": "2026-01-01T00:00:00"}
+    ]
+
+    # Other repos are independent; a fixed finding can come back
+    assert store.record_scan("repo-b", ["a"], seen_at="2026-01-03T00:00:00")[0]["a"][1] == "new"
+    state, fixed = store.record_scan("repo-a", ["a", "b", "c"], seen_at="2026-01-04T00:00:00")
+    assert state["b"] == ("2026-01-01T00:00:00", "recurring")
+    assert fixed == 0
+    assert store.fixed("repo-a") == []
+
+
+def test_apply_lifecycle_sets_entity_state(tmp_path):
+    store = LifecycleStore(str(tmp_path / "lifecycle.sqlite3"))
+    entities = build_entities([sast_finding(0), sast_finding(1)])
+
+    assert apply_lifecycle(entities, repo="repo", store=store)["new"] == 2
+    first_seen = entities[0].first_seen
+
+    entities = build_entities([sast_finding(0)])
+    counts = apply_lifecycle(entities, repo="repo", store=store)
+    assert counts == {"new": 0, "recurring": 1, "fixed": 1}
+    assert entities[0].status == "recurring"
+    assert entities[0].first_seen == first_seen
+
+    # Unknown repo: nothing persisted
+    assert apply_lifecycle(build_entities([sast_finding(5)]), store=store)["new"] == 0
+
+    # Clean scan: everything still open is resolved
+    assert apply_lifecycle([], repo="repo", store=store) == {"new": 0, "recurring": 0, "fixed": 1}
+    assert {row["fingerprint"] for row in store.fixed("repo")} == {"fp-0", "fp-1"}
+
+
+def test_merged_entity_identity_is_order_independent(tmp_path):
+    store = LifecycleStore(str(tmp_path / "lifecycle.sqlite3"))
+    findings = [sast_finding(i) for i in range(5)]
+
+    first = semantic_merge(build_entities(findings), threshold=0.8)
+    apply_lifecycle(first, repo="repo", store=store)
+    again = semantic_merge(build_entities(findings[::-1]), threshold=0.8)
+    counts = apply_lifecycle(again, repo="repo", store=store)
+
+    assert [e.entity_id for e in again] == [e.entity_id for e in first] == ["fp-0"]
+    assert counts == {"new": 0, "recurring": 1, "fixed": 0}
+
+
+def test_clean_scan_resolves_open_entities(tmp_path, monkeypatch):
+    monkeypatch.setenv("DEPLAI_LIFECYCLE_DB", str(tmp_path / "lifecycle.sqlite3"))
+    build_intelligence([sast_finding(0)], repo="repo")
+    assert build_intelligence([], repo="repo") == []
+    assert [row["fingerprint"] for row in LifecycleStore().fixed("repo")] == ["fp-0"]
+
+
+# -----------------------------
+# Scoring
+# -----------------------------
+def test_score_batch_factors():
+    scores = score_batch(
+        ["CRITICAL", "HIGH", "HIGH", "HIGH", "HIGH", "LOW", "HIGH"],
+        ["HIGH", "HIGH", "HIGH", "HIGH", "HIGH", "HIGH", "HIGH"],
+        ["SAST", "SAST", "SAST", "SAST", "SAST", "SAST", "SYSTEM"],
+        [1, 1, 2, 1, 1, 1, 1],
+        [False, False, False, True, False, False, False],
+        [None, None, None, None, False, None, None],
+    )
+    critical, high, corroborated, recent, unreachable, low, system = scores
+
+    assert critical > high > low
+    assert corroborated > high and recent > high
+    assert unreachable < high
+    assert system == 0.0
+    assert max(scores) <= 10.0
+    assert rank_by_risk(scores)[:2] == [0, 3]
+
+
+def test_top_tier_scores_do_not_saturate():
+    n = 4
+    scores = score_batch(
+        ["CRITICAL"] * n, ["HIGH"] * n, ["DAST", "DAST", "DAST", "SAST"],
+        [3, 3, 1, 3], [True, True, True, False], [True, None, True, True],
+    )
+    assert all(s < 10.0 for s in scores)
+    assert len(set(scores)) == n
+    assert rank_by_risk(scores) == [0, 2, 1, 3]
+
+
+def test_semgrep_and_mixed_case_severities_are_normalized():
+    n = 4
+    error, high, mixed, warning = score_batch(
+        ["ERROR", "HIGH", "High", "WARNING"], ["HIGH"] * n, ["SAST"] * n, [1] * n, [False] * n, [None] * n,
+    )
+    assert error == high == mixed
+    assert warning == score_batch(["MEDIUM"], ["HIGH"], ["SAST"], [1], [False], [None])[0]
+
+    findings = [
+        Finding(fingerprint="a", severity="WARNING", category="SAST", tool="semgrep", rule_id="r"),
+        Finding(fingerprint="a", severity="ERROR", category="SAST", tool="semgrep", rule_id="r"),
+        Finding(fingerprint="b", severity="INFO", category="SAST", tool="semgrep", rule_id="r"),
+    ]
+    assert [e.severity for e in build_entities(findings)] == ["HIGH", "LOW"]
+
+
+def test_score_entity_wrapper_matches_batch():
+    findings = [sast_finding(0), sast_finding(1, rule="xss")]
+    findings[1].severity = "LOW"
+    findings[0].evidence["triage"] = {"recently_changed": True}
+    entities = build_entities(findings)
+
+    batch = score_entities(entities)
+    assert [score_entity(e) for e in entities] == batch
+    assert entities[0].risk_score == batch[0] > entities[1].risk_score
+
+
+# -----------------------------
+# Repository context
+# -----------------------------
+CODEOWNERS = """
+# default
+*                @org/security
+/services/api/   @org/backend
+*.js             @org/frontend
+docs/**/*.md     @org/docs
+"""
+
+
+def test_codeowners_last_rule_wins():
+    owners = CodeOwners(parse_codeowners(CODEOWNERS))
+
+    assert owners.owners_of("README.md") == ["@org/security"]
+    assert owners.owners_of("services/api/handlers/h1.py") == ["@org/backend"]
+    assert owners.owners_of("services/api/static/app.js") == ["@org/frontend"]
+    assert owners.owners_of("docs/guide/setup.md") == ["@org/docs"]
+    assert owners.owners_of("other/services/api/x.py") == ["@org/security"]  # anchored
+
+
+def git(repo, *args, author="Alice"):
+    env = {
+        "GIT_AUTHOR_NAME": author, "GIT_AUTHOR_EMAIL": "a@x", "GIT_COMMITTER_NAME": author,
+        "GIT_COMMITTER_EMAIL": "a@x", "HOME": str(repo), "PATH": os.environ["PATH"],
+    }
+    subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True, env=env)
+
+
+def test_repo_context_index_enriches_entities(tmp_path):
+    repo = tmp_path / "repo"
+    (repo / "services" / "api" / "handlers").mkdir(parents=True)
+    (repo / "tests").mkdir()
+    (repo / "CODEOWNERS").write_text(CODEOWNERS)
+    (repo / "services" / "api" / "handlers" / "h0.py").write_text("x = 1\n")
+    (repo / "tests" / "test_h0.py").write_text("y = 2\n")
+    git(repo, "init", "-q")
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", "init")
+    (repo / "services" / "api" / "handlers" / "h0.py").write_text("x = 2\n")
+    git(repo, "commit", "-q", "-am", "edit", author="Bob")
+
+    index = RepoContextIndex.build(str(repo))
+    findings = [sast_finding(0), sast_finding(1)]
+    findings[0].file = findings[0].file_path = str(repo / "services/api/handlers/h0.py")
+    findings[1].file = findings[1].file_path = "./tests/test_h0.py"
+    entities = build_entities(findings)
+
+    for entity in entities:
+        enrich_context(entity, index)
+
+    handler, test = (e.context for e in entities)
+    assert handler["owners"] == ["@org/backend"]
+    assert handler["last_author"] == "Bob"
+    assert handler["language"] == "python"
+    assert handler["size"] == 6
+    assert test["is_test"] is True
+    assert test["last_author"] == "Alice"
+    assert test["owners"] == ["@org/security"]
+
+    # Without an index: path-derived facts only
+    [entity] = build_entities([sast_finding(2)])
+    enrich_context(entity)
+    assert entity.context["language"] == "python" and "owners" not in entity.context
+
+
+# -----------------------------
+# Incremental intelligence
+# -----------------------------
+def test_incremental_update_matches_full_rebuild(tmp_path):
+    def scan(ids, xss=()):
+        findings = [sast_finding(i) for i in ids]
+        findings += [sast_finding(100 + i, rule="python.xss", title="XSS", code=f"render(q{i})") for i in xss]
+        findings.append(normalize_match({
+            "vulnerability": {"id": "CVE-1", "severity": "High"},
+            "artifact": {"name": "a", "version": "1", "type": "npm"},
+        }, "run"))
+        return findings
+
+    state = IntelligenceState(str(tmp_path / "intel.sqlite3"))
+    lifecycle = LifecycleStore(str(tmp_path / "lifecycle.sqlite3"))
+
+    first = update_intelligence("repo", scan(range(5), xss=range(3)), state=state, lifecycle=lifecycle)
+    assert first["summary"]["by_category"] == {"SAST": 4, "SCA": 1}
+
+    # Only the xss partition changes
+    second = update_intelligence("repo", scan(range(5), xss=[0, 1, 7]), state=state, lifecycle=lifecycle)
+    assert second["delta"] == {"added_findings": 1, "removed_findings": 1, "partitions": 1, "rebuilt_findings": 3}
+    assert {e.weakness for e in second["entities"]} == {"python.xss"}
+
+    fresh = IntelligenceState(str(tmp_path / "fresh.sqlite3"))
+    full = update_intelligence("repo", scan(range(5), xss=[0, 1, 7]), state=fresh, lifecycle=LifecycleStore(str(tmp_path / "l2.sqlite3")))
+    assert second["summary"] == full["summary"]
+    assert sorted(e["entity_id"] for e in state.entities("repo")) == sorted(e["entity_id"] for e in fresh.entities("repo"))
+
+    statuses = {e.entity_id: e.status for e in second["entities"]}
+    assert statuses["fp-107"] == "new" and statuses["fp-100"] == "recurring"
+
+
+def test_incremental_keeps_duplicates_and_content_changes(tmp_path):
+    state = IntelligenceState(str(tmp_path / "intel.sqlite3"))
+    lifecycle = LifecycleStore(str(tmp_path / "lifecycle.sqlite3"))
+    findings = [sast_finding(0), sast_finding(0), sast_finding(1)]
+
+    first = update_intelligence("repo", findings, state=state, lifecycle=lifecycle)
+    full = build_intelligence(findings, include_summary=True)
+    assert first["summary"]["total_findings"] == full["summary"]["total_findings"] == 3
+
+    # Same fingerprints, one severity changed: that key is rebuilt
+    changed = [sast_finding(0), sast_finding(0), sast_finding(1)]
+    changed[2].severity = "CRITICAL"
+    second = update_intelligence("repo", changed, state=state, lifecycle=lifecycle)
+    assert second["delta"]["added_findings"] == 1
+    assert second["summary"]["total_findings"] == 3
+    assert max(e.severity for e in second["entities"]) == "CRITICAL"
+    assert {e["severity"] for e in state.entities("repo")} == {"CRITICAL"}
+
+    # Unchanged rescan: nothing to rebuild
+    assert update_intelligence("repo", changed, state=state, lifecycle=lifecycle)["delta"]["added_findings"] == 0
@@ -23,23 +23,24 @@ from sast.intelligence import build_intelligence
 from sast.scope import ScopePolicy
 
 # 2. Import Agents
-from agents.llm_clients.openrouter_client import OpenRouterClient
+from agents.llm_clients.base import client_from_env
 from agents.remediation.remediator import RemediationAgent
 from agents.contracts import AgentContext
 
 # -------------------------
 # Setup Remediation Agent
 # -------------------------
+# Offline: DEPLAI_LLM_BACKEND=replay DEPLAI_LLM_CASSETTE=<recorded .jsonl>
 remediator = None
-if os.environ.get("OPENROUTER_API_KEY"):
-    try:
-        client = OpenRouterClient(api_key=os.environ["OPENROUTER_API_KEY"])
+try:
+    client = client_from_env()
+    if client is not None:
         remediator = RemediationAgent(client)
         print("✅ Remediation Agent initialized.")
-    except Exception as e:
-        print(f"⚠️ Failed to init Remediation Agent: {e}")
-else:
-    print("⚠️ No OPENROUTER_API_KEY found. Remediation will be skipped.")
+    else:
+        print("⚠️ No OPENROUTER_API_KEY found. Remediation will be skipped.")
+except Exception as e:
+    print(f"⚠️ Failed to init Remediation Agent: {e}")
 
 
 def run_test_case(title: str, payload: dict, scope: ScopePolicy):
@@ -0,0 +1,250 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from agents.llm_clients.openrouter_client import LLMClientError, OpenRouterClient
+
+
+# -----------------------------
+# Local stand-in OpenAI-compatible server
+# -----------------------------
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    script = []  # statuses / "slow" / "stream" served in order, then 200
+    requests = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        Handler.requests.append(body)
+        step = Handler.script.pop(0) if Handler.script else 200
+
+        if step == "slow":
+            time.sleep(1)
+            step = 200
+        if isinstance(step, int) and step != 200:
+            self._send(step, {"error": "busy"}, {"Retry-After": "0"})
+            return
+        if body.get("stream"):
+            self._stream(["{", '"ok": ', "true}"])
+            return
+        self._send(200, {
+            "choices": [{"message": {"content": ' {"ok": true} '}}],
+            "usage": {"prompt_tokens": 12, "completion_tokens": 5, "total_tokens": 17},
+        })
+
+    def _send(self, status, payload, headers=None):
+        raw = json.dumps(payload).encode()
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _stream(self, chunks):
+        events = [{"choices": [{"delta": {"content": c}}]} for c in chunks]
+        events.append({"choices": [], "usage": {"prompt_tokens": 3, "completion_tokens": 3, "total_tokens": 6}})
+        raw = "".join(f"data: {json.dumps(e)}\n\n" for e in events) + "data: [DONE]\n\n"
+        raw = raw.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    Handler.script = []
+    Handler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+def client(base_url, **kwargs):
+    kwargs.setdefault("backoff_seconds", 0.01)
+    return OpenRouterClient(api_key="test", model="stand-in", base_url=base_url, **kwargs)
+
+
+# -----------------------------
+# Tests
+# -----------------------------
+def test_complete_records_usage_and_latency(base_url):
+    llm = client(base_url)
+    assert llm.complete("plan") == '{"ok": true}'
+
+    metrics = llm.last_metrics()
+    assert metrics["total_tokens"] == 17 and metrics["retries"] == 0 and metrics["ok"]
+    assert Handler.requests[0]["model"] == "stand-in"
+
+
+def test_retries_on_429_and_5xx_then_gives_up_on_4xx(base_url):
+    llm = client(base_url)
+    Handler.script = [429, 503]
+    assert llm.complete("plan") == '{"ok": true}'
+    assert llm.last_metrics()["retries"] == 2
+
+    Handler.script = [400]
+    with pytest.raises(LLMClientError) as err:
+        llm.complete("plan")
+    assert err.value.status == 400 and len(Handler.requests) == 4
+
+    summary = llm.summary()
+    assert summary["calls"] == 2 and summary["errors"] == 1 and summary["retries"] == 2
+
+
+def test_without_retries_makes_one_attempt_and_shares_metrics(base_url, tmp_path):
+    from agents.llm_clients.base import RecordingClient
+
+    llm = client(base_url)
+    single = llm.without_retries()
+    Handler.script = [503]
+    with pytest.raises(LLMClientError):
+        single.complete("fix")
+    assert len(Handler.requests) == 1 and llm.max_retries == 3
+    assert llm.summary()["errors"] == 1
+
+    recorder = RecordingClient(llm, str(tmp_path / "llm.jsonl"))
+    assert recorder.without_retries().inner.max_retries == 0
+
+
+def test_deadline_covers_the_whole_call(base_url):
+    llm = client(base_url, max_retries=5)
+    Handler.script = ["slow", "slow", "slow"]
+    started = time.monotonic()
+    with pytest.raises(LLMClientError):
+        llm.complete("plan", timeout=0.5)
+    assert time.monotonic() - started < 1.0
+
+
+def test_streaming_passes_chunks(base_url):
+    chunks = []
+    llm = client(base_url)
+    assert llm.complete("plan", stream=True, on_chunk=chunks.append) == '{"ok": true}'
+    assert chunks == ["{", '"ok": ', "true}"]
+    assert llm.last_metrics()["streamed"] and llm.last_metrics()["total_tokens"] == 6
+
+
+def test_failed_call_does_not_report_previous_usage(base_url):
+    from agents.telemetry import LLMTelemetry
+
+    def broken_chunk(chunk):
+        raise RuntimeError("consumer failed")
+
+    llm = client(base_url)
+    telemetry = LLMTelemetry()
+    telemetry.timed_call("planner", llm, "plan")
+    with pytest.raises(RuntimeError):
+        telemetry.timed_call("planner", llm, "p" * 400, stream=True, on_chunk=broken_chunk)
+
+    # The failed call is estimated from its own prompt, not given the 12 tokens of the first
+    assert llm.last_metrics() is None
+    stats = telemetry.snapshot()["stages"]["planner"]
+    assert stats["errors"] == 1 and stats["prompt_tokens"] == 12 + 100
+
+
+# -----------------------------
+# Record / replay
+# -----------------------------
+def test_record_then_replay_offline(base_url, tmp_path):
+    from agents.llm_clients.base import RecordingClient, ReplayClient, ReplayMissError
+
+    cassette = tmp_path / "llm.jsonl"
+    recorder = RecordingClient(client(base_url), str(cassette))
+    assert recorder.complete("plan this") == '{"ok": true}'
+    assert len(Handler.requests) == 1
+
+    slept = []
+    replay = ReplayClient(str(cassette), latency_seconds=0.25, sleep=slept.append)
+    assert replay.complete("plan this") == '{"ok": true}'
+    assert len(Handler.requests) == 1  # no network
+    assert slept == [0.25]
+
+    with pytest.raises(ReplayMissError):
+        replay.complete("never recorded")
+    assert ReplayClient(str(cassette), default_response=lambda p: p.upper()).complete("x") == "X"
+
+    # Simulated latency beyond the caller's deadline times out
+    with pytest.raises(TimeoutError):
+        ReplayClient(str(cassette), latency_seconds=5, sleep=slept.append).complete("plan this", timeout=1)
+    assert replay.summary()["hits"] == 1 and replay.summary()["misses"] == 1
+
+
+def test_pipeline_runs_offline_with_replay(tmp_path, monkeypatch):
+    from agents.entrypoint import run_with_planner
+    from agents.llm_clients.base import ReplayClient
+    from agents.planner.planner_llm import LLMPlanner
+    from sast import orchestrator
+    from sast.schema import Finding
+    from sast.scope import ScopePolicy
+
+    high = Finding(
+        fingerprint="fp-1", title="SQLi", severity="HIGH", category="SAST",
+        tool="semgrep", rule_id="sqli", file="app.py", line=3, evidence={"code": "execute(q)"},
+    )
+    monkeypatch.setitem(orchestrator.STAGE_RUNNERS, "sast", lambda input, repo_path: {"findings": [high], "tools": ["semgrep"]})
+    monkeypatch.setitem(orchestrator.STAGE_RUNNERS, "sca", lambda input, repo_path: {"findings": [], "tools": []})
+    monkeypatch.setenv("DEPLAI_FIX_CACHE_MAX_MB", "0")
+    monkeypatch.setenv("DEPLAI_RUNTIME_DB", str(tmp_path / "runtimes.sqlite3"))
+
+    plan = json.dumps({
+        "run_sast": True, "run_sca": False, "run_dast": False, "reason": "replayed",
+        "limits": {"max_runtime_seconds": 60, "max_requests": 10},
+    })
+    llm = ReplayClient(default_response=lambda p: plan if "DevSecOps planner" in p else "use params")
+    result = run_with_planner(
+        {"run_id": "offline", "repo_path": str(tmp_path), "languages": ["python"]},
+        LLMPlanner(llm, cache=None),
+        ScopePolicy(allowed_repo_prefixes=[""], allowed_domains=[], safe_mode=True, max_requests=10),
+        llm_client=llm,
+    )
+
+    assert result["findings"][0].evidence["ai_remediation"] == "use params"
+    assert llm.summary()["calls"] == 2
+
+    # LLM usage is reported per scan only, never from the shared client
+    assert "llm" not in result["remediation"]
+    stages = result["telemetry"]["llm"]["stages"]
+    assert stages["planner"]["calls"] == 1 and stages["remediation"]["calls"] == 1
+    assert stages["remediation"]["tokens_estimated"] and stages["remediation"]["prompt_tokens"] > 0
+
+
+def test_bad_backend_config_keeps_scan_result(tmp_path, monkeypatch):
+    from agents.entrypoint import run_with_planner
+    from agents.llm_clients.base import LLMClient, ReplayClient
+    from agents.planner.planner_llm import LLMPlanner
+    from sast import orchestrator
+    from sast.schema import Finding
+    from sast.scope import ScopePolicy
+
+    with pytest.raises(TypeError):
+        LLMClient()
+
+    high = Finding(fingerprint="fp-1", title="SQLi", severity="HIGH", category="SAST", tool="semgrep", rule_id="sqli")
+    monkeypatch.setitem(orchestrator.STAGE_RUNNERS, "sast", lambda input, repo_path: {"findings": [high], "tools": ["semgrep"]})
+    monkeypatch.setitem(orchestrator.STAGE_RUNNERS, "sca", lambda input, repo_path: {"findings": [], "tools": []})
+    monkeypatch.setenv("DEPLAI_RUNTIME_DB", str(tmp_path / "runtimes.sqlite3"))
+    # Replay without a cassette: client_from_env raises
+    monkeypatch.setenv("DEPLAI_LLM_BACKEND", "replay")
+    monkeypatch.delenv("DEPLAI_LLM_CASSETTE", raising=False)
+
+    plan = json.dumps({"run_sast": True, "run_sca": False, "run_dast": False, "reason": "replayed"})
+    result = run_with_planner(
+        {"run_id": "bad-config", "repo_path": str(tmp_path), "languages": ["python"]},
+        LLMPlanner(ReplayClient(default_response=lambda p: plan), cache=None),
+        ScopePolicy(allowed_repo_prefixes=[""], allowed_domains=[], safe_mode=True, max_requests=10),
+    )
+
+    assert [f.fingerprint for f in result["findings"]] == ["fp-1"]
+    assert "remediation" not in result and "telemetry" in result
@@ -79,7 +79,7 @@ def test_fallback_planner_pr_disables_dast(ctx_pr):
 
 
 def test_llm_cannot_enable_dast_on_pr(ctx_pr, scope):
-    planner = LLMPlanner(FakeLLM())
+    planner = LLMPlanner(FakeLLM(), cache=None)
     plan = planner.plan(ctx_pr)
 
     # LLM tries to enable DAST
@@ -98,7 +98,300 @@ def test_llm_failure_falls_back(ctx_pr, scope):
         def create(self, **kwargs):
             raise RuntimeError("boom")
 
-    planner = LLMPlanner(BrokenLLM())
+    planner = LLMPlanner(BrokenLLM(), cache=None)
     plan = planner.plan(ctx_pr)
 
     assert plan.reason == "fallback_planner_baseline"
+
+
+# -----------------------------
+# Plan cache
+# -----------------------------
+class CountingLLM:
+    model = "test-model"
+
+    def __init__(self):
+        self.calls = 0
+
+    def complete(self, prompt, timeout=None):
+        self.calls += 1
+        return """```json
+{"run_sast": true, "run_sca": true, "run_dast": false, "reason": "cached decision",
+ "limits": {"max_runtime_seconds": 120, "max_requests": 50}}
+```"""
+
+
+def test_plan_cache_skips_llm_for_same_context(ctx_pr, tmp_path):
+    from agents.planner.plan_cache import PlanCache
+
+    cache = PlanCache(path=str(tmp_path / "plans.sqlite3"))
+    llm = CountingLLM()
+    first = LLMPlanner(llm, cache=cache).plan(ctx_pr)
+
+    # Same planning inputs in a different order / case, other changed files
+    reordered = AgentContext(
+        repo="other",
+        languages=["Python"],
+        frameworks=["fastapi"],
+        dependencies=["fastapi"],
+        is_pr=True,
+        changed_files=[],
+        has_public_endpoint=True,
+    )
+    second = LLMPlanner(llm, cache=cache).plan(reordered)
+
+    assert llm.calls == 1
+    assert second == first
+    assert first.reason == "cached decision"
+    assert cache.hits == 1
+
+
+def test_plan_cache_ttl_lru_and_failures(ctx_pr, tmp_path):
+    from agents.planner.plan_cache import PlanCache, plan_cache_key
+
+    # Failed LLM runs are not cached
+    cache = PlanCache(path=str(tmp_path / "plans.sqlite3"), max_entries=2)
+    assert LLMPlanner(FakeLLM(), cache=cache).plan(ctx_pr).reason == "fallback_planner_baseline"
+    assert len(cache) == 0
+
+    # LRU: the least recently read entry is evicted
+    plan = LLMPlanner(CountingLLM(), cache=None).plan(ctx_pr)
+    cache.put("a", plan)
+    cache.put("b", plan)
+    assert cache.get("a") == plan
+    cache.put("c", plan)
+    assert cache.get("b") is None and cache.get("a") == plan and len(cache) == 2
+
+    # Expired entries are misses; prompt version / model are part of the key
+    expired = PlanCache(path=str(tmp_path / "plans.sqlite3"), ttl_seconds=-1)
+    assert expired.get("a") is None
+    assert plan_cache_key(ctx_pr, "1", "m") != plan_cache_key(ctx_pr, "2", "m")
+    assert plan_cache_key(ctx_pr, "1", "m") != plan_cache_key(ctx_pr, "1", "other")
+
+
+# -----------------------------
+# Speculative execution
+# -----------------------------
+def test_speculative_stages_overlap_planning(tmp_path, monkeypatch, scope):
+    import time
+    from agents.contracts import ExecutionPlan, ScanLimits
+    from agents.entrypoint import run_with_planner
+    from sast import orchestrator
+
+    started = {}
+
+    def stage(name):
+        def run(input, repo_path):
+            started[name] = time.monotonic()
+            time.sleep(0.3)
+            return {"findings": [], "tools": [f"{name}-speculated"]}
+        return run
+
+    monkeypatch.setitem(orchestrator.STAGE_RUNNERS, "sast", stage("sast"))
+    monkeypatch.setitem(orchestrator.STAGE_RUNNERS, "sca", stage("sca"))
+    monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+    monkeypatch.delenv("DEPLAI_SPECULATE", raising=False)
+    monkeypatch.setenv("DEPLAI_RUNTIME_DB", str(tmp_path / "runtimes.sqlite3"))
+
+    class SlowPlanner:
+        def plan(self, ctx):
+            time.sleep(0.3)
+            return ExecutionPlan(
+                run_sast=True, run_sca=False, run_dast=False,
+                reason="llm disabled sca", limits=ScanLimits(max_runtime_seconds=60, max_requests=10),
+            )
+
+    begin = time.monotonic()
+    result = run_with_planner(
+        {
+            "run_id": "spec",
+            "repo_path": str(tmp_path),
+            "languages": ["python"],
+            "dependencies": ["flask"],
+            "dast": {"target_url": "https://example.com"},
+        },
+        SlowPlanner(),
+        scope,
+    )
+    elapsed = time.monotonic() - begin
+
+    # Planning (0.3s) and SAST (0.3s) overlapped instead of adding up
+    assert elapsed < 0.55
+    assert started["sast"] - begin < 0.1
+    assert result["tools"] == ["sast-speculated"]
+    assert result["speculation"]["used"] == ["sast"]
+    # SCA was disabled by the plan: cancelled or its result dropped
+    assert result["speculation"]["cancelled"] + result["speculation"]["discarded"] == ["sca"]
+    # DAST is never speculated
+    assert "dast" not in result["speculation"]["started"]
+
+
+def test_speculative_stage_is_reused_across_worker_counts(tmp_path, monkeypatch, scope, ctx_pr):
+    from dataclasses import replace
+    from agents.contracts import StageTuning
+    from agents.speculation import SpeculativeScan
+    from sast import orchestrator
+
+    monkeypatch.setitem(orchestrator.STAGE_RUNNERS, "sast", lambda input, repo_path: {"findings": []})
+    monkeypatch.setitem(orchestrator.STAGE_RUNNERS, "sca", lambda input, repo_path: {"findings": []})
+
+    class FixedSizing:
+        def size(self, plan, stats, pinned=None, allow_deep_dast=False):
+            return replace(plan, tuning=StageTuning(semgrep_profile="standard", semgrep_jobs=2))
+
+    def speculate():
+        return SpeculativeScan(
+            {"run_id": "r", "repo_path": str(tmp_path)}, ctx_pr, scope, cost_model=FixedSizing()
+        ).start()
+
+    # Only the job count differs: the speculative run is used, with its own jobs
+    spec = speculate()
+    final = replace(FallbackPlanner().plan(ctx_pr), tuning=StageTuning(semgrep_profile="standard", semgrep_jobs=8))
+    assert "sast" in spec.commit(final)
+    assert spec.stats["used"] == ["sast", "sca"] and spec.stats["retuned"] == []
+    assert spec.effective_tuning(final.tuning).semgrep_jobs == 2
+    spec.close()
+
+    # A different profile changes the findings: re-run
+    spec = speculate()
+    deep = replace(final, tuning=StageTuning(semgrep_profile="deep", semgrep_jobs=2))
+    assert "sast" not in spec.commit(deep)
+    assert spec.stats["retuned"] == ["sast"]
+    assert spec.effective_tuning(deep.tuning).semgrep_profile == "deep"
+    spec.close()
+
+
+# -----------------------------
+# Cost model
+# -----------------------------
+def test_repo_stats_are_cheap_and_skip_vendored_code(tmp_path):
+    from agents.planner.cost_model import collect_repo_stats
+
+    (tmp_path / "app.py").write_text("x = 1\n" * 400)
+    (tmp_path / "svc").mkdir()
+    (tmp_path / "svc" / "requirements.txt").write_text("flask\n")
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "lib.js").write_text("var a;\n" * 10_000)
+
+    stats = collect_repo_stats(str(tmp_path), languages=["python"])
+    assert stats.files == 2
+    assert stats.loc == {"python": 2400 // 40}
+    assert stats.manifests == 1 and stats.subprojects == 1
+
+
+def test_cost_model_sizes_plan_to_budget(ctx_pr, scope, tmp_path):
+    from agents.planner.cost_model import CostModel, RepoStats, RuntimeHistory
+
+    model = CostModel(history=RuntimeHistory(str(tmp_path / "runtimes.sqlite3")), cpus=4)
+    base = FallbackPlanner().plan(ctx_pr)  # 300s PR budget
+
+    # Small repo: full-depth rules, fewest workers, limit shrunk to the floor
+    small = model.size(base, RepoStats(files=20, loc={"python": 2_000}, manifests=1, subprojects=1, languages=("python",)))
+    assert small.tuning.semgrep_profile == "deep" and small.tuning.semgrep_jobs == 1
+    assert small.tuning.fits_budget
+    assert small.limits.max_runtime_seconds == 120
+
+    # Large monorepo: cheaper rules and more shards, limit kept
+    big = model.size(base, RepoStats(files=90_000, loc={"python": 400_000}, manifests=12, subprojects=12, languages=("python",)))
+    assert (big.tuning.semgrep_profile, big.tuning.semgrep_jobs) != ("deep", 1)
+    assert big.tuning.sca_workers > 1
+    assert big.tuning.fits_budget
+    assert sum(big.tuning.estimates.values()) <= 300 * 0.8
+    assert big.limits.max_runtime_seconds == 300
+
+    # The gatekeeper keeps the tuning
+    assert enforce_plan(big, scope).tuning == big.tuning
+
+
+def test_cost_model_learns_from_observed_runtimes(tmp_path):
+    from agents.contracts import StageTuning
+    from agents.planner.cost_model import CostModel, RepoStats, RuntimeHistory, StageOption
+
+    model = CostModel(history=RuntimeHistory(str(tmp_path / "runtimes.sqlite3")), cpus=1)
+    stats = RepoStats(files=10, loc={"python": 10_000}, manifests=0, subprojects=0, languages=("python",))
+    choice = StageOption("sast", "standard", 1)
+    before = model.estimate(choice, stats)
+
+    # 10 kLOC took 115s: (115 - 15s startup) / 10 = 10s per kLOC, blended
+    # with the 0.6s default on the first sample: 0.6 + 0.3 * 9.4 = 3.42
+    model.observe(StageTuning(semgrep_profile="standard"), stats, {"sast": 115.0})
+    after = model.estimate(choice, stats, model._observed())
+    assert before == pytest.approx(21.0)
+    assert after == pytest.approx(15.0 + 34.2)
+
+    # Later samples follow the EWMA
+    model.observe(StageTuning(semgrep_profile="standard"), stats, {"sast": 115.0})
+    assert model._observed()[("sast", "standard")] == pytest.approx(3.42 + 0.3 * (10 - 3.42))
+
+
+def test_cost_model_ignores_failed_cached_and_skipped_runs(tmp_path):
+    from agents.contracts import StageTuning
+    from agents.planner.cost_model import CostModel, RepoStats, RuntimeHistory
+
+    model = CostModel(history=RuntimeHistory(str(tmp_path / "runtimes.sqlite3")), cpus=1)
+    stats = RepoStats(files=10, loc={"python": 10_000}, manifests=2, subprojects=2, languages=("python",))
+    tuning = StageTuning(semgrep_profile="standard")
+
+    # A 0.2s Semgrep crash, no manifests to scan, a cached Nuclei result
+    model.observe(tuning, stats, {"sast": 0.2, "sca": 0.1}, ["semgrep-error", "sca-skipped", "nuclei-cached"])
+    assert model._observed() == {}
+
+    model.observe(tuning, stats, {"sast": 0.2, "sca": 50.0}, ["semgrep", "sca-grype"])
+    observed = model._observed()
+    # Even a suspiciously fast run only moves the default part of the way
+    assert observed[("sast", "standard")] == pytest.approx(0.6 * 0.7)
+    assert ("sca", "grype") in observed
+
+
+def test_apply_tuning_keeps_explicit_input():
+    from agents.contracts import StageTuning
+    from sast.orchestrator import apply_tuning
+
+    tuned = apply_tuning(
+        {"run_id": "r", "sca_backend": "osv-index", "dast": {"target_url": "https://example.com"}},
+        StageTuning(semgrep_profile="fast", semgrep_jobs=4, sca_workers=2, nuclei_profile="ci"),
+    )
+    assert tuned["semgrep_profile"] == "fast" and tuned["semgrep_jobs"] == 4
+    assert tuned["sca_backend"] == "osv-index"
+    assert tuned["dast"]["profile"] == "ci"
+
+
+def test_safe_mode_forces_ci_nuclei_profile(monkeypatch):
+    from agents.contracts import ExecutionPlan, ScanLimits
+    from agents.planner.cost_model import pinned_knobs
+    from sast import orchestrator
+
+    input = {"run_id": "r", "dast": {"target_url": "https://example.com", "profile": "deep"}}
+    assert pinned_knobs(input, safe_mode=True)["nuclei_profile"] == "ci"
+    assert pinned_knobs(input)["nuclei_profile"] == "deep"
+
+    profiles = []
+    monkeypatch.setattr(orchestrator, "run_nuclei", lambda url, headers=None, profile="ci": profiles.append(profile) or {})
+    monkeypatch.setattr(orchestrator, "normalize_nuclei", lambda raw: [])
+    monkeypatch.setattr(orchestrator, "run_config_checks", lambda url, cache=None: [])
+    plan = ExecutionPlan(run_sast=False, run_sca=False, run_dast=True, reason="t", limits=ScanLimits(60, 10))
+
+    for safe_mode in (True, False):
+        policy = ScopePolicy(allowed_repo_prefixes=[""], allowed_domains=["example.com"], safe_mode=safe_mode)
+        orchestrator.run_security_checks(input, plan, policy)
+    assert profiles == ["ci", "deep"]
+
+
+def test_plan_cache_hit_is_merged_with_current_baseline(tmp_path):
+    from agents.planner.plan_cache import PlanCache
+
+    def ctx(language):
+        return AgentContext(
+            repo="repo", languages=[language], frameworks=[], dependencies=[],
+            is_pr=False, changed_files=[], has_public_endpoint=False,
+        )
+
+    cache = PlanCache(path=str(tmp_path / "plans.sqlite3"))
+    llm = CountingLLM()
+    assert LLMPlanner(llm, cache=cache).plan(ctx("python")).run_sca is True
+
+    # Same cache key, but the case-sensitive baseline disables SCA here
+    plan = LLMPlanner(llm, cache=cache).plan(ctx("Python"))
+    assert llm.calls == 1 and cache.hits == 1
+    assert plan.run_sast is True and plan.run_sca is False
+    assert plan.reason == "cached decision" and plan.limits.max_runtime_seconds == 120
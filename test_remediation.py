@@ -0,0 +1,274 @@
+import threading
+import time
+
+import pytest
+
+from agents.contracts import AgentContext
+from agents.remediation.executor import RemediationExecutor, TokenBucket
+from agents.remediation.remediator import RemediationAgent
+from sast.schema import Finding
+
+
+CTX = AgentContext(
+    repo="repo",
+    languages=["python"],
+    frameworks=["flask"],
+    dependencies=[],
+    is_pr=False,
+    changed_files=[],
+    has_public_endpoint=False,
+)
+
+
+def finding(i, code="cursor.execute(q)"):
+    return Finding(
+        fingerprint=f"fp-{i}",
+        title=f"SQL injection {i}",
+        severity="HIGH",
+        category="SAST",
+        tool="semgrep",
+        rule_id="python.sqli",
+        file="app.py",
+        line=i,
+        evidence={"code": code},
+    )
+
+
+class SlowLLM:
+    """
+    Sleeps per call; fails the first `failures` calls.
+    """
+
+    def __init__(self, delay=0.2, failures=0, hang_first=False):
+        self.delay = delay
+        self.failures = failures
+        self.hang_first = hang_first
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self.timeouts = []
+        self._lock = threading.Lock()
+
+    def complete(self, prompt, timeout=None):
+        with self._lock:
+            self.calls += 1
+            self.timeouts.append(timeout)
+            call = self.calls
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            if self.hang_first and call == 1:
+                time.sleep(2)
+            time.sleep(self.delay)
+            if call <= self.failures:
+                raise RuntimeError("429 Too Many Requests")
+            return f"fix #{call}"
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def test_executor_runs_concurrently_and_attaches_fixes():
+    llm = SlowLLM(delay=0.2)
+    findings = [finding(i) for i in range(20)]
+    executor = RemediationExecutor(RemediationAgent(llm), max_workers=10, rate_per_second=0)
+
+    seen = []
+    started = time.monotonic()
+    fixes = executor.run(findings, CTX, on_result=lambda f, fix: seen.append(f.fingerprint))
+    elapsed = time.monotonic() - started
+
+    # 20 calls x 0.2s: two waves of 10, not 4s of serial calls
+    assert elapsed < 1.5
+    assert llm.peak <= 10
+    assert len(seen) == 20 and len(fixes) == 20
+    assert all(f.evidence["ai_remediation"].startswith("fix #") for f in findings)
+
+
+def test_executor_retries_and_times_out():
+    flaky = SlowLLM(delay=0.01, failures=2)
+    executor = RemediationExecutor(RemediationAgent(flaky), max_workers=1, rate_per_second=0, backoff_seconds=0.01)
+    assert executor.run([finding(1)], CTX) == ["fix #3"]
+    assert executor.stats["retries"] == 2 and executor.stats["failed"] == 0
+    # The executor's per-call timeout reaches the client
+    assert flaky.timeouts == [executor.timeout_seconds] * 3
+
+    hanging = SlowLLM(delay=0.01, hang_first=True)
+    executor = RemediationExecutor(
+        RemediationAgent(hanging), max_workers=1, rate_per_second=0, timeout_seconds=0.3, backoff_seconds=0.01
+    )
+    assert executor.run([finding(1)], CTX) == ["fix #2"]
+    assert executor.stats["timeouts"] == 1
+
+    broken = SlowLLM(delay=0, failures=10)
+    executor = RemediationExecutor(RemediationAgent(broken), max_workers=1, rate_per_second=0, max_retries=1, backoff_seconds=0)
+    result = executor.run([finding(1)], CTX)
+    assert result[0].startswith("Error generating fix") and executor.stats["failed"] == 1
+
+
+def test_executor_bounds_abandoned_calls():
+    hung = SlowLLM(delay=0.5)
+    executor = RemediationExecutor(
+        RemediationAgent(hung), max_workers=1, rate_per_second=0, timeout_seconds=0.05,
+        max_retries=4, backoff_seconds=0,
+    )
+    result = executor.run([finding(1)], CTX)
+
+    # Two call slots: later attempts wait for one instead of queueing behind hung calls
+    assert result[0].startswith("Error generating fix")
+    assert executor.stats["calls"] == 2 and executor.stats["timeouts"] == 5
+    assert hung.peak <= 2
+
+
+def test_token_bucket_limits_request_rate():
+    bucket = TokenBucket(rate=20, capacity=2)
+    started = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    # 2 from the burst, 4 more at 20/s
+    assert time.monotonic() - started >= 0.18
+
+
+def test_fix_cache_dedups_inflight_and_reuses_across_scans(tmp_path):
+    from agents.remediation.fix_cache import FixCache
+
+    cache = FixCache(path=str(tmp_path / "fixes.sqlite3"))
+    llm = SlowLLM(delay=0.2)
+    agent = RemediationAgent(llm, cache=cache)
+
+    # Same rule, same code modulo whitespace: one call for the whole scan
+    findings = [finding(i, code="cursor.execute(  q )" if i % 2 else "cursor.execute( q )") for i in range(8)]
+    findings.append(finding(99, code="os.system(cmd)"))
+    RemediationExecutor(agent, max_workers=8, rate_per_second=0).run(findings, CTX)
+
+    assert llm.calls == 2
+    assert len({f.evidence["ai_remediation"] for f in findings[:8]}) == 1
+
+    # Next scan: served from disk
+    rescan = RemediationAgent(SlowLLM(delay=0), cache=FixCache(path=str(tmp_path / "fixes.sqlite3")))
+    assert rescan.request_fix(finding(5, code="cursor.execute(\n    q\n)"), CTX) == findings[0].evidence["ai_remediation"]
+    assert rescan.llm.calls == 0
+    assert rescan.cache.stats()["hit_rate"] == 1.0
+
+    stats = cache.stats()
+    assert stats["misses"] == 2 and stats["hits"] + stats["shared"] == 7
+
+
+def test_fix_cache_replaces_abandoned_calls_and_skips_missing_snippets(tmp_path):
+    from agents.remediation.fix_cache import FixCache
+
+    cache = FixCache(path=str(tmp_path / "fixes.sqlite3"))
+    hanging = SlowLLM(delay=0.01, hang_first=True)
+    executor = RemediationExecutor(
+        RemediationAgent(hanging, cache=cache), max_workers=1, rate_per_second=0,
+        timeout_seconds=0.3, backoff_seconds=0.01,
+    )
+    # The retry does not join the hung first call
+    assert executor.run([finding(1)], CTX) == ["fix #2"]
+    assert cache.stats()["shared"] == 0 and cache.stats()["hit_rate"] == 0.0
+
+    llm = SlowLLM(delay=0)
+    agent = RemediationAgent(llm, cache=cache)
+    bare = [finding(i, code="") for i in range(2)]
+    assert [agent.request_fix(f, CTX) for f in bare] == ["fix #1", "fix #2"]
+    assert cache.stats()["lookups"] == 2
+
+
+def test_fix_cache_evicts_by_size_and_skips_errors(tmp_path):
+    from agents.remediation.fix_cache import FixCache
+
+    cache = FixCache(path=str(tmp_path / "fixes.sqlite3"), max_bytes=100)
+    cache.put("old", "x" * 40)
+    cache.put("mid", "y" * 40)
+    assert cache.get("old")  # "mid" is now the least recently used
+    cache.put("new", "z" * 40)
+    assert cache.get("mid") is None and cache.get("old") and cache.get("new")
+    assert cache.size_bytes() <= 100
+
+    agent = RemediationAgent(SlowLLM(delay=0, failures=1), cache=cache)
+    assert agent.generate_fix(finding(1), CTX).startswith("Error generating fix")
+    assert agent.generate_fix(finding(1), CTX) == "fix #2"
+
+
+def test_scheduler_orders_by_risk_and_stops_at_budget():
+    from agents.remediation.scheduler import RemediationBudget, schedule_remediation
+
+    low = finding(1)
+    low.severity = "LOW"
+    critical = finding(2)
+    critical.severity = "CRITICAL"
+    recent = finding(3)
+    recent.evidence["triage"] = {"recently_changed": True}
+    plain = finding(4)
+
+    agent = RemediationAgent(SlowLLM(delay=0))
+    one_prompt = len(agent.build_prompt(plain, CTX)) // 4 + 1 + 600
+    budget = RemediationBudget(max_tokens=one_prompt * 2 + 10)
+    schedule = schedule_remediation([low, plain, critical, recent], agent, CTX, budget)
+
+    assert [f.fingerprint for f in schedule.findings] == ["fp-2", "fp-3"]
+    assert [(s["fingerprint"], s["reason"]) for s in schedule.skipped] == [
+        ("fp-4", "token_budget"),
+        ("fp-1", "token_budget"),
+    ]
+
+    costly = RemediationBudget(max_cost_usd=0.001, cost_per_1k_tokens=1.0)
+    assert schedule_remediation([plain], agent, CTX, costly).skipped[0]["reason"] == "cost_budget"
+
+
+def test_scheduler_charges_nothing_for_cached_fixes(tmp_path):
+    from agents.remediation.fix_cache import FixCache
+    from agents.remediation.scheduler import RemediationBudget, schedule_remediation
+
+    agent = RemediationAgent(SlowLLM(delay=0), cache=FixCache(path=str(tmp_path / "fixes.sqlite3")))
+    cached = finding(1, code="os.system(cmd)")
+    agent.cache.put(agent.cache_key(cached, CTX), "stored fix")
+    fresh, duplicate = finding(2), finding(3)
+
+    # Room for one prompt: the stored fix and the shared duplicate are free
+    one_prompt = len(agent.build_prompt(fresh, CTX)) // 4 + 1 + 600
+    schedule = schedule_remediation([cached, fresh, duplicate], agent, CTX, RemediationBudget(max_tokens=one_prompt))
+    assert len(schedule.findings) == 3 and not schedule.skipped
+    assert schedule.estimated_tokens == one_prompt
+
+
+def test_scheduler_compacts_snippets_and_executor_honours_deadline():
+    from agents.remediation.scheduler import RemediationBudget, estimate_tokens, schedule_remediation
+
+    huge = "\n".join(f"line_{i} = call_{i}(arg)   " for i in range(2000))
+    agent = RemediationAgent(SlowLLM(delay=0))
+    full = estimate_tokens(agent.build_prompt(finding(1, code=huge), CTX))
+    schedule_remediation([finding(1, code=huge)], agent, CTX, RemediationBudget(max_snippet_tokens=100))
+    prompt = agent.build_prompt(finding(1, code=huge), CTX)
+    assert estimate_tokens(prompt) < full // 10
+    assert "line_0 = call_0(arg)" in prompt and "line_1999" in prompt and "lines truncated" in prompt
+
+    # Wall-time budget: one worker, 0.2s calls, 0.3s budget
+    llm = SlowLLM(delay=0.2)
+    executor = RemediationExecutor(RemediationAgent(llm), max_workers=1, rate_per_second=0)
+    findings = [finding(i) for i in range(5)]
+    fixes = executor.run(findings, CTX, deadline=time.monotonic() + 0.3)
+    assert llm.calls == 2 and fixes[2:] == [None, None, None]
+    assert len(executor.skipped) == 3 and "ai_remediation" not in findings[4].evidence
+
+
+def test_fix_cache_waiters_are_bounded_without_a_timeout(tmp_path, monkeypatch):
+    from concurrent.futures import TimeoutError as FutureTimeout
+    from agents.remediation import fix_cache
+    from agents.remediation.fix_cache import FixCache
+
+    monkeypatch.setattr(fix_cache, "DEFAULT_WAIT_SECONDS", 0.2)
+    cache = FixCache(path=str(tmp_path / "fixes.sqlite3"))
+    release = threading.Event()
+    owner = threading.Thread(target=cache.lookup, args=("k", lambda: release.wait(5) and "fix"))
+    owner.start()
+    time.sleep(0.05)
+
+    started = time.monotonic()
+    with pytest.raises(FutureTimeout):
+        cache.lookup("k", lambda: "other")
+    assert time.monotonic() - started < 1.0
+
+    release.set()
+    owner.join()
+    assert cache.get("k") == "fix"
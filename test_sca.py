@@ -0,0 +1,468 @@
+import json
+import os
+import stat
+import textwrap
+
+import pytest
+
+from sast import sbom_runner
+from sast.grype_db import active_snapshot, update_db, worker_env
+from sast.sbom_runner import discover_manifests, generate_sbom
+from sast import lockfiles
+from sast.advisory_index import AdvisoryIndex, build_index, cvss3_base_score
+from sast.grype_stream import GrypeMatchStream, GrypeStreamError
+from sast.normalize_sca import iter_normalized, normalize_osv
+from sast.sca_runner import SCARunnerError, stream_osv_scan
+from sast.sca_subprojects import run_sca, split_subprojects
+
+
+# -----------------------------
+# Fixtures
+# -----------------------------
+FAKE_SYFT = textwrap.dedent("""\
+    #!/bin/sh
+    if [ "$1" = "version" ]; then echo "Version: 9.9.9"; exit 0; fi
+    echo run >> "$SYFT_CALLS"
+    out="${3#cyclonedx-json=}"
+    echo '{"bomFormat": "CycloneDX", "components": []}' > "$out"
+""")
+
+
+FAKE_GRYPE = textwrap.dedent("""\
+    #!/bin/sh
+    case "$1" in sbom:*)
+        echo run >> "$GRYPE_CALLS"
+        echo '{"matches": [{"vulnerability": {"id": "CVE-1", "severity": "High"},'
+        echo ' "artifact": {"name": "requests", "version": "2.0", "type": "python",'
+        echo ' "locations": [{"path": "/requirements.txt"}]}}]}'
+        exit 0;;
+    esac
+    if [ "$2" = "update" ]; then echo db > "$GRYPE_DB_CACHE_DIR/vulnerability.db"; exit 0; fi
+    if [ "$2" = "status" ]; then echo '{"built": "'"$FAKE_BUILT"'", "schemaVersion": "v6"}'; exit 0; fi
+""")
+
+
+def install_tool(bin_dir, name, script):
+    bin_dir.mkdir(exist_ok=True)
+    tool = bin_dir / name
+    tool.write_text(script)
+    tool.chmod(tool.stat().st_mode | stat.S_IEXEC)
+
+
+@pytest.fixture
+def fake_syft(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    install_tool(bin_dir, "syft", FAKE_SYFT)
+
+    calls = tmp_path / "syft-calls"
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("SYFT_CALLS", str(calls))
+    monkeypatch.setenv("DEPLAI_CACHE_DIR", str(tmp_path / "cache"))
+    sbom_runner.syft_version.cache_clear()
+
+    yield lambda: len(calls.read_text().splitlines()) if calls.exists() else 0
+
+    sbom_runner.syft_version.cache_clear()
+
+
+@pytest.fixture
+def repo(tmp_path):
+    root = tmp_path / "repo"
+    (root / "svc" / "node_modules" / "dep").mkdir(parents=True)
+    (root / "requirements.txt").write_text("requests==2.31.0\n")
+    (root / "svc" / "package.json").write_text('{"name": "svc"}')
+    (root / "svc" / "node_modules" / "dep" / "package.json").write_text("{}")
+    return root
+
+
+# -----------------------------
+# SBOM cache
+# -----------------------------
+def test_discover_manifests_skips_vendored_dirs(repo):
+    found = [p.as_posix() for p in discover_manifests(str(repo))]
+    assert found == ["requirements.txt", "svc/package.json"]
+
+
+def test_sbom_cache_hit_skips_syft(repo, fake_syft, tmp_path):
+    first = generate_sbom(str(repo))
+    second = generate_sbom(str(repo))
+
+    assert first == second
+    assert fake_syft() == 1
+
+    # Written to the cache, never into the scanned tree
+    assert not (repo / "sbom.json").exists()
+    assert (tmp_path / "cache") in first.parents
+
+
+def test_sbom_cache_invalidated_by_lockfile_change(repo, fake_syft):
+    first = generate_sbom(str(repo))
+    (repo / "requirements.txt").write_text("requests==2.32.0\n")
+    second = generate_sbom(str(repo))
+
+    assert first != second
+    assert fake_syft() == 2
+
+
+def test_sbom_cache_invalidated_by_any_syft_lockfile(repo, fake_syft):
+    (repo / "Cargo.lock").write_text('[[package]]\nname = "serde"\nversion = "1.0.0"\n')
+    first = generate_sbom(str(repo))
+    (repo / "Cargo.lock").write_text('[[package]]\nname = "serde"\nversion = "1.0.1"\n')
+    second = generate_sbom(str(repo))
+
+    assert first != second
+    assert fake_syft() == 2
+
+
+def test_sbom_cache_covers_java_archives_but_not_skipped_dirs(repo, fake_syft):
+    (repo / "lib").mkdir()
+    (repo / "lib" / "app.jar").write_bytes(b"v1")
+    first = generate_sbom(str(repo))
+    (repo / "svc" / "node_modules" / "dep" / "package.json").write_text('{"version": "2"}')
+    assert generate_sbom(str(repo)) == first  # Syft never reads node_modules
+    (repo / "lib" / "app.jar").write_bytes(b"v2")
+
+    assert generate_sbom(str(repo)) != first
+    assert fake_syft() == 2
+
+
+# -----------------------------
+# Shared Grype DB
+# -----------------------------
+def test_grype_db_update_swaps_pinned_snapshot(tmp_path, monkeypatch):
+    install_tool(tmp_path / "bin", "grype", FAKE_GRYPE)
+    monkeypatch.setenv("PATH", f"{tmp_path / 'bin'}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.delenv("DEPLAI_GRYPE_DB_PIN", raising=False)
+    root = tmp_path / "grype-db"
+
+    # No snapshot yet: workers keep Grype's own behavior
+    assert "GRYPE_DB_AUTO_UPDATE" not in worker_env(root)
+
+    monkeypatch.setenv("FAKE_BUILT", "2026-01-01")
+    first = update_db(root)
+    assert first["updated"] is True
+
+    env = worker_env(root)
+    assert env["GRYPE_DB_AUTO_UPDATE"] == "false"
+    assert env["GRYPE_DB_CACHE_DIR"] == str(active_snapshot(root))
+    assert (active_snapshot(root) / "vulnerability.db").exists()
+
+    # Same DB build upstream: nothing swapped
+    assert update_db(root)["reason"] == "up-to-date"
+
+    # Workers can pin the previous snapshot while a new one becomes current
+    monkeypatch.setenv("FAKE_BUILT", "2026-01-02")
+    assert update_db(root)["updated"] is True
+    monkeypatch.setenv("DEPLAI_GRYPE_DB_PIN", first["snapshot"]["id"])
+    assert active_snapshot(root).name == first["snapshot"]["id"]
+
+
+# -----------------------------
+# Native lockfile fast path
+# -----------------------------
+YARN_V1 = """\
+# yarn lockfile v1
+
+"@babel/core@^7.0.0", "@babel/core@^7.1.0":
+  version "7.1.2"
+  resolved "https://registry.yarnpkg.com/@babel/core/-/core-7.1.2.tgz"
+
+lodash@^4.17.20:
+  version "4.17.21"
+"""
+
+YARN_BERRY = """\
+__metadata:
+  version: 6
+
+"lodash@npm:^4.17.21":
+  version: 4.17.21
+
+"app@workspace:.":
+  version: 0.0.0-use.local
+"""
+
+PACKAGE_LOCK_V3 = """{
+  "lockfileVersion": 3,
+  "packages": {
+    "": {"name": "app", "version": "1.0.0"},
+    "node_modules/express": {"version": "4.18.2"},
+    "node_modules/express/node_modules/debug": {"version": "2.6.9"},
+    "node_modules/local": {"link": true}
+  }
+}"""
+
+GO_SUM = """\
+golang.org/x/text v0.3.7 h1:abc=
+golang.org/x/text v0.3.7/go.mod h1:def=
+golang.org/x/net v0.0.1/go.mod h1:ghi=
+"""
+
+
+def test_lockfile_parsers():
+    assert lockfiles.parse_requirements(
+        "Django[argon2]==4.2.1 ; python_version > '3.8'\nrequests>=2\n-r base.txt\n"
+    ) == [("Django", "4.2.1", "pypi")]
+
+    assert lockfiles.parse_yarn_lock(YARN_V1) == [
+        ("@babel/core", "7.1.2", "npm"),
+        ("lodash", "4.17.21", "npm"),
+    ]
+    assert lockfiles.parse_yarn_lock(YARN_BERRY) == [("lodash", "4.17.21", "npm")]
+
+    assert lockfiles.parse_package_lock(PACKAGE_LOCK_V3) == [
+        ("express", "4.18.2", "npm"),
+        ("debug", "2.6.9", "npm"),
+    ]
+    assert lockfiles.parse_go_sum(GO_SUM) == [("golang.org/x/text", "v0.3.7", "golang")]
+
+
+def test_can_parse_requires_lockfile_next_to_manifest():
+    from pathlib import Path
+
+    assert lockfiles.can_parse([Path("package.json"), Path("yarn.lock")])
+    assert not lockfiles.can_parse([Path("package.json"), Path("sub/yarn.lock")])
+    assert not lockfiles.can_parse([Path("requirements.txt"), Path("pom.xml")])
+
+
+def test_native_sbom_bypasses_syft(tmp_path, fake_syft):
+    root = tmp_path / "lockrepo"
+    root.mkdir()
+    (root / "requirements.txt").write_text("requests==2.31.0\n")
+    (root / "package.json").write_text("{}")
+    (root / "yarn.lock").write_text(YARN_V1)
+
+    sbom = json.loads(generate_sbom(str(root)).read_text())
+
+    assert fake_syft() == 0
+    purls = {c["purl"] for c in sbom["components"]}
+    assert purls == {
+        "pkg:pypi/requests@2.31.0",
+        "pkg:npm/%40babel/core@7.1.2",
+        "pkg:npm/lodash@4.17.21",
+    }
+
+
+def test_mixed_ecosystem_repo_falls_back_to_syft(tmp_path, fake_syft):
+    root = tmp_path / "mixed"
+    (root / "web").mkdir(parents=True)
+    (root / "requirements.txt").write_text("requests==2.31.0\n")
+    (root / "Gemfile.lock").write_text("GEM\n  specs:\n    rack (2.2.8)\n")
+    (root / "web" / "Cargo.lock").write_text('[[package]]\nname = "serde"\nversion = "1.0.0"\n')
+
+    manifests = [p.as_posix() for p in discover_manifests(str(root))]
+    assert manifests == ["Gemfile.lock", "requirements.txt", "web/Cargo.lock"]
+    assert not lockfiles.can_parse(discover_manifests(str(root)))
+
+    # Ruby / Rust dependencies are only catalogued by Syft
+    generate_sbom(str(root))
+    assert fake_syft() == 1
+
+
+def test_unparseable_lockfile_falls_back_to_syft(tmp_path, fake_syft):
+    root = tmp_path / "broken"
+    root.mkdir()
+    (root / "package-lock.json").write_text("{not json")
+
+    generate_sbom(str(root))
+    assert fake_syft() == 1
+
+
+# -----------------------------
+# In-process advisory index
+# -----------------------------
+OSV_DOCS = [
+    {
+        "id": "GHSA-aaaa",
+        "aliases": ["CVE-2023-0001"],
+        "database_specific": {"severity": "MODERATE"},
+        "affected": [{
+            "package": {"ecosystem": "PyPI", "name": "Requests"},
+            "ranges": [{"type": "ECOSYSTEM", "events": [{"introduced": "2.0"}, {"fixed": "2.31.1"}]}],
+        }],
+    },
+    {
+        "id": "GHSA-bbbb",
+        "severity": [{"type": "CVSS_V3", "score": "CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H"}],
+        "affected": [{
+            "package": {"ecosystem": "npm", "name": "@babel/core"},
+            "ranges": [{"type": "SEMVER", "events": [
+                {"introduced": "0"}, {"fixed": "7.0.5"},
+                {"introduced": "7.1.0"}, {"last_affected": "7.1.2"},
+            ]}],
+        }],
+    },
+]
+
+
+@pytest.fixture
+def advisory_index(tmp_path):
+    osv_dir = tmp_path / "osv"
+    osv_dir.mkdir()
+    for doc in OSV_DOCS:
+        (osv_dir / f"{doc['id']}.json").write_text(json.dumps(doc))
+
+    index_path = tmp_path / "advisories.idx"
+    stats = build_index([str(osv_dir)], str(index_path))
+    assert stats["packages"] == 2
+
+    with AdvisoryIndex(str(index_path)) as index:
+        yield index
+
+
+def test_cvss3_base_score():
+    assert cvss3_base_score("CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H") == 9.8
+    assert cvss3_base_score("CVSS:3.1/AV:N/AC:L/PR:N/UI:R/S:C/C:L/I:L/A:N") == 6.1
+
+
+def test_index_ranges(advisory_index):
+    assert advisory_index.affected_by("PyPI", "requests", "2.31.0")
+    assert not advisory_index.affected_by("PyPI", "requests", "2.31.1")
+    assert not advisory_index.affected_by("PyPI", "requests", "1.9")
+
+    assert advisory_index.affected_by("npm", "@babel/core", "7.1.2")
+    assert not advisory_index.affected_by("npm", "@babel/core", "7.1.3")
+    assert not advisory_index.affected_by("npm", "@babel/core", "7.0.9")
+    assert not advisory_index.affected_by("npm", "left-pad", "1.0.0")
+
+
+def test_index_lookup_cache_is_thread_safe(advisory_index):
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Tiny LRU: every lookup evicts, maximising contention
+    index = AdvisoryIndex(advisory_index.path, cache_size=1)
+    packages = [("PyPI", "requests"), ("npm", "@babel/core"), ("npm", "left-pad")]
+
+    def hammer(offset):
+        return [len(index.lookup(*packages[(offset + i) % 3])) for i in range(3000)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(hammer, range(8)))
+    index.close()
+
+    for offset, counts in enumerate(results):
+        assert counts == [[1, 1, 0][(offset + i) % 3] for i in range(3000)]
+
+
+def test_index_matches_feed_normalize_osv(tmp_path, advisory_index):
+    root = tmp_path / "lockrepo"
+    root.mkdir()
+    (root / "requirements.txt").write_text("requests==2.31.0\n")
+    (root / "package.json").write_text("{}")
+    (root / "yarn.lock").write_text(YARN_V1)
+    sbom = lockfiles.build_sbom(str(root), discover_manifests(str(root)))
+
+    findings = normalize_osv(advisory_index.match_sbom(sbom), "run")
+    by_rule = {f.rule_id: f for f in findings}
+
+    assert set(by_rule) == {"CVE-2023-0001", "GHSA-bbbb"}
+    assert by_rule["CVE-2023-0001"].severity == "MEDIUM"
+    assert by_rule["CVE-2023-0001"].file == "/requirements.txt"
+    assert by_rule["CVE-2023-0001"].evidence["fix_versions"] == ["2.31.1"]
+    assert by_rule["GHSA-bbbb"].severity == "CRITICAL"
+    assert by_rule["GHSA-bbbb"].evidence["type"] == "npm"
+
+
+# -----------------------------
+# Monorepo sub-projects
+# -----------------------------
+def test_monorepo_scans_each_lockfile_set_once(tmp_path, monkeypatch, fake_syft):
+    install_tool(tmp_path / "bin", "grype", FAKE_GRYPE)
+    calls = tmp_path / "grype-calls"
+    monkeypatch.setenv("GRYPE_CALLS", str(calls))
+    monkeypatch.setenv("DEPLAI_GRYPE_DB_DIR", str(tmp_path / "no-db"))
+
+    root = tmp_path / "mono"
+    for svc, pins in (("svc-a", "requests==2.0\n"), ("svc-b", "requests==2.0\n"), ("svc-c", "flask==1.0\n")):
+        (root / "services" / svc).mkdir(parents=True)
+        (root / "services" / svc / "requirements.txt").write_text(pins)
+
+    assert [s.path for s in split_subprojects(str(root))] == [
+        "services/svc-a", "services/svc-b", "services/svc-c",
+    ]
+
+    sca = run_sca(str(root), "run", max_workers=4)
+
+    assert len(calls.read_text().splitlines()) == 2
+    assert sca["deduplicated"] == 1
+    assert fake_syft() == 0
+
+    tagged = {f.evidence["subproject"]: f for f in sca["findings"]}
+    assert set(tagged) == {"services/svc-a", "services/svc-b", "services/svc-c"}
+    assert tagged["services/svc-a"].file == "/services/svc-a/requirements.txt"
+    assert len({f.fingerprint for f in sca["findings"]}) == 3
+
+
+def test_root_project_keeps_untagged_fingerprints():
+    raw = {"matches": [{"vulnerability": {"id": "CVE-1"}, "artifact": {"name": "a", "version": "1"}}]}
+
+    assert normalize_osv(raw, "run", subproject=".")[0].fingerprint == normalize_osv(raw, "run")[0].fingerprint
+    assert "subproject" not in normalize_osv(raw, "run", subproject=".")[0].evidence
+
+
+# -----------------------------
+# Streaming Grype output
+# -----------------------------
+def grype_report(n):
+    return {
+        "matches": [
+            {
+                "vulnerability": {"id": f"CVE-2024-{i}", "severity": "High", "fix": {"versions": [f"{i}.1"]}},
+                "artifact": {"name": f"pkg-{i % 7}", "version": f"{i}.0", "type": "npm",
+                             "locations": [{"path": "/package-lock.json"}]},
+            }
+            for i in range(n)
+        ],
+        "source": {"type": "sbom", "target": "x.json"},
+        "descriptor": {"name": "grype", "db": {"built": "2026-01-01", "schemaVersion": 6}},
+    }
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 65536])
+def test_streamed_matches_equal_json_loads(chunk_size):
+    import io
+
+    report = grype_report(50)
+    text = json.dumps(report, indent=2)
+    stream = GrypeMatchStream(io.StringIO(text), chunk_size=chunk_size)
+
+    def records(findings):
+        return [{k: v for k, v in f.to_record().items() if k not in ("first_seen", "last_seen")} for f in findings]
+
+    streamed = records(iter_normalized(stream, "run", subproject="svc"))
+    expected = records(normalize_osv(json.loads(text), "run", subproject="svc"))
+
+    assert streamed == expected
+    assert stream.document == {k: v for k, v in report.items() if k != "matches"}
+
+
+def test_stream_rejects_truncated_output():
+    import io
+
+    text = json.dumps(grype_report(3))
+    with pytest.raises(GrypeStreamError):
+        list(GrypeMatchStream(io.StringIO(text[:-40]), chunk_size=16))
+
+
+def test_stream_osv_scan_reads_grype_pipe(tmp_path, monkeypatch):
+    install_tool(tmp_path / "bin", "grype", FAKE_GRYPE)
+    monkeypatch.setenv("PATH", f"{tmp_path / 'bin'}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("GRYPE_CALLS", str(tmp_path / "grype-calls"))
+    monkeypatch.setenv("DEPLAI_GRYPE_DB_DIR", str(tmp_path / "no-db"))
+    sbom = tmp_path / "sbom.json"
+    sbom.write_text("{}")
+
+    with stream_osv_scan(sbom) as matches:
+        findings = list(iter_normalized(matches, "run"))
+    assert [f.rule_id for f in findings] == ["CVE-1"]
+
+    install_tool(tmp_path / "bin", "grype", "#!/bin/sh\necho '{\"matches\": [' ; echo boom >&2; exit 2\n")
+    with pytest.raises(SCARunnerError, match="boom"):
+        with stream_osv_scan(sbom) as matches:
+            list(matches)
+
+    # Malformed report while Grype keeps writing past the pipe buffer: no deadlock
+    install_tool(tmp_path / "bin", "grype", "#!/bin/sh\necho '{\"matches\": [{\"a\": 1} ]'\nhead -c 400000 /dev/zero | tr '\\0' x\n")
+    with pytest.raises(SCARunnerError):
+        with stream_osv_scan(sbom) as matches:
+            list(matches)
@@ -0,0 +1,86 @@
+import pytest
+
+from agents.contracts import AgentContext
+from agents.planner.planner_llm import LLMPlanner
+from agents.telemetry import LLMTelemetry, histogram_quantile
+from api.telemetry import rollup
+
+
+CTX = AgentContext(
+    repo="repo",
+    languages=["python"],
+    frameworks=[],
+    dependencies=[],
+    is_pr=False,
+    changed_files=[],
+    has_public_endpoint=False,
+)
+
+
+class BrokenLLM:
+    model = "broken"
+
+    def __init__(self):
+        self.calls = 0
+
+    def complete(self, prompt, timeout=None):
+        self.calls += 1
+        return "not json"
+
+
+def test_histogram_buckets_and_quantiles():
+    telemetry = LLMTelemetry()
+    for latency in (0.05, 0.2, 0.2, 0.7, 3.0, 120.0):
+        telemetry.record_call("remediation", latency, prompt_tokens=10, completion_tokens=5)
+
+    stage = telemetry.snapshot()["stages"]["remediation"]
+    assert stage["latency"]["buckets"]["0.1"] == 1
+    assert stage["latency"]["buckets"]["0.25"] == 2
+    assert stage["latency"]["buckets"]["+Inf"] == 1
+    assert stage["latency"]["p50"] == 0.25
+    assert stage["latency"]["max"] == 120.0
+    assert stage["prompt_tokens"] == 60
+    assert histogram_quantile([0] * 10, 0.5) == 0.0
+
+
+def test_timed_call_records_errors():
+    class Failing:
+        def complete(self, prompt, timeout=None):
+            raise TimeoutError("slow")
+
+    telemetry = LLMTelemetry()
+    with pytest.raises(TimeoutError):
+        telemetry.timed_call("planner", Failing(), "prompt")
+    assert telemetry.snapshot()["total"]["errors"] == 1
+
+
+def test_planner_reports_retries_and_fallback_reason():
+    telemetry = LLMTelemetry()
+    llm = BrokenLLM()
+    plan = LLMPlanner(llm, max_retries=1, cache=None, telemetry=telemetry).plan(CTX)
+
+    stage = telemetry.snapshot()["stages"]["planner"]
+    assert plan.run_sast and llm.calls == 2
+    assert stage["calls"] == 2 and stage["retries"] == 1
+    assert stage["fallbacks"] == {"PlannerError": 1}
+
+
+def test_control_plane_rollup_merges_scans():
+    first, second = LLMTelemetry(), LLMTelemetry()
+    first.record_call("planner", 0.3)
+    first.record_cache("planner", hit=False)
+    second.record_call("planner", 4.0)
+    second.record_cache("planner", hit=True)
+    second.record_fallback("planner", "LLMClientError")
+
+    merged = rollup([
+        {"telemetry": {"llm": first.snapshot()}},
+        {"telemetry": {"llm": second.snapshot()}},
+        {"findings": []},  # pre-telemetry scan
+    ])
+    planner = merged["stages"]["planner"]
+    assert merged["scans"] == 2
+    assert planner["calls"] == 2
+    assert planner["latency"]["p95"] == 5.0
+    assert planner["cache"]["hit_rate"] == 0.5
+    assert planner["fallbacks"] == {"LLMClientError": 1}
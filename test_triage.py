@@ -0,0 +1,109 @@
+import random
+import re
+
+from agents.contracts import AgentContext
+from agents.triage.changes import ChangedLines, parse_unified_diff
+from agents.triage.triage import TriageEngine, triage_findings
+from sast.codeowners import GlobTrie, glob_to_regex
+from sast.schema import Finding
+
+
+DIFF = """\
+diff --git a/app/api.py b/app/api.py
+--- a/app/api.py
++++ b/app/api.py
+@@ -10,3 +10,4 @@ def handler():
+     a = 1
+-    b = 2
++    b = 3
++    c = 4
+     return a
+@@ -40,0 +42,2 @@
++++ not a header
++x = 1
+diff --git a/old.py b/old.py
+--- a/old.py
++++ /dev/null
+@@ -1,1 +0,0 @@
+-gone = True
+"""
+
+
+def ctx(**kwargs):
+    base = dict(
+        repo="repo",
+        languages=["python"],
+        frameworks=[],
+        dependencies=[],
+        is_pr=True,
+        changed_files=[],
+        has_public_endpoint=False,
+    )
+    base.update(kwargs)
+    return AgentContext(**base)
+
+
+def test_parse_unified_diff_tracks_added_lines():
+    assert parse_unified_diff(DIFF) == {"app/api.py": [(11, 12), (42, 43)]}
+
+
+def test_changed_lines_merges_and_bisects():
+    lines = ChangedLines({"./a.py": [(5, 7), (1, 2), (8, 9)]})
+    assert "a.py" in lines
+    assert lines.contains("a.py", 1)
+    assert lines.contains("a.py", 9)
+    assert not lines.contains("a.py", 3)
+    assert not lines.contains("b.py", 1)
+
+
+def test_triage_flags_changed_files_lines_and_teams():
+    findings = [
+        Finding(fingerprint="1", file="./app/api.py", line=11, category="SAST"),
+        Finding(fingerprint="2", file="app/api.py", line=30, category="SAST"),
+        Finding(fingerprint="3", file="web/frontend/app.js", line=1, category="SAST"),
+        Finding(fingerprint="4", file="https://example.com/api/users", line=0, category="DAST"),
+        Finding(fingerprint="5", file="docs/readme.md", line=1, category="SAST"),
+    ]
+    triage_findings(findings, ctx(changed_lines=parse_unified_diff(DIFF)))
+    tags = [f.evidence["triage"] for f in findings]
+
+    assert tags[0]["recently_changed"] and tags[0]["changed_line"]
+    assert tags[0]["priority_boost"] == "HIGH"
+    assert tags[1]["recently_changed"] and not tags[1]["changed_line"]
+    assert tags[2]["suggested_team"] == "Frontend"
+    assert tags[3]["suggested_team"] == "Backend"
+    assert tags[4]["suggested_team"] == "Security"
+    assert not tags[4]["recently_changed"]
+
+
+def test_team_rules_last_match_wins():
+    engine = TriageEngine(team_rules=[("*.py", "Backend"), ("/payments/", "Payments")])
+    assert engine.file_facts("payments/charge.py")[2] == "Payments"
+    assert engine.file_facts("users/views.py")[2] == "Backend"
+
+
+def test_glob_trie_agrees_with_regex():
+    rng = random.Random(11)
+    patterns = [
+        "*.py", "/src/", "src/**/test_*.py", "docs/*", "/build/**", "**/vendor",
+        "*api*", "/a/*/c/", "lib/", "/src/**/", "*.min.js", "a/**/b/**/c",
+    ]
+    segments = ["src", "a", "b", "c", "lib", "docs", "vendor", "api", "build", "test_x.py", "x.py", "y.min.js"]
+    trie = GlobTrie(patterns)
+    compiled = [re.compile(glob_to_regex(p)) for p in patterns]
+
+    for _ in range(2000):
+        path = "/".join(rng.choice(segments) for _ in range(rng.randint(1, 5)))
+        expected = max((i for i, rx in enumerate(compiled) if rx.search(path)), default=-1)
+        assert trie.match(path) == expected, path
+
+
+def test_trailing_star_matches_one_level_only():
+    trie = GlobTrie(["docs/*"])
+    assert trie.match("docs/getting-started.md") == 0
+    assert trie.match("docs/build/troubleshooting.md") == -1
+    assert not re.search(glob_to_regex("docs/*"), "docs/build/troubleshooting.md")
+
+    engine = TriageEngine(team_rules=[("*", "Security"), ("docs/*", "Docs")])
+    assert engine.file_facts("docs/index.md")[2] == "Docs"
+    assert engine.file_facts("docs/api/index.md")[2] == "Security"